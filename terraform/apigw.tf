@@ -12,9 +12,11 @@ module "api_gateway" {
       "content-type",
       "authorization",
       "x-amz-date",
-      "x-amz-user-agent"
+      "x-amz-user-agent",
+      "if-none-match"
     ]
-    allow_methods = ["*"]
+    allow_methods  = ["*"]
+    expose_headers = ["etag", "server-timing"]
     allow_origins = [
       "https://${local.api_domain_name}",
       "https://${local.domain_name}"
@@ -89,6 +91,15 @@ module "api_gateway" {
         payload_format_version = "2.0"
       }
     }
+    "GET /strength/percentiles" = {
+      authorization_type = "JWT"
+      authorizer_key     = "cognito"
+      integration = {
+        method                 = "POST"
+        uri                    = module.lambda_strength.lambda_function_arn
+        payload_format_version = "2.0"
+      }
+    }
     "GET /workout" = {
       authorization_type = "JWT"
       authorizer_key     = "cognito"
@@ -125,6 +136,35 @@ module "api_gateway" {
         payload_format_version = "2.0"
       }
     }
+    "PATCH /schedule" = {
+      authorization_type = "JWT"
+      authorizer_key     = "cognito"
+      integration = {
+        method                 = "POST"
+        uri                    = module.lambda_schedule.lambda_function_arn
+        payload_format_version = "2.0"
+      }
+    }
+    # App launch bootstrap (with auth)
+    "GET /bootstrap" = {
+      authorization_type = "JWT"
+      authorizer_key     = "cognito"
+      integration = {
+        method                 = "POST"
+        uri                    = module.lambda_bootstrap.lambda_function_arn
+        payload_format_version = "2.0"
+      }
+    }
+    # Program and history export (with auth)
+    "GET /export" = {
+      authorization_type = "JWT"
+      authorizer_key     = "cognito"
+      integration = {
+        method                 = "POST"
+        uri                    = module.lambda_export.lambda_function_arn
+        payload_format_version = "2.0"
+      }
+    }
     # Public config endpoints (no auth)
     "GET /program/template" = {
       integration = {
@@ -169,6 +209,15 @@ module "api_gateway" {
         payload_format_version = "2.0"
       }
     }
+    "GET /program/week/full" = {
+      authorization_type = "JWT"
+      authorizer_key     = "cognito"
+      integration = {
+        method                 = "POST"
+        uri                    = module.lambda_program_week.lambda_function_arn
+        payload_format_version = "2.0"
+      }
+    }
     # Non-lifting day generator (with auth)
     "GET /nonlift/day" = {
       authorization_type = "JWT"
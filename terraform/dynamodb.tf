@@ -6,6 +6,10 @@ resource "aws_dynamodb_table" "main" {
 
   deletion_protection_enabled = true
 
+  # Feeds the events Lambda (derived data)
+  stream_enabled   = true
+  stream_view_type = "NEW_AND_OLD_IMAGES"
+
   attribute {
     name = "userEmail"
     type = "S"
@@ -16,6 +20,12 @@ resource "aws_dynamodb_table" "main" {
     type = "S"
   }
 
+  # Processed-event markers expire on their own
+  ttl {
+    attribute_name = "expiresAt"
+    enabled        = true
+  }
+
   point_in_time_recovery {
     enabled = true
   }
@@ -33,6 +43,9 @@ resource "aws_dynamodb_table" "workout_history" {
 
   deletion_protection_enabled = true
 
+  stream_enabled   = true
+  stream_view_type = "NEW_AND_OLD_IMAGES"
+
   attribute {
     name = "userEmail"
     type = "S"
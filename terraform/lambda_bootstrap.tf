@@ -0,0 +1,70 @@
+module "lambda_bootstrap" {
+  source  = "terraform-aws-modules/lambda/aws"
+  version = "~> 8.1"
+
+  function_name = "${var.project}_bootstrap"
+  description   = "App launch bootstrap (user state + config) for Styrkr"
+  handler       = "handler.handler"
+  publish       = true
+  runtime       = "python3.13"
+  timeout       = 30
+  memory_size   = 256
+
+  environment_variables = {
+    DATA_TABLE    = aws_dynamodb_table.main.name
+    CONFIG_BUCKET = module.config_s3_bucket.s3_bucket_id
+  }
+
+  source_path = [
+    {
+      path = "${path.module}/lambdas/bootstrap"
+      patterns = [
+        "!.*/.*",
+        "handler\\.py$"
+      ]
+    },
+    {
+      path          = "${path.module}/lambdas/shared"
+      prefix_in_zip = "shared"
+      patterns = [
+        "!.*/.*",
+        ".*\\.py$"
+      ]
+    }
+  ]
+
+  attach_policy_statements = true
+  policy_statements = {
+    dynamodb = {
+      effect = "Allow"
+      actions = [
+        "dynamodb:Query"
+      ]
+      resources = [
+        aws_dynamodb_table.main.arn
+      ]
+    }
+    s3_read = {
+      effect = "Allow"
+      actions = [
+        "s3:GetObject",
+        "s3:ListBucket"
+      ]
+      resources = [
+        module.config_s3_bucket.s3_bucket_arn,
+        "${module.config_s3_bucket.s3_bucket_arn}/*"
+      ]
+    }
+  }
+
+  allowed_triggers = {
+    AllowExecutionFromAPIGateway = {
+      service    = "apigateway"
+      source_arn = "${module.api_gateway.api_execution_arn}/*/*"
+    }
+  }
+
+  cloudwatch_logs_retention_in_days = 7
+
+  tags = var.tags
+}
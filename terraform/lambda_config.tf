@@ -29,7 +29,9 @@ module "lambda_config" {
       effect = "Allow"
       actions = [
         "s3:GetObject",
-        "s3:ListBucket"
+        "s3:GetObjectVersion",
+        "s3:ListBucket",
+        "s3:ListBucketVersions"
       ]
       resources = [
         module.config_s3_bucket.s3_bucket_arn,
@@ -79,7 +81,8 @@ module "lambda_nonlift" {
     dynamodb = {
       effect = "Allow"
       actions = [
-        "dynamodb:GetItem"
+        "dynamodb:GetItem",
+        "dynamodb:Query"
       ]
       resources = [aws_dynamodb_table.main.arn]
     }
@@ -129,7 +132,8 @@ module "lambda_program_settings" {
   ]
 
   environment_variables = {
-    DATA_TABLE = aws_dynamodb_table.main.name
+    DATA_TABLE    = aws_dynamodb_table.main.name
+    CONFIG_BUCKET = module.config_s3_bucket.s3_bucket_id
   }
 
   attach_policy_statements = true
@@ -139,10 +143,22 @@ module "lambda_program_settings" {
       actions = [
         "dynamodb:GetItem",
         "dynamodb:PutItem",
-        "dynamodb:UpdateItem"
+        "dynamodb:UpdateItem",
+        "dynamodb:Query"
       ]
       resources = [aws_dynamodb_table.main.arn]
     }
+    s3_read = {
+      effect = "Allow"
+      actions = [
+        "s3:GetObject",
+        "s3:ListBucket"
+      ]
+      resources = [
+        module.config_s3_bucket.s3_bucket_arn,
+        "${module.config_s3_bucket.s3_bucket_arn}/*"
+      ]
+    }
   }
 
   allowed_triggers = {
@@ -177,8 +193,9 @@ module "lambda_program_week" {
   ]
 
   environment_variables = {
-    DATA_TABLE    = aws_dynamodb_table.main.name
-    CONFIG_BUCKET = module.config_s3_bucket.s3_bucket_id
+    DATA_TABLE        = aws_dynamodb_table.main.name
+    CONFIG_BUCKET     = module.config_s3_bucket.s3_bucket_id
+    METRICS_NAMESPACE = var.project
   }
 
   attach_policy_statements = true
@@ -187,6 +204,7 @@ module "lambda_program_week" {
       effect = "Allow"
       actions = [
         "dynamodb:GetItem",
+        "dynamodb:BatchGetItem",
         "dynamodb:Query"
       ]
       resources = [aws_dynamodb_table.main.arn]
@@ -0,0 +1,156 @@
+module "lambda_events" {
+  source  = "terraform-aws-modules/lambda/aws"
+  version = "~> 8.1"
+
+  function_name = "${var.project}_events"
+  description   = "Derived data (progress, strength percentiles, pre-rendered weeks) from table streams for Styrkr"
+  handler       = "handler.handler"
+  publish       = true
+  runtime       = "python3.13"
+  timeout       = 60
+  memory_size   = 256
+
+  environment_variables = {
+    DATA_TABLE        = aws_dynamodb_table.main.name
+    WORKOUT_TABLE     = aws_dynamodb_table.workout_history.name
+    CONFIG_BUCKET     = module.config_s3_bucket.s3_bucket_id
+    METRICS_NAMESPACE = var.project
+  }
+
+  source_path = [
+    {
+      path = "${path.module}/lambdas/events"
+      patterns = [
+        "!.*/.*",
+        "handler\\.py$"
+      ]
+    },
+    {
+      path          = "${path.module}/lambdas/shared"
+      prefix_in_zip = "shared"
+      patterns = [
+        "!.*/.*",
+        ".*\\.py$"
+      ]
+    }
+  ]
+
+  # Batches of up to 100 records (or 5s), retried from the first failed
+  # record; the handler reports it via ReportBatchItemFailures. Records
+  # still failing after the retries are sent to the failed-events queue
+  # (as stream pointers) instead of being dropped
+  event_source_mapping = {
+    workouts = {
+      event_source_arn                   = aws_dynamodb_table.workout_history.stream_arn
+      starting_position                  = "LATEST"
+      batch_size                         = 100
+      maximum_batching_window_in_seconds = 5
+      maximum_retry_attempts             = 10
+      bisect_batch_on_function_error     = true
+      function_response_types            = ["ReportBatchItemFailures"]
+      destination_arn_on_failure         = aws_sqs_queue.events_failed.arn
+      filter_criteria = [
+        {
+          pattern = jsonencode({ eventName = ["INSERT", "MODIFY"] })
+        }
+      ]
+    }
+    data = {
+      event_source_arn                   = aws_dynamodb_table.main.stream_arn
+      starting_position                  = "LATEST"
+      batch_size                         = 100
+      maximum_batching_window_in_seconds = 5
+      maximum_retry_attempts             = 10
+      bisect_batch_on_function_error     = true
+      function_response_types            = ["ReportBatchItemFailures"]
+      destination_arn_on_failure         = aws_sqs_queue.events_failed.arn
+      filter_criteria = [
+        {
+          pattern = jsonencode({ dynamodb = { Keys = { dataType = { S = ["STRENGTH", "PROGRESS"] } } } })
+        }
+      ]
+    }
+  }
+
+  attach_policies    = true
+  number_of_policies = 2
+  policies = [
+    "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole",
+    aws_iam_policy.lambda_events.arn
+  ]
+
+  cloudwatch_logs_retention_in_days = 7
+
+  tags = var.tags
+}
+
+# Stream batches the events Lambda gave up on (shard, sequence range,
+# failure reason); replay them from the stream while it retains them (24h)
+resource "aws_sqs_queue" "events_failed" {
+  name                      = "${var.project}_events_failed"
+  message_retention_seconds = 1209600
+  sqs_managed_sse_enabled   = true
+
+  tags = var.tags
+}
+
+resource "aws_iam_policy" "lambda_events" {
+  name        = "${var.project}_lambda_events"
+  description = "IAM policy for the events Lambda to read table streams and write derived data"
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:DescribeStream",
+          "dynamodb:GetRecords",
+          "dynamodb:GetShardIterator",
+          "dynamodb:ListStreams"
+        ]
+        Resource = [
+          aws_dynamodb_table.main.stream_arn,
+          aws_dynamodb_table.workout_history.stream_arn
+        ]
+      },
+      {
+        # PROGRESS, percentile shards, pre-rendered weeks, processed-event markers
+        Effect = "Allow"
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:PutItem",
+          "dynamodb:UpdateItem",
+          "dynamodb:Query",
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem"
+        ]
+        Resource = [
+          aws_dynamodb_table.main.arn
+        ]
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "sqs:SendMessage"
+        ]
+        Resource = [
+          aws_sqs_queue.events_failed.arn
+        ]
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "s3:GetObject",
+          "s3:ListBucket"
+        ]
+        Resource = [
+          module.config_s3_bucket.s3_bucket_arn,
+          "${module.config_s3_bucket.s3_bucket_arn}/*"
+        ]
+      }
+    ]
+  })
+
+  tags = var.tags
+}
@@ -0,0 +1,85 @@
+module "lambda_export" {
+  source  = "terraform-aws-modules/lambda/aws"
+  version = "~> 8.1"
+
+  function_name = "${var.project}_export"
+  description   = "Program and workout history export (iCalendar / CSV) for Styrkr"
+  handler       = "handler.handler"
+  publish       = true
+  runtime       = "python3.13"
+  timeout       = 30
+  memory_size   = 512
+
+  environment_variables = {
+    DATA_TABLE    = aws_dynamodb_table.main.name
+    WORKOUT_TABLE = aws_dynamodb_table.workout_history.name
+    CONFIG_BUCKET = module.config_s3_bucket.s3_bucket_id
+    EXPORT_BUCKET = module.exports_s3_bucket.s3_bucket_id
+  }
+
+  source_path = [
+    {
+      path = "${path.module}/lambdas/export"
+      patterns = [
+        "!.*/.*",
+        "handler\\.py$"
+      ]
+    },
+    {
+      path          = "${path.module}/lambdas/shared"
+      prefix_in_zip = "shared"
+      patterns = [
+        "!.*/.*",
+        ".*\\.py$"
+      ]
+    }
+  ]
+
+  attach_policy_statements = true
+  policy_statements = {
+    dynamodb = {
+      effect = "Allow"
+      actions = [
+        "dynamodb:Query"
+      ]
+      resources = [
+        aws_dynamodb_table.main.arn,
+        aws_dynamodb_table.workout_history.arn
+      ]
+    }
+    s3_read = {
+      effect = "Allow"
+      actions = [
+        "s3:GetObject",
+        "s3:ListBucket"
+      ]
+      resources = [
+        module.config_s3_bucket.s3_bucket_arn,
+        "${module.config_s3_bucket.s3_bucket_arn}/*"
+      ]
+    }
+    # Multipart upload of the export; GetObject signs the download URL
+    s3_exports = {
+      effect = "Allow"
+      actions = [
+        "s3:PutObject",
+        "s3:GetObject",
+        "s3:AbortMultipartUpload"
+      ]
+      resources = [
+        "${module.exports_s3_bucket.s3_bucket_arn}/exports/*"
+      ]
+    }
+  }
+
+  allowed_triggers = {
+    AllowExecutionFromAPIGateway = {
+      service    = "apigateway"
+      source_arn = "${module.api_gateway.api_execution_arn}/*/*"
+    }
+  }
+
+  cloudwatch_logs_retention_in_days = 7
+
+  tags = var.tags
+}
@@ -71,6 +71,17 @@ resource "aws_iam_policy" "lambda_workout_dynamodb" {
           aws_dynamodb_table.workout_history.arn,
           "${aws_dynamodb_table.workout_history.arn}/index/*"
         ]
+      },
+      {
+        # PROGRAM_SETTINGS (the unit workouts are logged in)
+        Effect = "Allow"
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:Query"
+        ]
+        Resource = [
+          aws_dynamodb_table.main.arn
+        ]
       }
     ]
   })
@@ -0,0 +1,117 @@
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.handler_utils import handle_request
+from shared.progress import clean_progress
+from shared.request_context import RequestContext
+from shared.response import error_response, success_response
+from shared.s3_config import (
+    get_app_config_with_etag, get_program_template_key, prefetch_app_configs, CONFIG_KEYS, EXERCISES_KEY,
+    MANIFEST_KEY
+)
+from shared import logger
+
+# Response section -> dataType of the user item
+USER_SECTIONS = {
+    'profile': 'PROFILE',
+    'strength': 'STRENGTH',
+    'schedule': 'SCHEDULE',
+    'programSettings': 'PROGRAM_SETTINGS',
+    'progress': 'PROGRESS'
+}
+
+# Response section -> query param carrying the client's cached ETag
+CONFIG_SECTIONS = {
+    'template': 'templateEtag',
+    'exercises': 'exercisesEtag'
+}
+
+# Load config documents during init rather than on the first request
+prefetch_app_configs(CONFIG_KEYS + (MANIFEST_KEY,))
+
+def parse_fields(query_params: dict) -> list:
+    """Resolve the requested sections from ?fields=a,b,c (default: all)."""
+    fields = query_params.get('fields')
+    if not fields:
+        return list(USER_SECTIONS) + list(CONFIG_SECTIONS)
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+def clean_user_item(section: str, item: dict | None) -> dict | None:
+    if section == 'progress':
+        # Users who have not logged a session yet are at week 1
+        return clean_progress(item)
+    if not item:
+        return None
+
+    item.pop('userEmail', None)
+    item.pop('dataType', None)
+
+    if section == 'profile':
+        # Match GET /profile output
+        item.pop('constraints', None)
+        item.pop('movementCapabilities', None)
+        if 'trainingDaysPerWeek' in item:
+            item['trainingDaysPerWeek'] = int(item['trainingDaysPerWeek'])
+
+    return item
+
+def template_key_for(settings: dict | None) -> str:
+    """Template of the user's program, or the manifest default if unset or no longer published."""
+    return get_program_template_key((settings or {}).get('programId')) or get_program_template_key()
+
+def fetch_config_section(s3_key: str, client_etag: str | None) -> dict:
+    data, etag = get_app_config_with_etag(s3_key)
+    if client_etag and etag and client_etag == etag:
+        return {'etag': etag, 'notModified': True}
+    return {'etag': etag, 'notModified': False, 'data': data}
+
+def get_bootstrap(ctx: RequestContext, query_params: dict, request_id: str, event: dict) -> dict:
+    try:
+        query_params = query_params or {}
+        fields = parse_fields(query_params)
+
+        unknown = [field for field in fields if field not in USER_SECTIONS and field not in CONFIG_SECTIONS]
+        if unknown:
+            return error_response(400, 'VALIDATION_ERROR', f"Unknown fields: {', '.join(unknown)}", request_id)
+
+        user_sections = [field for field in fields if field in USER_SECTIONS]
+        config_sections = [field for field in fields if field in CONFIG_SECTIONS]
+        data_types = [USER_SECTIONS[section] for section in user_sections]
+        # The template follows the program in the user's settings
+        if 'template' in config_sections and 'PROGRAM_SETTINGS' not in data_types:
+            data_types.append('PROGRAM_SETTINGS')
+
+        # One Query for user items alongside the exercise library fetch
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            items_future = pool.submit(ctx.load, data_types) if data_types else None
+            exercises_future = pool.submit(
+                fetch_config_section, EXERCISES_KEY, query_params.get(CONFIG_SECTIONS['exercises'])
+            ) if 'exercises' in config_sections else None
+            items = items_future.result() if items_future else {}
+            result = {'exercises': exercises_future.result()} if exercises_future else {}
+
+        if 'template' in config_sections:
+            result['template'] = fetch_config_section(
+                template_key_for(items.get('PROGRAM_SETTINGS')), query_params.get(CONFIG_SECTIONS['template'])
+            )
+
+        for section in user_sections:
+            result[section] = clean_user_item(section, items.get(USER_SECTIONS[section]))
+
+        return success_response(200, result)
+    except Exception:
+        logger.exception("Error bootstrapping")
+        return error_response(500, 'INTERNAL', 'Internal server error', request_id)
+
+def handler(event, context):
+    """
+    Return all user state and config needed for app launch in one request.
+
+    Routes:
+    - GET /bootstrap?fields=profile,strength,schedule,programSettings,template,exercises
+                    &templateEtag=...&exercisesEtag=...
+    """
+    return handle_request(event, context, get_handler=get_bootstrap)
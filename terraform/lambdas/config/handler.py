@@ -1,60 +1,126 @@
-import json
 import sys
 import os
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from shared.response import success_response, error_response
-from shared.s3_config import get_app_config
+from shared.handler_utils import handle_request, etag_matches, PUBLIC_MIDDLEWARE
+from shared.request_context import RequestContext
+from shared.response import success_response, error_response, not_modified_response
+from shared.s3_config import (
+    get_app_config_with_etag, get_app_config_version, get_program_template_key, prefetch_app_configs,
+    CONFIG_KEYS, EXERCISES_KEY, MANIFEST_KEY
+)
+from shared.exercise_index import normalize_query, query_etag, query_exercises
+from shared.config_delta import get_exercise_library_delta, parse_document_version
+from shared import logger
 
-def get_template(request_id: str) -> dict:
-    """Get program template from S3 (no auth required)."""
+# Load config documents during init rather than on the first request
+prefetch_app_configs(CONFIG_KEYS + (MANIFEST_KEY,))
+
+def get_template(ctx: RequestContext) -> dict:
+    """Get a program's template from S3 (?programId=, default: the manifest default; no auth required)."""
+    request_id = ctx.request_id
     try:
-        template = get_app_config('config/plan.template.json')
-        return success_response(200, template)
-    except Exception as e:
-        print(f"Error fetching template: {e}")
-        import traceback
-        traceback.print_exc()
+        program_id = ctx.query_params.get('programId')
+        template_key = get_program_template_key(program_id)
+        if not template_key:
+            return error_response(404, 'NOT_FOUND', f"Program {program_id} not found", request_id)
+        
+        template, etag = get_app_config_with_etag(template_key)
+        if etag_matches(ctx.header('if-none-match'), etag):
+            return not_modified_response(etag)
+        return success_response(200, template, {'ETag': etag} if etag else None)
+    except Exception:
+        logger.exception("Error fetching template")
         return error_response(500, 'INTERNAL', 'Failed to fetch program template', request_id)
 
-def get_exercises(request_id: str) -> dict:
-    """Get exercise library from S3 (no auth required)."""
-    try:
-        exercises = get_app_config('config/exercises.latest.json')
-        return success_response(200, exercises)
-    except Exception as e:
-        print(f"Error fetching exercises: {e}")
-        import traceback
-        traceback.print_exc()
-        return error_response(500, 'INTERNAL', 'Failed to fetch exercise library', request_id)
+def get_exercises_delta(ctx: RequestContext, since_version: str) -> dict:
+    """Changes to the exercise library since a version the client already has."""
+    request_id = ctx.request_id
+    from_version = parse_document_version(since_version)
+    if from_version is None:
+        return error_response(400, 'VALIDATION_ERROR', 'sinceVersion must be a positive integer', request_id)
+    
+    exercises, library_etag = get_app_config_with_etag(EXERCISES_KEY)
+    
+    etag = query_etag(library_etag, ('sinceVersion', from_version))
+    if etag_matches(ctx.header('if-none-match'), etag):
+        return not_modified_response(etag)
+    
+    previous = None
+    if from_version == exercises.get('version'):
+        previous = exercises
+    elif from_version < exercises.get('version', 0):
+        # Versions only increase, so anything newer than the live library never existed
+        previous = get_app_config_version(EXERCISES_KEY, from_version)
+    if previous is None:
+        # Client should fall back to a full download
+        return error_response(404, 'NOT_FOUND', f"Exercise library version {since_version} is not available", request_id)
+    
+    return success_response(200, get_exercise_library_delta(previous, exercises), {'ETag': etag})
 
-def handler(event, context):
+def get_exercises(ctx: RequestContext) -> dict:
     """
-    Handle public config endpoints (no authentication required).
+    Get the exercise library, or the subset matching a query (no auth required).
     
-    Routes:
-    - GET /program/template
-    - GET /exercises
+    Query params (all optional, comma-separated lists):
+    - slot: Template slotId or library slotTag
+    - equipment: Match exercises using any of these
+    - excludeConstraints: Drop exercises blocked by any of these
+    - fields: Project each exercise to these fields (exerciseId is always kept)
+    
+    Without params the full library is returned, as before. sinceVersion=N
+    returns a delta from version N instead (see shared/config_delta.py) and
+    cannot be combined with the other params.
     """
+    request_id = ctx.request_id
     try:
-        request_id = context.aws_request_id
-        path = event.get('rawPath', '')
-        method = event['requestContext']['http']['method']
+        query_params = ctx.query_params
+        query = normalize_query(query_params)
         
-        print(f"Config request: {method} {path}")
+        if query_params.get('sinceVersion'):
+            if any(query):
+                return error_response(400, 'VALIDATION_ERROR', 'sinceVersion cannot be combined with other filters', request_id)
+            return get_exercises_delta(ctx, query_params['sinceVersion'])
         
-        if method == 'GET' and path == '/program/template':
-            return get_template(request_id)
+        exercises, library_etag = get_app_config_with_etag(EXERCISES_KEY)
         
-        if method == 'GET' and path == '/exercises':
-            return get_exercises(request_id)
+        if not any(query):
+            if etag_matches(ctx.header('if-none-match'), library_etag):
+                return not_modified_response(library_etag)
+            return success_response(200, exercises, {'ETag': library_etag} if library_etag else None)
         
-        return error_response(404, 'NOT_FOUND', 'Endpoint not found', request_id)
+        etag = query_etag(library_etag, query)
+        if etag_matches(ctx.header('if-none-match'), etag):
+            return not_modified_response(etag)
+        
+        try:
+            result = query_exercises(exercises, query)
+        except ValueError as e:
+            return error_response(400, 'VALIDATION_ERROR', str(e), request_id)
+        
+        return success_response(200, result, {'ETag': etag})
+    except Exception:
+        logger.exception("Error fetching exercises")
+        return error_response(500, 'INTERNAL', 'Failed to fetch exercise library', request_id)
+
+def get_config(ctx: RequestContext, query_params: dict, request_id: str, event: dict) -> dict:
+    logger.debug('Config request %s %s', ctx.method, ctx.path)
+    
+    if ctx.path == '/program/template':
+        return get_template(ctx)
+    
+    if ctx.path == '/exercises':
+        return get_exercises(ctx)
     
-    except Exception as e:
-        print(f"Handler error: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return error_response(500, 'INTERNAL', 'Internal server error', context.aws_request_id)
+    return error_response(404, 'NOT_FOUND', 'Endpoint not found', request_id)
 
+def handler(event, context):
+    """
+    Handle public config endpoints (no authentication required).
+    
+    Routes:
+    - GET /program/template[?programId=]
+    - GET /exercises[?slot=&equipment=&excludeConstraints=&fields=]
+    """
+    return handle_request(event, context, get_handler=get_config, middleware=PUBLIC_MIDDLEWARE)
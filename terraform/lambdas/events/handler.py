@@ -0,0 +1,105 @@
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.dynamodb import load_user_state_for, MIGRATED_FROM_ATTR
+from shared.events import process_records
+from shared.jwt_validator import USER_KEY_PREFIX, is_unified_user_key
+from shared.progress import record_session, DATA_TYPE as PROGRESS_DATA_TYPE
+from shared.s3_config import get_app_config, get_program, prefetch_app_configs, EXERCISES_KEY, MANIFEST_KEY
+from shared.strength_percentiles import record_strength
+from shared.unit_conversion import is_conversion_write
+from shared.week_render import RENDER_DATA_TYPES, render_fingerprint, render_state, store_render
+from shared.workout_archive import is_archive_key
+from shared import logger
+
+WORKOUT_TABLE = os.environ['WORKOUT_TABLE']
+
+WORKOUT_LOGGED = 'WorkoutLogged'
+STRENGTH_UPDATED = 'StrengthUpdated'
+WEEK_ADVANCED = 'WeekAdvanced'
+
+# Progress needs the program's weekly sessions and cycle length; pre-rendering
+# the next week also needs the exercise library
+prefetch_app_configs((MANIFEST_KEY, EXERCISES_KEY), default_program=True)
+
+def classify(table: str, event_name: str, new: dict | None, old: dict | None) -> str | None:
+    """Event type for a stream record of either table, or None to skip it."""
+    if event_name == 'REMOVE' or not new or not is_unified_user_key(new['userEmail']):
+        return None
+    # Copies made by the user key migration replay history that already happened
+    if new.get(MIGRATED_FROM_ATTR) and new.get(MIGRATED_FROM_ATTR) != (old or {}).get(MIGRATED_FROM_ATTR):
+        return None
+    if table == WORKOUT_TABLE:
+        if is_archive_key(new['workoutDate']):
+            return None
+        # Re-saves, compaction and unit conversion rewrite workouts; only a new session counts
+        if old and old.get('sessionId') == new.get('sessionId'):
+            return None
+        return WORKOUT_LOGGED
+    if new.get('dataType') == 'STRENGTH':
+        # Converted maxes are the same lifts in another unit, not new ones
+        if is_conversion_write(new, old):
+            return None
+        return STRENGTH_UPDATED
+    if new.get('dataType') == PROGRESS_DATA_TYPE and old and old.get('programWeek') != new.get('programWeek'):
+        return WEEK_ADVANCED
+    return None
+
+def user_context_for(event: dict) -> dict:
+    return {'userId': event['userKey'][len(USER_KEY_PREFIX):], 'email': event['new'].get('email')}
+
+def on_workout_logged(event: dict):
+    """Advance the user's floating week (idempotent per sessionId)."""
+    workout = event['new']
+    user_context = user_context_for(event)
+    settings = load_user_state_for(user_context, ['PROGRAM_SETTINGS']).get('PROGRAM_SETTINGS') or {}
+    record_session(
+        event['userKey'], user_context['userId'], workout['sessionId'],
+        int(workout['programWeek']) if workout.get('programWeek') else None,
+        get_program(settings.get('programId')),
+        workout.get('createdAt') or datetime.utcnow().isoformat() + 'Z'
+    )
+
+def on_strength_updated(event: dict):
+    """Add changed maxes to the population percentile sketches."""
+    record_strength(event['new'], event['old'])
+
+def on_week_advanced(event: dict):
+    """
+    Pre-render the week the user just moved into.
+
+    Completing a week is almost always followed by GET /program/week for
+    the next one, which then finds it in the render store. Best effort:
+    a failed pre-render only means that request renders inline, so it is
+    logged rather than failing (and retrying) the stream batch.
+    """
+    week_index = int(event['new']['programWeek'])
+    try:
+        state = load_user_state_for(user_context_for(event), RENDER_DATA_TYPES)
+        exercise_library = get_app_config(EXERCISES_KEY)
+        result, error = render_state(state, exercise_library, week_index)
+        if error:
+            logger.info('Skipped pre-render', weekIndex=week_index, reason=error[2])
+            return
+        store_render(event['userKey'], week_index, render_fingerprint(state, exercise_library), result)
+    except Exception:
+        logger.exception("Error pre-rendering week", weekIndex=week_index)
+
+CONSUMERS = {
+    WORKOUT_LOGGED: on_workout_logged,
+    STRENGTH_UPDATED: on_strength_updated,
+    WEEK_ADVANCED: on_week_advanced
+}
+
+def handler(event, context):
+    """
+    Consume DynamoDB Streams batches from the data and workout history tables.
+
+    Returns batchItemFailures so a failed record (and the records after it)
+    are retried without redoing the rest of the batch.
+    """
+    logger.start_request(getattr(context, 'aws_request_id', None) or 'local')
+    return process_records(event.get('Records', []), classify, CONSUMERS)
@@ -0,0 +1,108 @@
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import chain
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.aws_clients import get_resource
+from shared.dynamodb import LEGACY_KEY_READS
+from shared.export import (
+    csv_lines, download_url, gzip_parts, ics_lines, plan_entries, plan_weeks, upload_parts, workout_entries
+)
+from shared.handler_utils import handle_request
+from shared.jwt_validator import get_legacy_user_key
+from shared.plate_loading import get_loading_params
+from shared.request_context import RequestContext
+from shared.response import error_response, success_response
+from shared.s3_config import get_app_config, prefetch_app_configs, EXERCISES_KEY, MANIFEST_KEY
+from shared.week_render import RENDER_DATA_TYPES, load_program
+from shared.workout_archive import iter_workouts
+from shared import logger
+
+EXPORT_BUCKET = os.environ['EXPORT_BUCKET']
+# Download links stay valid this long; the bucket expires objects after a day
+URL_EXPIRES_SECONDS = int(os.environ.get('EXPORT_URL_EXPIRES_SECONDS', '900'))
+
+# format -> (Content-Type, entries -> text lines)
+FORMATS = {
+    'ics': ('text/calendar; charset=utf-8', ics_lines),
+    'csv': ('text/csv; charset=utf-8', csv_lines)
+}
+
+workout_table = get_resource('dynamodb').Table(os.environ['WORKOUT_TABLE'])
+
+# Load config documents during init rather than on the first request
+prefetch_app_configs((MANIFEST_KEY, EXERCISES_KEY), default_program=True)
+
+def get_export(ctx: RequestContext, query_params: dict, request_id: str, event: dict) -> dict:
+    """
+    Export the macrocycle and the full workout history as iCalendar or CSV.
+    
+    The document is generated and gzipped incrementally into an S3 multipart
+    upload, so memory does not grow with the history; the response carries
+    a short-lived download link.
+    """
+    try:
+        export_format = query_params.get('format', 'ics')
+        if export_format not in FORMATS:
+            return error_response(400, 'VALIDATION_ERROR', f"format must be one of: {', '.join(FORMATS)}", request_id)
+        
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            state_future = pool.submit(ctx.load, RENDER_DATA_TYPES + ['SCHEDULE'])
+            exercises_future = pool.submit(get_app_config, EXERCISES_KEY)
+            state = state_future.result()
+            exercise_library = exercises_future.result()
+        
+        if not state.get('STRENGTH'):
+            return error_response(404, 'NOT_FOUND', 'Strength data not found. Please enter your 1RMs.', request_id)
+        
+        settings = state.get('PROGRAM_SETTINGS')
+        if not settings:
+            return error_response(404, 'NOT_FOUND', 'Program settings not found', request_id)
+        
+        program = load_program(settings)
+        if not program:
+            return error_response(404, 'NOT_FOUND', f"Program {settings['programId']} not found", request_id)
+        
+        unit = get_loading_params(settings)[0]
+        partition_keys = [ctx.user_key]
+        if LEGACY_KEY_READS and ctx.email:
+            partition_keys.append(get_legacy_user_key(ctx.email))
+        
+        now = datetime.utcnow()
+        entries = chain(
+            plan_entries(plan_weeks(state, program, exercise_library, now.date()), program, unit),
+            workout_entries(iter_workouts(workout_table, partition_keys), program, unit)
+        )
+        content_type, to_lines = FORMATS[export_format]
+        key = f"exports/{ctx.user_id}/{now.strftime('%Y%m%dT%H%M%S')}-{request_id}.{export_format}"
+        
+        with ctx.timed('export'):
+            size = upload_parts(
+                gzip_parts(to_lines(entries)), EXPORT_BUCKET, key,
+                ContentType=content_type,
+                ContentEncoding='gzip',
+                ContentDisposition=f'attachment; filename="styrkr-{now.strftime("%Y-%m-%d")}.{export_format}"'
+            )
+        
+        return success_response(200, {
+            'format': export_format,
+            'url': download_url(EXPORT_BUCKET, key, URL_EXPIRES_SECONDS),
+            'expiresIn': URL_EXPIRES_SECONDS,
+            'bytes': size
+        }, headers={'Cache-Control': 'no-store'})
+    
+    except Exception:
+        logger.exception("Error exporting")
+        return error_response(500, 'INTERNAL', 'Internal server error', request_id)
+
+def handler(event, context):
+    """
+    Handle program and history export (requires authentication).
+
+    Routes:
+    - GET /export?format=ics|csv
+    """
+    return handle_request(event, context, get_handler=get_export)
@@ -1,43 +1,44 @@
-import json
 import sys
 import os
 from datetime import datetime
-import boto3
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from shared.aws_clients import get_resource
 from shared.response import success_response, error_response
-from shared.jwt_validator import validate_user_context, get_dynamodb_user_key
+from shared.request_context import RequestContext
 from shared.utils import convert_floats_to_decimals
+from shared.weights import is_weight, to_stored, to_units
+from shared.handler_utils import handle_request
+from shared.s3_config import get_program_entry, get_program_manifest, prefetch_app_configs, MANIFEST_KEY
+from shared import logger
 
-dynamodb = boto3.resource('dynamodb')
+dynamodb = get_resource('dynamodb')
 table_name = os.environ['DATA_TABLE']
 data_table = dynamodb.Table(table_name)
 
-def get_settings(user_id: str, request_id: str) -> dict:
+prefetch_app_configs((MANIFEST_KEY,))
+
+def get_settings(ctx: RequestContext, query_params: dict, request_id: str, event: dict) -> dict:
     """Get program settings for user."""
+    request_id = ctx.request_id
     try:
-        pk = get_dynamodb_user_key(user_id)
-        
-        response = data_table.get_item(
-            Key={'userEmail': pk, 'dataType': 'PROGRAM_SETTINGS'}
-        )
+        settings = ctx.get('PROGRAM_SETTINGS')
         
-        if 'Item' not in response:
+        if not settings:
             return error_response(404, 'NOT_FOUND', 'Program settings not found', request_id)
         
-        return success_response(200, response['Item'])
+        return success_response(200, settings)
     
-    except Exception as e:
-        print(f"Error getting settings: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error getting settings")
         return error_response(500, 'INTERNAL', 'Internal server error', request_id)
 
-def save_settings(user_id: str, body: dict, request_id: str) -> dict:
+def save_settings(ctx: RequestContext, body: dict, request_id: str, event: dict) -> dict:
     """Save program settings for user."""
+    request_id = ctx.request_id
     try:
-        pk = get_dynamodb_user_key(user_id)
+        pk = ctx.user_key
         now = datetime.utcnow().isoformat() + 'Z'
         
         # Required fields
@@ -46,6 +47,13 @@ def save_settings(user_id: str, body: dict, request_id: str) -> dict:
             if field not in body:
                 return error_response(400, 'VALIDATION_ERROR', f'Missing required field: {field}', request_id)
         
+        # Weights are rounded to hundredths of a unit when stored below
+        weights = [body.get('rounding', 5), *(body.get('availablePlates') or [])]
+        if body.get('barWeight') is not None:
+            weights.append(body['barWeight'])
+        if not all(is_weight(weight) for weight in weights):
+            return error_response(400, 'VALIDATION_ERROR', 'rounding, barWeight and availablePlates must be positive numbers', request_id)
+        
         settings = {
             'userEmail': pk,
             'dataType': 'PROGRAM_SETTINGS',
@@ -56,27 +64,37 @@ def save_settings(user_id: str, body: dict, request_id: str) -> dict:
             'conditioningLevel': body.get('conditioningLevel', 'moderate'),
             'equipment': body.get('equipment', []),
             'constraints': body.get('constraints', []),
-            'rounding': body.get('rounding', 5),
+            'rounding': to_stored(to_units(body.get('rounding', 5))),
             'tmPercent': body.get('tmPercent', 85),
             'exercisePreferences': convert_floats_to_decimals(body.get('exercisePreferences', {})),
             'updatedAt': now
         }
         
+        # Optional plate-loading overrides (defaults follow preferredUnits)
+        if body.get('barWeight') is not None:
+            settings['barWeight'] = to_stored(to_units(body['barWeight']))
+        if body.get('availablePlates'):
+            settings['availablePlates'] = [to_stored(to_units(plate)) for plate in body['availablePlates']]
+        
         # Add createdAt if new
-        existing = data_table.get_item(
-            Key={'userEmail': pk, 'dataType': 'PROGRAM_SETTINGS'}
-        )
-        if 'Item' not in existing:
-            settings['createdAt'] = now
+        existing = ctx.get('PROGRAM_SETTINGS')
+        settings['createdAt'] = existing.get('createdAt', now) if existing else now
+        
+        # Keep the current program unless the client picks another published one
+        if body.get('programId'):
+            if not get_program_entry(body['programId']):
+                return error_response(400, 'VALIDATION_ERROR', f"Unknown programId: {body['programId']}", request_id)
+            settings['programId'] = body['programId']
+        else:
+            settings['programId'] = (existing or {}).get('programId') or get_program_manifest()['defaultProgramId']
         
         data_table.put_item(Item=settings)
+        ctx.remember(settings)
         
         return success_response(200, settings)
     
-    except Exception as e:
-        print(f"Error saving settings: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error saving settings")
         return error_response(500, 'INTERNAL', 'Internal server error', request_id)
 
 def handler(event, context):
@@ -87,29 +105,4 @@ def handler(event, context):
     - GET /program/settings
     - POST /program/settings
     """
-    try:
-        request_id = context.aws_request_id
-        method = event['requestContext']['http']['method']
-        
-        # Validate JWT and extract user context
-        try:
-            user_context = validate_user_context(event)
-            user_id = user_context['userId']
-        except ValueError as e:
-            return error_response(403, 'FORBIDDEN', str(e), request_id)
-        
-        if method == 'GET':
-            return get_settings(user_id, request_id)
-        
-        if method == 'POST':
-            body = json.loads(event.get('body', '{}'))
-            return save_settings(user_id, body, request_id)
-        
-        return error_response(405, 'METHOD_NOT_ALLOWED', 'Method not allowed', request_id)
-    
-    except Exception as e:
-        print(f"Handler error: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return error_response(500, 'INTERNAL', 'Internal server error', context.aws_request_id)
-
+    return handle_request(event, context, get_handler=get_settings, post_handler=save_settings)
@@ -1,275 +1,172 @@
 import json
 import sys
 import os
-from datetime import datetime, timedelta
-import boto3
-import random
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from shared.dynamodb import batch_get_items
+from shared.jwt_validator import get_dynamodb_user_key
 from shared.response import success_response, error_response
-from shared.jwt_validator import validate_user_context, get_dynamodb_user_key
-from shared.s3_config import get_app_config
+from shared.s3_config import get_app_config, prefetch_app_configs, EXERCISES_KEY, MANIFEST_KEY
+from shared.request_context import RequestContext
+from shared.handler_utils import handle_request
+from shared.nonlift_workouts import generate_nonlift_workout
+from shared.week_render import (
+    RENDER_DATA_TYPES, build_week, get_week_days, load_program, load_render, render_fingerprint, render_state,
+    resolve_week_index
+)
+from shared import logger, metrics
 
-dynamodb = boto3.resource('dynamodb')
-table_name = os.environ['DATA_TABLE']
-data_table = dynamodb.Table(table_name)
+# Load config documents during init rather than on the first request
+prefetch_app_configs((MANIFEST_KEY, EXERCISES_KEY), default_program=True)
 
-def get_user_strength_data(user_id: str):
-    """Get user's 1RMs from DynamoDB."""
-    pk = get_dynamodb_user_key(user_id)
-    response = data_table.get_item(
-        Key={'userEmail': pk, 'dataType': 'STRENGTH'}
-    )
-    return response.get('Item')
+# Concurrent batch_get_item chunks in render_weeks_batch
+BATCH_GET_WORKERS = 8
 
-def get_user_settings(user_id: str):
-    """Get user's program settings from DynamoDB."""
-    pk = get_dynamodb_user_key(user_id)
-    response = data_table.get_item(
-        Key={'userEmail': pk, 'dataType': 'PROGRAM_SETTINGS'}
-    )
-    return response.get('Item')
-
-def calculate_training_max(one_rm: float, tm_percent: int) -> float:
-    """Calculate training max from 1RM."""
-    return one_rm * (tm_percent / 100.0)
-
-def round_weight(weight: float, rounding: int) -> float:
-    """Round weight to nearest rounding increment."""
-    return round(weight / rounding) * rounding
-
-def compute_work_sets(set_scheme: dict, training_max: float, rounding: int):
-    """Compute work sets from set scheme and training max."""
-    sets = []
-    for work_set in set_scheme['workSets']:
-        weight = training_max * work_set['pctTM']
-        rounded_weight = round_weight(weight, rounding)
-        sets.append({
-            'weight': rounded_weight,
-            'targetReps': work_set['reps'],
-            'pctTM': work_set['pctTM']
-        })
-    return sets
-
-def get_phase_for_week(week_index: int, template: dict):
-    """Determine which phase a week belongs to."""
-    for phase in template['macrocycle']['phases']:
-        if week_index in phase['weeks']:
-            return phase
-    return None
+def render_week(ctx: RequestContext, query_params: dict) -> dict:
+    """Render a specific week's sessions."""
+    request_id = ctx.request_id
+    try:
+        # Get user data (one Query for all items)
+        state = ctx.load(RENDER_DATA_TYPES)
+        week_index = resolve_week_index(query_params, state)
+        exercise_library = get_app_config(EXERCISES_KEY)
+        
+        # The current week may have been pre-rendered when the last one was completed
+        if week_index == resolve_week_index({}, state) and state.get('STRENGTH') and state.get('PROGRAM_SETTINGS'):
+            fingerprint = render_fingerprint(state, exercise_library)
+            with ctx.timed('render_store'):
+                result, outcome = load_render(ctx.user_key, week_index, fingerprint)
+            metrics.emit('Render store', {'Endpoint': 'program_week'}, {
+                'RenderHit': int(outcome == 'hit'),
+                'RenderMiss': int(outcome == 'miss'),
+                'RenderStale': int(outcome == 'stale')
+            })
+            if result:
+                return success_response(200, result)
+        
+        result, error = render_state(state, exercise_library, week_index)
+        if error:
+            return error_response(*error, request_id)
+        
+        return success_response(200, result)
+    
+    except Exception:
+        logger.exception("Error rendering week")
+        return error_response(500, 'INTERNAL', 'Internal server error', request_id)
 
-def select_exercises_for_slots(slots: list, exercises: list, constraints: list, equipment: list, used_exercises: set):
+def render_weeks_batch(user_ids: list, week_index: int | None = None) -> dict:
     """
-    Select exercises for assistance slots.
+    Render a week for many users at once (e.g. a coach or gym view).
+    
+    User items are read with chunked batch_get_item (100 keys per call,
+    chunks in parallel) instead of one Query per user. Every user on the
+    same program renders off one compiled program, and the exercise
+    library and its candidate pools are shared across the batch.
+    Only USER#<sub> items are read; there is no legacy email fallback.
     
     Args:
-        slots: List of assistance slot definitions
-        exercises: Exercise library
-        constraints: User constraints (e.g., 'knee_issue')
-        equipment: Available equipment
-        used_exercises: Set of already-used exercise IDs (for oneExercisePerSlot)
+        user_ids: Cognito subs
+        week_index: Week to render (default: each user's current week)
     
     Returns:
-        Dict mapping slotId to selected exercise
+        Dict of userId -> rendered week, or {'error': {'code', 'message'}}
     """
-    selected = {}
-    
-    for slot in slots:
-        slot_id = slot['slotId']
-        
-        # Filter exercises by slot tag
-        candidates = [
-            ex for ex in exercises
-            if slot_id in ex.get('slotTags', [])
-        ]
-        
-        # Filter by constraints
-        candidates = [
-            ex for ex in candidates
-            if not any(c in ex.get('constraintsBlocked', []) for c in constraints)
-        ]
-        
-        # Filter by equipment
-        candidates = [
-            ex for ex in candidates
-            if any(eq in equipment for eq in ex.get('equipment', []))
-        ]
-        
-        # Filter out already-used exercises (oneExercisePerSlot rule)
-        candidates = [
-            ex for ex in candidates
-            if ex['exerciseId'] not in used_exercises
-        ]
-        
-        if candidates:
-            exercise = random.choice(candidates)
-            selected[slot_id] = {
-                'exerciseId': exercise['exerciseId'],
-                'name': exercise['name'],
-                'minReps': slot.get('minReps', 10),
-                'maxReps': slot.get('maxReps', 20)
-            }
-            used_exercises.add(exercise['exerciseId'])
-        else:
-            # Fallback if no candidates
-            selected[slot_id] = {
-                'exerciseId': f"placeholder_{slot_id}",
-                'name': f"Any {slot_id.replace('_', ' ').title()}",
-                'minReps': slot.get('minReps', 10),
-                'maxReps': slot.get('maxReps', 20)
-            }
+    user_ids = list(dict.fromkeys(user_ids))
+    keys = [
+        {'userEmail': get_dynamodb_user_key(user_id), 'dataType': data_type}
+        for user_id in user_ids
+        for data_type in RENDER_DATA_TYPES
+    ]
+    states = {}
+    for item in batch_get_items(keys, max_workers=BATCH_GET_WORKERS):
+        states.setdefault(item['userEmail'], {})[item['dataType']] = item
     
-    return selected
+    exercise_library = get_app_config(EXERCISES_KEY)
+    results = {}
+    for user_id in user_ids:
+        state = states.get(get_dynamodb_user_key(user_id), {})
+        try:
+            result, error = render_state(state, exercise_library, week_index or resolve_week_index({}, state))
+        except Exception:
+            logger.exception("Error rendering week in batch")
+            result, error = None, (500, 'INTERNAL', 'Internal server error')
+        results[user_id] = result if result else {'error': {'code': error[1], 'message': error[2]}}
+    return results
 
-def render_week(user_id: str, week_index: int, request_id: str) -> dict:
-    """Render a specific week's sessions."""
+def render_full_week(ctx: RequestContext, query_params: dict) -> dict:
+    """Render lifting sessions, non-lifting days and schedule overrides in one pass."""
+    request_id = ctx.request_id
     try:
-        # Get user data
-        strength_data = get_user_strength_data(user_id)
+        # State read and the exercise library are independent; the program
+        # depends on settings but is normally already compiled
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            state_future = pool.submit(ctx.load, RENDER_DATA_TYPES + ['SCHEDULE'])
+            exercises_future = pool.submit(get_app_config, EXERCISES_KEY)
+            state = state_future.result()
+            exercise_library = exercises_future.result()
+        
+        week_index = resolve_week_index(query_params, state)
+        strength_data = state.get('STRENGTH')
         if not strength_data:
             return error_response(404, 'NOT_FOUND', 'Strength data not found. Please enter your 1RMs.', request_id)
         
-        settings = get_user_settings(user_id)
+        settings = state.get('PROGRAM_SETTINGS')
         if not settings:
             return error_response(404, 'NOT_FOUND', 'Program settings not found', request_id)
         
-        # Get config from S3
-        template = get_app_config('config/plan.template.json')
-        exercise_library = get_app_config('config/exercises.latest.json')
+        program = load_program(settings)
+        if not program:
+            return error_response(404, 'NOT_FOUND', f"Program {settings['programId']} not found", request_id)
         
-        # Get phase for this week
-        phase = get_phase_for_week(week_index, template)
+        phase = program['phasesByWeek'].get(week_index)
         if not phase:
             return error_response(400, 'INVALID_WEEK', f'Week {week_index} not found in program', request_id)
         
-        # Calculate training maxes
-        tm_percent = settings.get('tmPercent', 85)
-        rounding = settings.get('rounding', 5)
-        
-        training_maxes = {
-            'squat': calculate_training_max(float(strength_data.get('squat', 0)), tm_percent),
-            'bench': calculate_training_max(float(strength_data.get('bench', 0)), tm_percent),
-            'deadlift': calculate_training_max(float(strength_data.get('deadlift', 0)), tm_percent),
-            'ohp': calculate_training_max(float(strength_data.get('ohp', 0)), tm_percent)
-        }
-        
-        # Determine set scheme for this week
-        if phase.get('mainLiftSchemeByWeekInCycle'):
-            week_in_cycle = str(week_index)
-            scheme_name = phase['mainLiftSchemeByWeekInCycle'].get(week_in_cycle, phase['mainLiftScheme'])
-        else:
-            scheme_name = phase['mainLiftScheme']
+        days = get_week_days(settings, state.get('SCHEDULE', {}), program['template'], query_params.get('weekStartDate'))
+        nonlift_types = {day['nonLiftType'] for day in days if day['type'] == 'nonlift'}
+        exercises = exercise_library['exercises']
         
-        set_scheme = template['setSchemes'][scheme_name]
-        
-        # Get session order (squat, bench, deadlift, ohp)
-        session_order = ['SQUAT', 'BENCH', 'DEADLIFT', 'OHP']
-        
-        sessions = []
-        used_exercises = set()
-        
-        for session_id in session_order:
-            session_template = template['sessionTemplates'][session_id]
-            lift_id = session_template['mainLiftId']
-            
-            # Compute main lift sets
-            main_sets = compute_work_sets(set_scheme, training_maxes[lift_id], rounding)
-            
-            # Compute supplemental (FSL)
-            supplemental = None
-            if phase['rules'].get('supplementalEnabled', True):
-                fsl_weight = main_sets[0]['weight']  # First set is FSL weight
-                supplemental = {
-                    'type': 'fsl_main_lift',
-                    'label': 'FSL (Main Lift)',
-                    'sets': 5,
-                    'repsRange': [3, 10],
-                    'weight': fsl_weight
-                }
-            
-            # Select assistance exercises
-            constraints = settings.get('constraints', [])
-            equipment = settings.get('equipment', ['barbell', 'dumbbell', 'kb', 'band'])
-            
-            assistance = select_exercises_for_slots(
-                session_template['assistanceSlots'],
-                exercise_library['exercises'],
-                constraints,
-                equipment,
-                used_exercises
-            )
-            
-            # Circuit configuration
-            circuit_rounds = phase['rules'].get('circuitRounds', 5)
-            
-            session = {
-                'sessionId': session_id,
-                'label': session_template['label'],
-                'mainLiftId': lift_id,
-                'setScheme': set_scheme['label'],
-                'mainSets': main_sets,
-                'supplemental': supplemental,
-                'assistanceSlots': [
-                    {
-                        'slotId': slot_id,
-                        **assistance[slot_id]
-                    }
-                    for slot_id in assistance
-                ],
-                'circuit': {
-                    'enabled': True,
-                    'rounds': circuit_rounds,
-                    'style': 'EMOMish'
-                }
+        # Lifting sessions and each distinct non-lifting workout render independently
+        with ThreadPoolExecutor(max_workers=1 + len(nonlift_types)) as pool:
+            week_future = pool.submit(build_week, strength_data, settings, program, exercise_library, week_index, phase)
+            nonlift_futures = {
+                nonlift_type: pool.submit(generate_nonlift_workout, nonlift_type, settings, exercises, week_index)
+                for nonlift_type in nonlift_types
             }
-            
-            sessions.append(session)
+            result = week_future.result()
+            nonlift_workouts = {nonlift_type: future.result() for nonlift_type, future in nonlift_futures.items()}
+        
+        for day in days:
+            if day['type'] == 'main':
+                session_index = day.pop('sessionIndex')
+                if session_index < len(result['sessions']):
+                    day['sessionId'] = result['sessions'][session_index]['sessionId']
+            elif day['type'] == 'nonlift':
+                day['workout'] = nonlift_workouts.get(day['nonLiftType'])
         
-        result = {
-            'weekIndex': week_index,
-            'phase': phase['phaseId'],
-            'phaseLabel': phase['label'],
-            'sessions': sessions,
-            'trainingMaxes': training_maxes
-        }
+        result['days'] = days
         
         return success_response(200, result)
     
-    except Exception as e:
-        print(f"Error rendering week: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error rendering full week")
         return error_response(500, 'INTERNAL', 'Internal server error', request_id)
 
+def get_week(ctx: RequestContext, query_params: dict, request_id: str, event: dict) -> dict:
+    if ctx.path == '/program/week/full':
+        return render_full_week(ctx, query_params)
+    return render_week(ctx, query_params)
+
 def handler(event, context):
     """
     Handle program week rendering (requires authentication).
     
     Routes:
     - GET /program/week?weekIndex=N
-    """
-    try:
-        request_id = context.aws_request_id
-        method = event['requestContext']['http']['method']
-        
-        # Validate JWT and extract user context
-        try:
-            user_context = validate_user_context(event)
-            user_id = user_context['userId']
-        except ValueError as e:
-            return error_response(403, 'FORBIDDEN', str(e), request_id)
-        
-        if method == 'GET':
-            query_params = event.get('queryStringParameters', {})
-            week_index = int(query_params.get('weekIndex', 1))
-            return render_week(user_id, week_index, request_id)
-        
-        return error_response(405, 'METHOD_NOT_ALLOWED', 'Method not allowed', request_id)
+    - GET /program/week/full?weekIndex=N&weekStartDate=YYYY-MM-DD
     
-    except Exception as e:
-        print(f"Handler error: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return error_response(500, 'INTERNAL', 'Internal server error', context.aws_request_id)
-
+    weekIndex defaults to the user's current week from PROGRESS.
+    """
+    return handle_request(event, context, get_handler=get_week)
@@ -1,60 +1,207 @@
 import sys
 import os
 from datetime import datetime
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from shared.dynamodb import data_table
+from shared.request_context import RequestContext
 from shared.response import error_response, success_response
 from shared.utils import convert_floats_to_decimals
 from shared.handler_utils import handle_request
+from shared import logger
 
 DATA_TYPE = 'SCHEDULE'
 
-def get_schedule(user_context: dict, query_params: dict, request_id: str, event: dict) -> dict:
+# Maps that PATCH /schedule may edit, keyed by date (daySwaps) or dayOfWeek (dayAssignments)
+PATCHABLE_MAPS = ('daySwaps', 'dayAssignments')
+MAX_PATCH_OPS = 50
+
+def clean_schedule(item: dict) -> dict:
+    schedule = {k: v for k, v in item.items() if k not in ['userEmail', 'dataType']}
+    schedule['version'] = int(schedule.get('version', 0))
+    return schedule
+
+def get_schedule(ctx: RequestContext, query_params: dict, request_id: str, event: dict) -> dict:
     try:
-        response = data_table.get_item(
-            Key={'userEmail': user_context['email'], 'dataType': DATA_TYPE}
-        )
-        
-        item = response.get('Item')
+        item = ctx.get(DATA_TYPE)
         if not item:
             return error_response(404, 'NOT_FOUND', 'Schedule customizations not found', request_id)
         
-        item.pop('userEmail', None)
-        item.pop('dataType', None)
-        
-        return success_response(200, item)
-    except Exception as e:
-        print(f"Error getting schedule: {e}")
+        return success_response(200, clean_schedule(item))
+    except Exception:
+        logger.exception("Error getting schedule")
         return error_response(500, 'INTERNAL', 'Internal server error', request_id)
 
-def put_schedule(user_context: dict, body: dict, request_id: str, event: dict) -> dict:
+def put_schedule(ctx: RequestContext, body: dict, request_id: str, event: dict) -> dict:
     try:
         now = datetime.utcnow().isoformat() + 'Z'
-        user_email = user_context['email']
-        
-        existing = data_table.get_item(
-            Key={'userEmail': user_email, 'dataType': DATA_TYPE}
-        ).get('Item', {})
+        existing = ctx.get(DATA_TYPE) or {}
         
         schedule = {
-            'userEmail': user_email,
+            'userEmail': ctx.user_key,
             'dataType': DATA_TYPE,
-            'userId': user_context['userId'],
+            'userId': ctx.user_id,
             'daySwaps': convert_floats_to_decimals(body.get('daySwaps', {})),
             'dayAssignments': body.get('dayAssignments', {}),
+            'version': int(existing.get('version', 0)) + 1,
             'createdAt': existing.get('createdAt', now),
             'updatedAt': now
         }
         
         data_table.put_item(Item=schedule)
+        ctx.remember(schedule)
         
-        return success_response(200, {k: v for k, v in schedule.items() if k not in ['userEmail', 'dataType']})
-    except Exception as e:
-        print(f"Error putting schedule: {e}")
+        return success_response(200, clean_schedule(schedule))
+    except Exception:
+        logger.exception("Error putting schedule")
         return error_response(500, 'INTERNAL', 'Internal server error', request_id)
 
-def handler(event, context):
-    return handle_request(event, context, get_handler=get_schedule, put_handler=put_schedule)
+def validate_patch_ops(ops) -> str | None:
+    """Return an error message for an invalid ops list, or None."""
+    if not isinstance(ops, list) or not ops:
+        return 'ops must be a non-empty list'
+    if len(ops) > MAX_PATCH_OPS:
+        return f'At most {MAX_PATCH_OPS} ops per request'
+    
+    seen = set()
+    for op in ops:
+        if not isinstance(op, dict) or op.get('op') not in ('set', 'remove'):
+            return "Each op needs op: 'set' or 'remove'"
+        if op.get('map') not in PATCHABLE_MAPS:
+            return f"op map must be one of: {', '.join(PATCHABLE_MAPS)}"
+        if not isinstance(op.get('key'), str) or not op['key']:
+            return 'op key must be a non-empty string'
+        if op['op'] == 'set' and 'value' not in op:
+            return "set ops need a value"
+        path = (op['map'], op['key'])
+        if path in seen:
+            return f"Duplicate op for {op['map']}.{op['key']}"
+        seen.add(path)
+    return None
+
+def validate_expected_version(version) -> str | None:
+    """Return an error message unless version is absent or a non-negative integer."""
+    if version is None:
+        return None
+    if isinstance(version, bool) or not isinstance(version, int) or version < 0:
+        return 'version must be a non-negative integer'
+    return None
+
+def build_patch_update(ops: list, now: str) -> dict:
+    """UpdateItem arguments applying ops as nested SET/REMOVE and bumping version."""
+    names = {'#version': 'version', '#updatedAt': 'updatedAt'}
+    values = {':one': 1, ':zero': 0, ':now': now}
+    set_clauses = ['#version = if_not_exists(#version, :zero) + :one', '#updatedAt = :now']
+    remove_clauses = []
+    
+    for i, op in enumerate(ops):
+        names[f'#m{i}'] = op['map']
+        names[f'#k{i}'] = op['key']
+        if op['op'] == 'set':
+            values[f':v{i}'] = convert_floats_to_decimals(op['value'])
+            set_clauses.append(f'#m{i}.#k{i} = :v{i}')
+        else:
+            remove_clauses.append(f'#m{i}.#k{i}')
+    
+    expression = 'SET ' + ', '.join(set_clauses)
+    if remove_clauses:
+        expression += ' REMOVE ' + ', '.join(remove_clauses)
+    return {
+        'UpdateExpression': expression,
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': values
+    }
+
+def init_schedule_maps(ctx: RequestContext, now: str):
+    """
+    Create the schedule item (or its maps) so nested paths can be updated.
+    
+    Seeded from the caller's current schedule, which may still be a legacy
+    email-keyed item, so the first PATCH after key migration keeps it.
+    """
+    existing = ctx.get(DATA_TYPE) or {}
+    data_table.update_item(
+        Key={'userEmail': ctx.user_key, 'dataType': DATA_TYPE},
+        UpdateExpression=(
+            'SET daySwaps = if_not_exists(daySwaps, :swaps), '
+            'dayAssignments = if_not_exists(dayAssignments, :assignments), '
+            '#version = if_not_exists(#version, :version), '
+            'userId = :userId, createdAt = if_not_exists(createdAt, :now)'
+        ),
+        ExpressionAttributeNames={'#version': 'version'},
+        ExpressionAttributeValues={
+            ':swaps': existing.get('daySwaps', {}),
+            ':assignments': existing.get('dayAssignments', {}),
+            ':version': existing.get('version', 0),
+            ':userId': ctx.user_id,
+            ':now': now
+        }
+    )
 
+def patch_schedule(ctx: RequestContext, body: dict, request_id: str, event: dict) -> dict:
+    """
+    Apply individual daySwaps/dayAssignments edits with one UpdateItem.
+    
+    Body:
+        ops: [{op: 'set'|'remove', map: 'daySwaps'|'dayAssignments', key, value}]
+        version: Schedule version the client last saw (optional); the write
+            is rejected with 409 and the current schedule if it has moved on
+    """
+    try:
+        ops = body.get('ops')
+        expected_version = body.get('version')
+        validation_error = validate_patch_ops(ops) or validate_expected_version(expected_version)
+        if validation_error:
+            return error_response(400, 'VALIDATION_ERROR', validation_error, request_id)
+        
+        now = datetime.utcnow().isoformat() + 'Z'
+        update = build_patch_update(ops, now)
+        
+        if expected_version is not None:
+            update['ConditionExpression'] = '#version = :expected'
+            if expected_version == 0:
+                # Schedules written before versioning count as version 0
+                update['ConditionExpression'] = 'attribute_not_exists(#version) OR #version = :expected'
+            update['ExpressionAttributeValues'][':expected'] = expected_version
+        
+        for attempt in range(2):
+            try:
+                response = data_table.update_item(
+                    Key={'userEmail': ctx.user_key, 'dataType': DATA_TYPE},
+                    ReturnValues='ALL_NEW',
+                    ReturnValuesOnConditionCheckFailure='ALL_OLD',
+                    **update
+                )
+                break
+            except ClientError as e:
+                error = e.response['Error']
+                if error['Code'] == 'ConditionalCheckFailedException':
+                    current = e.response.get('Item')
+                    current = {k: TypeDeserializer().deserialize(v) for k, v in current.items()} if current else {}
+                    return success_response(409, {
+                        'error': {
+                            'code': 'CONFLICT',
+                            'message': 'Schedule was changed on another device',
+                            'requestId': request_id
+                        },
+                        'current': clean_schedule(current)
+                    })
+                # First PATCH for this user: the maps do not exist yet
+                if error['Code'] == 'ValidationException' and 'document path' in error['Message'] and attempt == 0:
+                    init_schedule_maps(ctx, now)
+                    continue
+                raise
+        
+        item = response['Attributes']
+        ctx.remember(item)
+        return success_response(200, clean_schedule(item))
+    except Exception:
+        logger.exception("Error patching schedule")
+        return error_response(500, 'INTERNAL', 'Internal server error', request_id)
+
+def handler(event, context):
+    return handle_request(event, context, get_handler=get_schedule, put_handler=put_schedule,
+                          patch_handler=patch_schedule)
@@ -0,0 +1,62 @@
+import os
+import threading
+import boto3
+from botocore.config import Config
+
+# One pool per service per container, sized for the widest fan-out
+# (batch gets, S3 prefetch) so threads never wait on or discard connections
+MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '32'))
+
+# (connect, read) timeouts in seconds. With MAX_ATTEMPTS tries the worst
+# case still fits well inside the 30s Lambda timeout.
+SERVICE_TIMEOUTS = {
+    'dynamodb': (1, 3),
+    's3': (2, 5)
+}
+DEFAULT_TIMEOUTS = (2, 5)
+# Total attempts including the first; adaptive mode also rate-limits the
+# client itself after throttling responses
+MAX_ATTEMPTS = 3
+
+_session = boto3.session.Session()
+_clients = {}
+_lock = threading.Lock()
+
+def client_config(service: str, **overrides) -> Config:
+    """botocore Config for a service: pooled keep-alive connections, tight timeouts, adaptive retries."""
+    connect_timeout, read_timeout = SERVICE_TIMEOUTS.get(service, DEFAULT_TIMEOUTS)
+    settings = {
+        'max_pool_connections': MAX_POOL_CONNECTIONS,
+        'connect_timeout': connect_timeout,
+        'read_timeout': read_timeout,
+        'retries': {'mode': 'adaptive', 'max_attempts': MAX_ATTEMPTS},
+        'tcp_keepalive': True
+    }
+    settings.update(overrides)
+    return Config(**settings)
+
+def _get(kind: str, service: str, region_name: str | None, endpoint_url: str | None, overrides: dict):
+    cache_key = (kind, service, region_name, endpoint_url, tuple(sorted(overrides.items())))
+    instance = _clients.get(cache_key)
+    if instance is None:
+        # Session.client/resource are not thread-safe; build each one once
+        with _lock:
+            instance = _clients.get(cache_key)
+            if instance is None:
+                factory = _session.client if kind == 'client' else _session.resource
+                instance = factory(
+                    service,
+                    region_name=region_name,
+                    endpoint_url=endpoint_url,
+                    config=client_config(service, **overrides)
+                )
+                _clients[cache_key] = instance
+    return instance
+
+def get_client(service: str, region_name: str | None = None, endpoint_url: str | None = None, **overrides):
+    """Shared low-level client for a service (created once per container)."""
+    return _get('client', service, region_name, endpoint_url, overrides)
+
+def get_resource(service: str, region_name: str | None = None, endpoint_url: str | None = None, **overrides):
+    """Shared resource for a service (created once per container)."""
+    return _get('resource', service, region_name, endpoint_url, overrides)
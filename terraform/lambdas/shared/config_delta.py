@@ -0,0 +1,80 @@
+from typing import Any
+
+# Document fields that are described by the delta itself rather than as ops
+DELTA_METADATA_FIELDS = ('version', 'publishedAt')
+
+# (from version, to version) -> delta
+_delta_cache = {}
+DELTA_CACHE_MAX_ENTRIES = 64
+# sinceVersion values longer than this are rejected before any lookup
+MAX_VERSION_DIGITS = 9
+
+def diff_fields(old: dict, new: dict, skip: tuple = ()) -> list:
+    """
+    JSON-Patch style ops turning old into new, one level deep.
+
+    Changed values are replaced whole rather than diffed recursively; for
+    exercise records that keeps ops small and trivial to apply.
+    """
+    ops = []
+    for field in old:
+        if field not in skip and field not in new:
+            ops.append({'op': 'remove', 'path': f'/{field}'})
+    for field, value in new.items():
+        if field in skip:
+            continue
+        if field not in old:
+            ops.append({'op': 'add', 'path': f'/{field}', 'value': value})
+        elif old[field] != value:
+            ops.append({'op': 'replace', 'path': f'/{field}', 'value': value})
+    return ops
+
+def diff_exercise_libraries(old: dict, new: dict) -> dict:
+    """
+    Compact delta between two published exercise libraries.
+
+    Args:
+        old: Library the client has
+        new: Current library
+
+    Returns:
+        Dict with fromVersion, toVersion, publishedAt, added (full exercises),
+        removed (exerciseIds), modified ({exerciseId, ops}) and documentOps
+        (ops on top-level fields other than exercises)
+    """
+    old_exercises = {ex['exerciseId']: ex for ex in old.get('exercises', [])}
+    new_exercises = {ex['exerciseId']: ex for ex in new.get('exercises', [])}
+
+    modified = []
+    for exercise_id, exercise in new_exercises.items():
+        previous = old_exercises.get(exercise_id)
+        if previous is not None and previous != exercise:
+            modified.append({'exerciseId': exercise_id, 'ops': diff_fields(previous, exercise)})
+
+    return {
+        'fromVersion': old.get('version'),
+        'toVersion': new.get('version'),
+        'publishedAt': new.get('publishedAt'),
+        'added': [ex for exercise_id, ex in new_exercises.items() if exercise_id not in old_exercises],
+        'removed': [exercise_id for exercise_id in old_exercises if exercise_id not in new_exercises],
+        'modified': modified,
+        'documentOps': diff_fields(old, new, skip=DELTA_METADATA_FIELDS + ('exercises',))
+    }
+
+def get_exercise_library_delta(old: dict, new: dict) -> dict:
+    """diff_exercise_libraries, computed once per version pair."""
+    cache_key = (old.get('version'), old.get('publishedAt'), new.get('version'), new.get('publishedAt'))
+    delta = _delta_cache.get(cache_key)
+    if delta is None:
+        delta = diff_exercise_libraries(old, new)
+        if len(_delta_cache) >= DELTA_CACHE_MAX_ENTRIES:
+            _delta_cache.clear()
+        _delta_cache[cache_key] = delta
+    return delta
+
+def parse_document_version(value: str) -> int | None:
+    """Query parameter -> document version (a positive int, as published), or None if malformed."""
+    value = value.strip()
+    if not value.isdigit() or len(value) > MAX_VERSION_DIGITS or int(value) < 1:
+        return None
+    return int(value)
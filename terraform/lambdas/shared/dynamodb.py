@@ -1,7 +1,151 @@
 import os
-import boto3
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
 
-dynamodb = boto3.resource('dynamodb')
+from shared.aws_clients import get_resource
+from shared.jwt_validator import get_dynamodb_user_key, get_legacy_user_key
+
+dynamodb = get_resource('dynamodb')
 DATA_TABLE_NAME = os.environ.get('DATA_TABLE', '')
 data_table = dynamodb.Table(DATA_TABLE_NAME) if DATA_TABLE_NAME else None
 
+# Fall back to email-keyed items until tools/migrate_user_keys.py has run
+LEGACY_KEY_READS = os.environ.get('LEGACY_KEY_READS', 'true').lower() == 'true'
+# Set on items copied from a legacy key by tools/migrate_user_keys.py (value: the legacy key)
+MIGRATED_FROM_ATTR = 'migratedFrom'
+
+BATCH_GET_LIMIT = 100
+BATCH_WRITE_LIMIT = 25
+MAX_BATCH_RETRIES = 5
+THROTTLING_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded'
+}
+
+def backoff_delay(attempt: int, base: float = 0.05, cap: float = 5.0) -> float:
+    """Full-jitter exponential backoff delay in seconds."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def batch_get_chunk(keys: list, table_name: str) -> list:
+    """One batch_get_item of up to 100 keys, retrying UnprocessedKeys with backoff."""
+    items = []
+    request_items = {table_name: {'Keys': keys}}
+    attempt = 0
+    while request_items:
+        response = dynamodb.batch_get_item(RequestItems=request_items)
+        items.extend(response.get('Responses', {}).get(table_name, []))
+        request_items = response.get('UnprocessedKeys') or {}
+        if request_items:
+            attempt += 1
+            if attempt > MAX_BATCH_RETRIES:
+                raise RuntimeError('batch_get_item left unprocessed keys after retries')
+            time.sleep(backoff_delay(attempt))
+    return items
+
+def batch_get_items(keys: list, table_name: str = DATA_TABLE_NAME, max_workers: int = 1) -> list:
+    """
+    Fetch many items from one table with batch_get_item.
+
+    Keys are sent in chunks of 100 (the DynamoDB limit) and any
+    UnprocessedKeys are retried with exponential backoff.
+
+    Args:
+        keys: List of primary key dicts
+        table_name: Table to read from (defaults to DATA_TABLE)
+        max_workers: Chunks fetched concurrently (they share one connection pool)
+
+    Returns:
+        List of items that exist (order is not guaranteed)
+    """
+    chunks = [keys[start:start + BATCH_GET_LIMIT] for start in range(0, len(keys), BATCH_GET_LIMIT)]
+    if max_workers <= 1 or len(chunks) <= 1:
+        return [item for chunk in chunks for item in batch_get_chunk(chunk, table_name)]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+        results = pool.map(batch_get_chunk, chunks, [table_name] * len(chunks))
+        return [item for chunk_items in results for item in chunk_items]
+
+def batch_write_requests(table_name: str, requests: list, resource=None, max_retries: int = 8) -> int:
+    """
+    Write PutRequest/DeleteRequest entries with batch_write_item.
+
+    Requests are sent 25 at a time. UnprocessedItems and throttling errors
+    are retried with jittered exponential backoff.
+
+    Args:
+        table_name: Target table
+        requests: List of {'PutRequest': ...} / {'DeleteRequest': ...} dicts
+        resource: boto3 DynamoDB resource (defaults to the shared one)
+        max_retries: Attempts per chunk before giving up
+
+    Returns:
+        Number of retries that were needed (useful for throttling reports)
+    """
+    resource = resource or dynamodb
+    retries = 0
+    for start in range(0, len(requests), BATCH_WRITE_LIMIT):
+        request_items = {table_name: requests[start:start + BATCH_WRITE_LIMIT]}
+        attempt = 0
+        while request_items:
+            try:
+                response = resource.batch_write_item(RequestItems=request_items)
+                request_items = response.get('UnprocessedItems') or {}
+            except ClientError as e:
+                if e.response['Error']['Code'] not in THROTTLING_ERROR_CODES:
+                    raise
+            if request_items:
+                attempt += 1
+                retries += 1
+                if attempt > max_retries:
+                    raise RuntimeError('batch_write_item left unprocessed items after retries')
+                time.sleep(backoff_delay(attempt))
+    return retries
+
+def index_items_by_type(items: list) -> dict:
+    """Map a list of user items to {dataType: item}."""
+    return {item['dataType']: item for item in items}
+
+def load_user_state(pk: str, types: list | None = None) -> dict:
+    """
+    Load a user's items with one Query on their partition.
+
+    Args:
+        pk: Partition key (USER#<sub>, or a legacy email key)
+        types: dataType values to return (default: every item in the partition)
+
+    Returns:
+        Dict of {dataType: item} for items that exist
+    """
+    params = {'KeyConditionExpression': Key('userEmail').eq(pk)}
+    if types:
+        params['FilterExpression'] = Attr('dataType').is_in(list(types))
+
+    items = {}
+    while True:
+        response = data_table.query(**params)
+        items.update(index_items_by_type(response.get('Items', [])))
+        if 'LastEvaluatedKey' not in response:
+            return items
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def load_user_state_for(user_context: dict, types: list | None = None) -> dict:
+    """
+    load_user_state for the caller, filling gaps from the legacy email key.
+
+    The legacy partition is only queried while LEGACY_KEY_READS is on and
+    some requested type was not found under the unified key.
+    """
+    items = load_user_state(get_dynamodb_user_key(user_context['userId']), types)
+    if not LEGACY_KEY_READS or not user_context.get('email'):
+        return items
+
+    missing = [data_type for data_type in types if data_type not in items] if types else None
+    if types and not missing:
+        return items
+
+    legacy_items = load_user_state(get_legacy_user_key(user_context['email']), missing)
+    return {**legacy_items, **items}
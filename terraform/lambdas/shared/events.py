@@ -0,0 +1,168 @@
+import itertools
+import os
+import time
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from shared.dynamodb import DATA_TABLE_NAME, batch_get_items, batch_write_requests
+from shared import logger, metrics
+
+# Derived data is computed from the tables' DynamoDB Streams, so the
+# user-facing write stays one put_item and the stream is the outbox. Each
+# stream record becomes a compact event:
+#   {'eventId', 'type', 'table', 'userKey', 'createdAt' (epoch s), 'new', 'old'}
+# Consumers run per event type and must tolerate redelivery; successfully
+# handled events are also recorded as EVENT#<eventId> markers (expired by
+# TTL) so a retried batch skips them.
+MARKER_PREFIX = 'EVENT#'
+MARKER_TTL_SECONDS = int(os.environ.get('EVENT_MARKER_TTL_SECONDS', str(2 * 24 * 3600)))
+
+_deserializer = TypeDeserializer()
+_serializer = TypeSerializer()
+
+def deserialize_image(image: dict | None) -> dict | None:
+    if not image:
+        return None
+    return {name: _deserializer.deserialize(value) for name, value in image.items()}
+
+def table_from_arn(arn: str) -> str:
+    """Table name from a stream ARN (arn:...:table/<name>/stream/<label>)."""
+    return arn.split(':table/', 1)[1].split('/', 1)[0] if ':table/' in arn else ''
+
+def to_event(record: dict, classify) -> dict | None:
+    """
+    Compact event for a stream record, or None if no consumer cares.
+
+    Args:
+        classify: (table, eventName, new, old) -> event type or None
+    """
+    change = record['dynamodb']
+    new = deserialize_image(change.get('NewImage'))
+    old = deserialize_image(change.get('OldImage'))
+    table = table_from_arn(record.get('eventSourceARN', ''))
+    event_type = classify(table, record['eventName'], new, old)
+    if not event_type:
+        return None
+    keys = deserialize_image(change['Keys'])
+    return {
+        'eventId': record['eventID'],
+        'type': event_type,
+        'table': table,
+        'userKey': keys['userEmail'],
+        'createdAt': float(change.get('ApproximateCreationDateTime', time.time())),
+        'new': new,
+        'old': old
+    }
+
+def marker_key(event_id: str) -> dict:
+    return {'userEmail': f'{MARKER_PREFIX}{event_id}', 'dataType': 'PROCESSED'}
+
+def processed_event_ids(event_ids: list) -> set:
+    """Event IDs that already have a marker (one chunked batch read)."""
+    if not event_ids:
+        return set()
+    items = batch_get_items([marker_key(event_id) for event_id in event_ids], max_workers=4)
+    return {item['userEmail'][len(MARKER_PREFIX):] for item in items}
+
+def mark_processed(event_ids: list):
+    expires_at = int(time.time()) + MARKER_TTL_SECONDS
+    batch_write_requests(DATA_TABLE_NAME, [
+        {'PutRequest': {'Item': dict(marker_key(event_id), expiresAt=expires_at)}}
+        for event_id in event_ids
+    ])
+
+def process_records(records: list, classify, consumers: dict, consumer_name: str = 'events') -> dict:
+    """
+    Run one stream batch through the consumers.
+
+    Events are handled in stream order. The first failure stops the batch
+    and is reported back (ReportBatchItemFailures with that record's
+    sequence number), so the event source retries from there with backoff
+    and per-user order is kept. Events handled before it are skipped on
+    redelivery by their markers.
+
+    Args:
+        classify: See to_event
+        consumers: Event type -> callable(event)
+
+    Returns:
+        Lambda response with batchItemFailures
+    """
+    events = [(record, to_event(record, classify)) for record in records]
+    relevant = [(record, event) for record, event in events if event]
+    seen = processed_event_ids([event['eventId'] for _, event in relevant])
+
+    counts = {'Received': len(records), 'Processed': 0, 'Duplicates': 0, 'Failed': 0}
+    lags_ms, done, failed_at = [], [], None
+    for record, event in relevant:
+        if event['eventId'] in seen:
+            counts['Duplicates'] += 1
+            continue
+        try:
+            consumers[event['type']](event)
+        except Exception:
+            logger.exception("Error handling event", eventType=event['type'], eventId=event['eventId'])
+            counts['Failed'] += 1
+            failed_at = record['dynamodb']['SequenceNumber']
+            break
+        counts['Processed'] += 1
+        done.append(event['eventId'])
+        lags_ms.append((time.time() - event['createdAt']) * 1000)
+
+    if done:
+        mark_processed(done)
+    metrics.emit(
+        'Events processed', {'Consumer': consumer_name},
+        dict(counts, LagMs=max(lags_ms) if lags_ms else 0), {'LagMs': 'Milliseconds'}
+    )
+    return {'batchItemFailures': [{'itemIdentifier': failed_at}] if failed_at else []}
+
+class LocalStream:
+    """
+    In-memory stand-in for a table stream, for running consumers locally.
+
+    put() records an item write the way DynamoDB Streams would (with old and
+    new images), and drain() feeds them to a stream handler in batches.
+    """
+
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self.arn = f'arn:aws:dynamodb:local:000000000000:table/{table_name}/stream/local'
+        self.records = []
+        self._sequence = itertools.count(1)
+
+    def put(self, new_item: dict | None, old_item: dict | None = None,
+            key_names=('userEmail', 'dataType', 'workoutDate')):
+        item = new_item or old_item
+        change = {
+            'Keys': {name: _serializer.serialize(item[name]) for name in key_names if name in item},
+            'SequenceNumber': str(next(self._sequence)),
+            'ApproximateCreationDateTime': time.time()
+        }
+        if new_item:
+            change['NewImage'] = {name: _serializer.serialize(value) for name, value in new_item.items()}
+        if old_item:
+            change['OldImage'] = {name: _serializer.serialize(value) for name, value in old_item.items()}
+        event_name = 'REMOVE' if not new_item else 'MODIFY' if old_item else 'INSERT'
+        self.records.append({
+            'eventID': f'{self.table_name}-{change["SequenceNumber"]}',
+            'eventName': event_name,
+            'eventSourceARN': self.arn,
+            'dynamodb': change
+        })
+
+    def drain(self, handler, batch_size: int = 100) -> list:
+        """Deliver pending records; failed records and everything after them are redelivered."""
+        responses = []
+        while self.records:
+            batch = self.records[:batch_size]
+            response = handler({'Records': batch}, None)
+            responses.append(response)
+            failures = [failure['itemIdentifier'] for failure in response.get('batchItemFailures', [])]
+            if failures:
+                first = next(i for i, record in enumerate(batch) if record['dynamodb']['SequenceNumber'] == failures[0])
+                if first == 0:
+                    return responses
+                self.records = self.records[first:]
+            else:
+                self.records = self.records[len(batch):]
+        return responses
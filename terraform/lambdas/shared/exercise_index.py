@@ -0,0 +1,132 @@
+import hashlib
+import json
+
+from shared.exercise_selection import SLOT_TAG_MAPPING
+
+# Built indexes keyed by library version; results keyed by (version, query)
+_index_cache = {}
+_query_cache = {}
+QUERY_CACHE_MAX_ENTRIES = 1024
+
+def library_version_key(exercise_library: dict) -> tuple:
+    return (exercise_library.get('version'), exercise_library.get('publishedAt'))
+
+def build_exercise_index(exercise_library: dict) -> dict:
+    """
+    Inverted indexes over the exercise list.
+
+    Returns:
+        Dict with bySlotTag, byEquipment and blockedBy (each value -> set of
+        exercise positions) plus the set of known exercise fields
+    """
+    by_slot_tag = {}
+    by_equipment = {}
+    blocked_by = {}
+    fields = set()
+
+    for position, exercise in enumerate(exercise_library['exercises']):
+        fields.update(exercise)
+        for tag in exercise.get('slotTags', []):
+            by_slot_tag.setdefault(tag, set()).add(position)
+        for equipment in exercise.get('equipment', []):
+            by_equipment.setdefault(equipment, set()).add(position)
+        for constraint in exercise.get('constraintsBlocked', []):
+            blocked_by.setdefault(constraint, set()).add(position)
+
+    return {
+        'bySlotTag': by_slot_tag,
+        'byEquipment': by_equipment,
+        'blockedBy': blocked_by,
+        'fields': fields
+    }
+
+def get_exercise_index(exercise_library: dict) -> dict:
+    """Index for this library version, built once per version."""
+    version_key = library_version_key(exercise_library)
+    index = _index_cache.get(version_key)
+    if index is None:
+        _index_cache.clear()
+        _query_cache.clear()
+        index = build_exercise_index(exercise_library)
+        _index_cache[version_key] = index
+    return index
+
+def parse_list_param(value: str | None) -> tuple:
+    """Comma-separated query parameter -> sorted, de-duplicated tuple."""
+    if not value:
+        return ()
+    return tuple(sorted({part.strip() for part in value.split(',') if part.strip()}))
+
+def normalize_query(query_params: dict) -> tuple:
+    """Canonical (slot, equipment, excludeConstraints, fields) for caching and ETags."""
+    return (
+        (query_params.get('slot') or '').strip(),
+        parse_list_param(query_params.get('equipment')),
+        parse_list_param(query_params.get('excludeConstraints')),
+        parse_list_param(query_params.get('fields'))
+    )
+
+def query_etag(config_etag: str | None, query: tuple) -> str:
+    """ETag of a query result: changes with the library ETag or the query."""
+    digest = hashlib.sha1(json.dumps([config_etag, query]).encode('utf-8')).hexdigest()
+    return f'"{digest[:32]}"'
+
+def query_exercises(exercise_library: dict, query: tuple) -> dict:
+    """
+    Answer an exercise query from the index.
+
+    Args:
+        exercise_library: Parsed exercises.latest.json
+        query: Result of normalize_query
+
+    Matching rules mirror assistance selection: slot accepts a template
+    slotId (e.g. 'upper_pull') or a library slotTag, an exercise matches
+    equipment if it uses any listed item, and it is dropped if blocked by
+    any excluded constraint.
+
+    Returns:
+        Dict with version, publishedAt, count and the projected exercises
+
+    Raises:
+        ValueError: If fields names an unknown exercise field
+    """
+    index = get_exercise_index(exercise_library)
+    cache_key = (library_version_key(exercise_library), query)
+    cached = _query_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    slot, equipment, exclude_constraints, fields = query
+    unknown = [field for field in fields if field not in index['fields']]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    positions = set(range(len(exercise_library['exercises'])))
+    if slot:
+        tags = SLOT_TAG_MAPPING.get(slot, [slot])
+        positions &= set().union(*(index['bySlotTag'].get(tag, set()) for tag in tags))
+    if equipment:
+        positions &= set().union(*(index['byEquipment'].get(item, set()) for item in equipment))
+    for constraint in exclude_constraints:
+        positions -= index['blockedBy'].get(constraint, set())
+
+    exercises = exercise_library['exercises']
+    projected_fields = ('exerciseId',) + tuple(field for field in fields if field != 'exerciseId') if fields else None
+    results = []
+    for position in sorted(positions):
+        exercise = exercises[position]
+        if projected_fields:
+            exercise = {field: exercise[field] for field in projected_fields if field in exercise}
+        results.append(exercise)
+
+    result = {
+        'version': exercise_library.get('version'),
+        'publishedAt': exercise_library.get('publishedAt'),
+        'count': len(results),
+        'exercises': results
+    }
+
+    if len(_query_cache) >= QUERY_CACHE_MAX_ENTRIES:
+        _query_cache.clear()
+    _query_cache[cache_key] = result
+    return result
@@ -0,0 +1,259 @@
+import random
+
+# Plan template slot IDs -> exercise library slot tags (mirrors the web client's slotMapping)
+SLOT_TAG_MAPPING = {
+    'upper_push': ['upper_push_horizontal', 'upper_push_vertical'],
+    'upper_pull': ['upper_pull_vertical', 'upper_pull_horizontal'],
+    'single_leg_or_core': ['single_leg_knee_dominant', 'single_leg_hip_dominant', 'core_anti_extension', 'core_anti_rotation'],
+    'core_anti_extension': ['core_anti_extension'],
+    'core_anti_rotation': ['core_anti_rotation'],
+    'carry': ['carry'],
+    'scap_stability': ['scap_stability']
+}
+
+# Weekly assistance fatigue budget per slot, by phase family (phaseId prefix)
+PHASE_SLOT_FATIGUE_BUDGET = {
+    'LEADER': 3.2,
+    'ANCHOR': 2.8,
+    'DELOAD': 2.0,
+    'TEST': 1.6,
+    'RESET': 2.4
+}
+DEFAULT_SLOT_FATIGUE_BUDGET = 3.0
+
+# Fatigue is solved in hundredths so the search works on integers
+FATIGUE_SCALE = 100
+
+# Score for leaving a slot as a placeholder; below any real pick (scores are in [0, 1))
+PLACEHOLDER_SCORE = -1.0
+
+_pool_cache = {}
+POOL_CACHE_MAX_ENTRIES = 512
+
+def get_phase_family(phase_id: str) -> str:
+    return phase_id.split('_')[0]
+
+def exercise_fatigue(exercise: dict, phase_family: str) -> float:
+    """Fatigue cost of one exercise in a circuit during the given phase."""
+    meta = exercise.get('fatigueMeta')
+    if not meta:
+        return float(exercise.get('fatigueScore', 0))
+
+    modifier = 1.0
+    if phase_family == 'LEADER':
+        modifier = meta.get('leaderPhaseModifier', 1.0)
+    elif phase_family == 'ANCHOR':
+        modifier = meta.get('anchorPhaseModifier', 1.0)
+    return meta.get('base', exercise.get('fatigueScore', 0)) * meta.get('circuitMultiplier', 1.0) * modifier
+
+def get_candidate_pools(exercise_library: dict, slot_ids: tuple, constraints: list, equipment: list, phase_family: str) -> list:
+    """
+    Candidate (exercise index, fatigue units) lists per slot, memoized.
+
+    Pools only depend on the library version and the user's constraint and
+    equipment sets, so they are built once per combination and reused
+    across weeks and users.
+    """
+    cache_key = (
+        exercise_library.get('version'),
+        exercise_library.get('publishedAt'),
+        slot_ids,
+        frozenset(constraints),
+        frozenset(equipment),
+        phase_family
+    )
+    pools = _pool_cache.get(cache_key)
+    if pools is not None:
+        return pools
+
+    exercises = exercise_library['exercises']
+    blocked = set(constraints)
+    available = set(equipment)
+    eligible = [
+        index for index, ex in enumerate(exercises)
+        if not blocked.intersection(ex.get('constraintsBlocked', []))
+        and available.intersection(ex.get('equipment', []))
+    ]
+
+    pools = []
+    for slot_id in slot_ids:
+        slot_tags = set(SLOT_TAG_MAPPING.get(slot_id, [slot_id]))
+        pools.append([
+            (index, round(exercise_fatigue(exercises[index], phase_family) * FATIGUE_SCALE))
+            for index in eligible
+            if slot_tags.intersection(exercises[index].get('slotTags', []))
+        ])
+
+    if len(_pool_cache) >= POOL_CACHE_MAX_ENTRIES:
+        _pool_cache.clear()
+    _pool_cache[cache_key] = pools
+    return pools
+
+def solve_assistance(pools: list, slot_ids: tuple, budget_units: int, distinct: bool, rng=random) -> list:
+    """
+    Pick one exercise per slot to maximize preference within a fatigue budget.
+
+    Branch-and-bound over the slots. Each candidate gets a random preference
+    score for week-to-week variety, and every slot has a zero-cost
+    placeholder option, so a solution always exists.
+
+    Slots sharing a slotId share one candidate pool. They are searched
+    together, most constrained group first, and take options in
+    non-decreasing position (increasing when picks must be distinct), which
+    removes permutation symmetry. The bound also caps the number of real
+    picks by what the remaining budget can afford.
+
+    Returns:
+        Chosen exercise index (or None for a placeholder) per slot, in input order
+    """
+    groups = {}
+    for slot, slot_id in enumerate(slot_ids):
+        groups.setdefault(slot_id, []).append(slot)
+    ordered_groups = sorted(groups.values(), key=lambda members: len(pools[members[0]]) - len(members))
+
+    # Per depth: (options sorted by score, rank within group, slot position)
+    depths = []
+    for members in ordered_groups:
+        options = sorted(((rng.random(), cost, index) for index, cost in pools[members[0]]), reverse=True)
+        for rank, slot in enumerate(members):
+            depths.append((options, rank, slot))
+
+    # Score bound for the slots after each depth. With distinct picks, slot t
+    # of a group scores at most the group's t-th best option. Only
+    # remaining_budget // min_cost of them can be real picks; the rest are
+    # placeholders.
+    slot_count = len(depths)
+    suffix_bounds = []
+    for depth in range(slot_count + 1):
+        best_scores = []
+        min_cost = None
+        for options, rank, _ in depths[depth:]:
+            rank = rank if distinct else 0
+            if rank < len(options):
+                best_scores.append(options[rank][0])
+                cheapest = min(cost for _, cost, _ in options[rank:])
+                min_cost = cheapest if min_cost is None else min(min_cost, cheapest)
+        best_scores.sort(reverse=True)
+        prefix = [0.0]
+        for value in best_scores:
+            prefix.append(prefix[-1] + value)
+        suffix_bounds.append((prefix, min_cost, slot_count - depth))
+
+    def score_bound(depth: int, remaining_budget: int) -> float:
+        prefix, min_cost, remaining = suffix_bounds[depth]
+        picks = len(prefix) - 1
+        if min_cost:
+            picks = min(picks, remaining_budget // min_cost)
+        return prefix[picks] + PLACEHOLDER_SCORE * (remaining - picks)
+
+    best_score = float('-inf')
+    best_choice = None
+    chosen = [None] * slot_count
+    used = set()
+
+    def search(depth: int, score: float, cost: int, min_position: int):
+        nonlocal best_score, best_choice
+        if depth == slot_count:
+            if score > best_score:
+                best_score = score
+                best_choice = list(chosen)
+            return
+
+        options, rank, _ = depths[depth]
+        next_is_same_group = depth + 1 < slot_count and depths[depth + 1][1] == rank + 1
+        start = min_position if rank else 0
+        upper_bound = score_bound(depth + 1, budget_units - cost)
+
+        for position in range(start, len(options)):
+            option_score, option_cost, index = options[position]
+            if score + option_score + upper_bound <= best_score:
+                break  # options are sorted by score, nothing later can win
+            if cost + option_cost > budget_units:
+                continue
+            if score + option_score + score_bound(depth + 1, budget_units - cost - option_cost) <= best_score:
+                continue
+            if distinct and index in used:
+                continue
+            chosen[depth] = index
+            used.add(index)
+            next_position = (position + 1 if distinct else position) if next_is_same_group else 0
+            search(depth + 1, score + option_score, cost + option_cost, next_position)
+            used.discard(index)
+
+        if score + PLACEHOLDER_SCORE + upper_bound > best_score:
+            # Placeholders sort last within a group
+            chosen[depth] = None
+            search(depth + 1, score + PLACEHOLDER_SCORE, cost, len(options) if next_is_same_group else 0)
+
+    search(0, 0.0, 0, 0)
+
+    result = [None] * slot_count
+    for depth, (_, _, slot) in enumerate(depths):
+        result[slot] = best_choice[depth]
+    return result
+
+def select_week_assistance(session_templates: list, exercise_library: dict, constraints: list,
+                           equipment: list, phase_id: str, rng=random) -> dict:
+    """
+    Select assistance for every session of a week at once.
+
+    Args:
+        session_templates: Session templates in weekly order
+        exercise_library: Parsed exercises.latest.json
+        constraints: User constraints (e.g., 'knee_issues')
+        equipment: Available equipment
+        phase_id: Macrocycle phase of the week (sets the fatigue budget)
+        rng: Random source for preference scores
+
+    Returns:
+        Dict with 'sessions' (one {slotId: selection} per session) and 'fatigue'
+        ({budget, total})
+    """
+    slots = [slot for session in session_templates for slot in session['assistanceSlots']]
+    slot_ids = tuple(slot['slotId'] for slot in slots)
+    phase_family = get_phase_family(phase_id)
+
+    pools = get_candidate_pools(exercise_library, slot_ids, constraints, equipment, phase_family)
+    per_slot_budget = PHASE_SLOT_FATIGUE_BUDGET.get(phase_family, DEFAULT_SLOT_FATIGUE_BUDGET)
+    budget_units = round(per_slot_budget * len(slots) * FATIGUE_SCALE)
+    distinct = exercise_library.get('slotRules', {}).get('oneExercisePerSlot', True)
+
+    choice = solve_assistance(pools, slot_ids, budget_units, distinct, rng)
+
+    exercises = exercise_library['exercises']
+    costs = [dict(pool) for pool in pools]
+    sessions = []
+    total_units = 0
+    position = 0
+    for session in session_templates:
+        selected = {}
+        for slot in session['assistanceSlots']:
+            slot_id = slot['slotId']
+            index = choice[position]
+            if index is None:
+                selected[slot_id] = {
+                    'exerciseId': f"placeholder_{slot_id}",
+                    'name': f"Any {slot_id.replace('_', ' ').title()}",
+                    'minReps': slot.get('minReps', 10),
+                    'maxReps': slot.get('maxReps', 20)
+                }
+            else:
+                cost = costs[position][index]
+                total_units += cost
+                selected[slot_id] = {
+                    'exerciseId': exercises[index]['exerciseId'],
+                    'name': exercises[index]['name'],
+                    'minReps': slot.get('minReps', 10),
+                    'maxReps': slot.get('maxReps', 20),
+                    'fatigue': cost / FATIGUE_SCALE
+                }
+            position += 1
+        sessions.append(selected)
+
+    return {
+        'sessions': sessions,
+        'fatigue': {
+            'budget': budget_units / FATIGUE_SCALE,
+            'total': total_units / FATIGUE_SCALE
+        }
+    }
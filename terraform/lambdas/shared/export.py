@@ -0,0 +1,283 @@
+import csv
+import io
+import zlib
+from datetime import date, datetime, timedelta
+
+from shared.aws_clients import get_client
+from shared.progress import clean_progress, DATA_TYPE as PROGRESS_DATA_TYPE
+from shared.week_render import DAY_ABBREVIATIONS, build_week, get_week_days
+from shared.weights import from_units, to_units
+
+# Exports are produced as a chain of generators (plan weeks and workout
+# pages -> entries -> text lines -> gzip parts -> S3 multipart upload), so
+# memory stays at one rendered week, one DynamoDB page and one part no
+# matter how long the history is. Each entry is one calendar day:
+#   {'kind': 'plan'|'workout', 'uid', 'date', 'weekIndex', 'phase',
+#    'title', 'units', 'notes', 'sets': [{'exercise', 'set', 'weight', 'reps', 'pctTM'}]}
+s3_client = get_client('s3')
+
+# S3 needs at least 5 MB for every part but the last
+PART_BYTES = 8 * 1024 * 1024
+COMPRESSION_LEVEL = 6
+# zlib window bits for a gzip container
+GZIP_WBITS = 31
+
+CSV_COLUMNS = ['source', 'date', 'week', 'phase', 'session', 'exercise', 'set', 'weight', 'reps', 'pct_tm', 'units', 'notes']
+
+def current_week_start(today: date, preferred_start_day: str) -> date:
+    """Most recent preferredStartDay on or before today."""
+    start_offset = DAY_ABBREVIATIONS.index(preferred_start_day)
+    # isoweekday() % 7 numbers days from Sunday like DAY_ABBREVIATIONS
+    return today - timedelta(days=(today.isoweekday() % 7 - start_offset) % 7)
+
+def plan_weeks(state: dict, program: dict, exercise_library: dict, today: date):
+    """
+    Every week of the macrocycle laid out on the calendar, one at a time.
+
+    The user's current floating week is the week containing today; the
+    other weeks are placed before and after it. Weeks whose phase has no
+    main lift scheme (test and reset weeks) have no rendered sessions.
+    """
+    settings = state['PROGRAM_SETTINGS']
+    current_week = clean_progress(state.get(PROGRESS_DATA_TYPE))['programWeek']
+    first_day = current_week_start(today, settings.get('preferredStartDay', 'mon'))
+
+    for week_index in sorted(program['phasesByWeek']):
+        phase = program['phasesByWeek'][week_index]
+        week_start = first_day + timedelta(weeks=week_index - current_week)
+        rendered = None
+        if program['setSchemeByWeek'].get(week_index):
+            rendered = build_week(state['STRENGTH'], settings, program, exercise_library, week_index, phase)
+        yield {
+            'weekIndex': week_index,
+            'phase': phase,
+            'days': get_week_days(settings, state.get('SCHEDULE', {}), program['template'], week_start.isoformat()),
+            'sessions': rendered['sessions'] if rendered else None
+        }
+
+def session_sets(session: dict, lift_names: dict) -> list:
+    """Main, supplemental and assistance sets of a rendered session as export sets."""
+    lift = lift_names.get(session['mainLiftId'], session['mainLiftId'])
+    sets = [
+        {'exercise': lift, 'set': number, 'weight': work_set['weight'], 'reps': work_set['targetReps'],
+         'pctTM': work_set['pctTM']}
+        for number, work_set in enumerate(session['mainSets'], 1)
+    ]
+    supplemental = session['supplemental']
+    if supplemental:
+        reps = '-'.join(str(reps) for reps in supplemental['repsRange'])
+        sets.extend(
+            {'exercise': supplemental['label'], 'set': number, 'weight': supplemental['weight'],
+             'reps': reps}
+            for number in range(1, supplemental['sets'] + 1)
+        )
+    sets.extend({'exercise': slot['name']} for slot in session['assistanceSlots'])
+    return sets
+
+def lift_names(program: dict) -> dict:
+    return {lift['liftId']: lift['displayName'] for lift in program['template'].get('lifts', [])}
+
+def plan_entries(weeks, program: dict, unit: str):
+    """Entries for every training day of the planned weeks (daySwaps applied)."""
+    template = program['template']
+    names = lift_names(program)
+    nonlift_names = {
+        day_type['typeId']: day_type['label']
+        for day_type in template.get('nonLiftingDayTypes', {}).get('types', [])
+    }
+    session_templates = program['sessionTemplates']
+
+    for week in weeks:
+        phase = week['phase']
+        for day in week['days']:
+            entry = {
+                'kind': 'plan',
+                'uid': f"plan-{program['programId']}-{day['date']}",
+                'date': day['date'],
+                'weekIndex': week['weekIndex'],
+                'phase': phase['label'],
+                'units': unit,
+                'notes': '',
+                'sets': []
+            }
+            if 'swappedSession' in day:
+                swapped = day['swappedSession']
+                entry['title'] = swapped.get('label', 'Swapped session') if isinstance(swapped, dict) else str(swapped)
+                entry['notes'] = 'Swapped'
+            elif day['type'] == 'main':
+                index = day['sessionIndex']
+                if week['sessions'] and index < len(week['sessions']):
+                    session = week['sessions'][index]
+                    entry['title'] = session['label']
+                    entry['sets'] = session_sets(session, names)
+                elif index < len(session_templates):
+                    entry['title'] = f"{session_templates[index]['label']} ({phase['label']})"
+                else:
+                    continue
+            elif day['type'] == 'nonlift':
+                entry['title'] = nonlift_names.get(day['nonLiftType'], day['nonLiftType'])
+            else:
+                continue
+            yield entry
+
+def workout_sets(workout: dict, names: dict) -> list:
+    """Logged sets of a workout item (main lift, circuits and non-lifting exercises)."""
+    sets = []
+    main_lift = workout.get('mainLift') or {}
+    lift = names.get(main_lift.get('liftId'), main_lift.get('liftId'))
+    for number, logged in enumerate(main_lift.get('sets', []), 1):
+        sets.append({'exercise': lift, 'set': number, 'weight': logged.get('weight'),
+                     'reps': logged.get('reps'), 'pctTM': logged.get('pctTM')})
+    for circuit_name in ('circuit', 'gppCircuit'):
+        for logged in (workout.get(circuit_name) or {}).get('sets', []):
+            sets.append({'exercise': logged.get('exerciseName') or logged.get('exercise') or logged.get('exerciseId'),
+                         'set': logged.get('round'), 'weight': logged.get('weight'), 'reps': logged.get('reps')})
+    for exercise in (workout.get('nonLiftingDay') or {}).get('exercises', []):
+        sets.append({'exercise': exercise.get('name'), 'set': exercise.get('sets'),
+                     'reps': exercise.get('reps') or exercise.get('duration')})
+    return sets
+
+def workout_entries(workouts, program: dict, default_unit: str):
+    """Entries for logged workouts (any iterable, consumed lazily)."""
+    names = lift_names(program)
+    session_labels = {template['sessionId']: template['label'] for template in program['sessionTemplates']}
+    for workout in workouts:
+        kind = (workout.get('gppCircuit') or workout.get('nonLiftingDay') or {}).get('type')
+        kind = kind or session_labels.get(workout.get('sessionId'), workout.get('sessionId'))
+        yield {
+            'kind': 'workout',
+            'uid': f"workout-{workout['workoutDate']}-{workout.get('sessionId', '')}",
+            'date': workout['workoutDate'],
+            'weekIndex': workout.get('programWeek'),
+            'phase': '',
+            'title': f"Logged: {kind or 'Workout'}",
+            'units': workout.get('units', default_unit),
+            'notes': workout.get('notes', ''),
+            'sets': workout_sets(workout, names)
+        }
+
+def format_number(value) -> str:
+    """Weights and reps as plain numbers (102.5, not 102.50 or 102.5000001)."""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value
+    return f'{from_units(to_units(value)):g}'
+
+def describe_set(entry_set: dict, unit: str) -> str:
+    text = entry_set['exercise'] or ''
+    if entry_set.get('weight'):
+        text += f": {format_number(entry_set['weight'])} {unit}"
+    if entry_set.get('reps'):
+        text += f" x {format_number(entry_set['reps'])}"
+    if entry_set.get('pctTM'):
+        text += f" ({format_number(entry_set['pctTM'] * 100)}%)"
+    return text
+
+def ics_escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+def ics_line(name: str, value: str) -> str:
+    """One content line, folded at 75 octets (RFC 5545 3.1)."""
+    line = f'{name}:{value}'
+    if len(line.encode('utf-8')) <= 75:
+        return line + '\r\n'
+    pieces, current, size = [], '', 0
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > 75:
+            pieces.append(current)
+            current, size = ' ', 1
+        current += char
+        size += char_size
+    pieces.append(current)
+    return '\r\n'.join(pieces) + '\r\n'
+
+def ics_lines(entries):
+    """iCalendar document with one all-day event per entry."""
+    dtstamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+    yield 'BEGIN:VCALENDAR\r\n'
+    yield 'VERSION:2.0\r\n'
+    yield 'PRODID:-//Styrkr//Export//EN\r\n'
+    yield 'CALSCALE:GREGORIAN\r\n'
+    yield ics_line('X-WR-CALNAME', 'Styrkr')
+    for entry in entries:
+        description = []
+        if entry['weekIndex']:
+            description.append(f"Week {entry['weekIndex']}" + (f" - {entry['phase']}" if entry['phase'] else ''))
+        description.extend(describe_set(entry_set, entry['units']) for entry_set in entry['sets'])
+        if entry['notes']:
+            description.append(entry['notes'])
+        yield 'BEGIN:VEVENT\r\n'
+        yield ics_line('UID', ics_escape(f"{entry['uid']}@styrkr"))
+        yield ics_line('DTSTAMP', dtstamp)
+        yield ics_line('DTSTART;VALUE=DATE', entry['date'].replace('-', ''))
+        yield ics_line('SUMMARY', ics_escape(entry['title']))
+        yield ics_line('DESCRIPTION', ics_escape('\n'.join(description)))
+        yield ics_line('CATEGORIES', 'Plan' if entry['kind'] == 'plan' else 'Workout')
+        yield 'END:VEVENT\r\n'
+    yield 'END:VCALENDAR\r\n'
+
+def csv_lines(entries):
+    """CSV document with one row per set (or per day for days without sets)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(row: list) -> str:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        return buffer.getvalue()
+
+    yield line(CSV_COLUMNS)
+    for entry in entries:
+        day = [entry['kind'], entry['date'], entry['weekIndex'] or '', entry['phase'], entry['title']]
+        for entry_set in entry['sets'] or [{'exercise': ''}]:
+            yield line(day + [
+                entry_set['exercise'] or '',
+                format_number(entry_set.get('set')),
+                format_number(entry_set.get('weight')),
+                format_number(entry_set.get('reps')),
+                format_number(entry_set['pctTM'] * 100) if entry_set.get('pctTM') else '',
+                entry['units'],
+                entry['notes']
+            ])
+
+def gzip_parts(lines, part_bytes: int = PART_BYTES):
+    """Gzip a stream of text lines into chunks of at least part_bytes (the last may be smaller)."""
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+    buffer = bytearray()
+    for line in lines:
+        buffer += compressor.compress(line.encode('utf-8'))
+        if len(buffer) >= part_bytes:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += compressor.flush()
+    yield bytes(buffer)
+
+def upload_parts(parts, bucket: str, key: str, **object_params) -> int:
+    """
+    Multipart-upload chunks as they are produced; the upload is aborted on error.
+
+    Returns:
+        Object size in bytes
+    """
+    upload_id = s3_client.create_multipart_upload(Bucket=bucket, Key=key, **object_params)['UploadId']
+    uploaded, size = [], 0
+    try:
+        for number, body in enumerate(parts, 1):
+            response = s3_client.upload_part(Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body)
+            uploaded.append({'ETag': response['ETag'], 'PartNumber': number})
+            size += len(body)
+        s3_client.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': uploaded}
+        )
+    except Exception:
+        s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+    return size
+
+def download_url(bucket: str, key: str, expires_in: int) -> str:
+    return s3_client.generate_presigned_url(
+        'get_object', Params={'Bucket': bucket, 'Key': key}, ExpiresIn=expires_in
+    )
@@ -1,41 +1,164 @@
+import base64
+import gzip
+import hashlib
 import json
-import traceback
-from shared.auth import get_user_context
-from shared.response import error_response
+import time
+from shared import logger, profiler
+from shared.jwt_validator import validate_user_context
+from shared.request_context import RequestContext
+from shared.response import error_response, not_modified_response
 
-def handle_request(event, context, get_handler=None, post_handler=None, put_handler=None, require_user_id=True):
+# Bodies smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = 1024
+
+def etag_matches(if_none_match: str | None, etag: str | None) -> bool:
+    """True if an If-None-Match header value names this ETag (weak comparison)."""
+    if not if_none_match or not etag:
+        return False
+    candidates = {candidate.strip().removeprefix('W/') for candidate in if_none_match.split(',')}
+    return '*' in candidates or etag.removeprefix('W/') in candidates
+
+# Middleware stages. Each takes (ctx, call_next) and returns a response;
+# calling call_next(ctx) runs the rest of the pipeline.
+
+def log_request(ctx: RequestContext, call_next) -> dict:
+    """Bind log records to this request and emit one DEBUG summary (sampled)."""
+    logger.start_request(ctx.request_id)
+    response = call_next(ctx)
+    if logger.is_enabled('DEBUG'):
+        logger.debug(
+            'Request %s %s', ctx.method, ctx.path,
+            status=response.get('statusCode'),
+            timings=ctx.timings,
+            query=ctx.query_params
+        )
+    return response
+
+def map_errors(ctx: RequestContext, call_next) -> dict:
+    """Turn any unhandled exception into a 500 with the traceback logged."""
+    try:
+        return call_next(ctx)
+    except Exception:
+        logger.exception('Handler error')
+        return error_response(500, 'INTERNAL', 'Internal server error', ctx.request_id)
+
+def profile_request(ctx: RequestContext, call_next) -> dict:
+    """Profile a sampled fraction of requests (PROFILE_SAMPLE_RATE) into a log record."""
+    if not profiler.should_profile(ctx.request_id):
+        return call_next(ctx)
+    return profiler.profile_call(f'{ctx.method} {ctx.path}', call_next, ctx)
+
+def record_timing(ctx: RequestContext, call_next) -> dict:
+    """Report total and per-stage durations (ctx.timed) in a Server-Timing header."""
+    started = time.perf_counter()
+    response = call_next(ctx)
+    ctx.timings['total'] = (time.perf_counter() - started) * 1000
+    response.setdefault('headers', {})['Server-Timing'] = ', '.join(
+        f"{name};dur={duration:.1f}" for name, duration in ctx.timings.items()
+    )
+    return response
+
+def compress_response(ctx: RequestContext, call_next) -> dict:
+    """Gzip large bodies for clients that accept it."""
+    response = call_next(ctx)
+    body = response.get('body')
+    if (
+        not body
+        or response.get('isBase64Encoded')
+        or len(body) < COMPRESSION_MIN_BYTES
+        or 'gzip' not in (ctx.header('accept-encoding') or '')
+    ):
+        return response
+
+    response['body'] = base64.b64encode(gzip.compress(body.encode('utf-8'), compresslevel=5)).decode('ascii')
+    response['isBase64Encoded'] = True
+    headers = response.setdefault('headers', {})
+    headers['Content-Encoding'] = 'gzip'
+    headers['Vary'] = 'Accept-Encoding'
+    return response
+
+def conditional_get(ctx: RequestContext, call_next) -> dict:
+    """
+    ETag successful GETs and answer If-None-Match with 304.
+
+    Handlers that know their ETag up front (config documents) set it and
+    can return 304 themselves before serializing; everything else gets a
+    weak ETag over the body.
+    """
+    response = call_next(ctx)
+    if ctx.method != 'GET' or response.get('statusCode') != 200:
+        return response
+
+    headers = response.setdefault('headers', {})
+    etag = headers.get('ETag')
+    if not etag:
+        etag = f'W/"{hashlib.sha1(response["body"].encode("utf-8")).hexdigest()[:32]}"'
+        headers['ETag'] = etag
+    if etag_matches(ctx.header('if-none-match'), etag):
+        return not_modified_response(etag)
+    return response
+
+def authenticate(ctx: RequestContext, call_next) -> dict:
+    """Require JWT claims (sub and email) and attach them to the context."""
     try:
-        request_id = context.aws_request_id
-        method = event['requestContext']['http']['method']
-        
-        user_context = get_user_context(event)
-        
-        required_fields = ['email']
-        if require_user_id:
-            required_fields.append('userId')
-        
-        if not user_context or not all(user_context.get(field) for field in required_fields):
-            return error_response(403, 'FORBIDDEN', 'Invalid or missing authentication', request_id)
-        
-        handlers = {
-            'GET': get_handler,
-            'POST': post_handler,
-            'PUT': put_handler
-        }
-        
-        handler = handlers.get(method)
+        ctx.user_context = validate_user_context(ctx.event)
+    except ValueError as e:
+        return error_response(403, 'FORBIDDEN', str(e), ctx.request_id)
+    return call_next(ctx)
+
+def parse_request(ctx: RequestContext, call_next) -> dict:
+    """Parse the JSON body of writes and the query string into the context."""
+    ctx.query_params = ctx.event.get('queryStringParameters') or {}
+    if ctx.method in ['POST', 'PUT', 'PATCH']:
+        raw_body = ctx.event.get('body') or '{}'
+        if ctx.event.get('isBase64Encoded'):
+            raw_body = base64.b64decode(raw_body).decode('utf-8')
+        try:
+            ctx.body = json.loads(raw_body)
+        except json.JSONDecodeError:
+            return error_response(400, 'VALIDATION_ERROR', 'Request body must be valid JSON', ctx.request_id)
+    return call_next(ctx)
+
+# Outermost first
+PUBLIC_MIDDLEWARE = [
+    log_request, map_errors, profile_request, record_timing, compress_response, conditional_get, parse_request
+]
+DEFAULT_MIDDLEWARE = [
+    log_request, map_errors, profile_request, record_timing, compress_response, conditional_get, authenticate,
+    parse_request
+]
+
+def build_pipeline(middleware: list, endpoint):
+    """Compose middleware stages around an endpoint taking (ctx)."""
+    def bind(stage, call_next):
+        return lambda ctx: stage(ctx, call_next)
+
+    call = endpoint
+    for stage in reversed(middleware):
+        call = bind(stage, call)
+    return call
+
+def handle_request(event, context, get_handler=None, post_handler=None, put_handler=None, patch_handler=None,
+                   middleware=DEFAULT_MIDDLEWARE):
+    """
+    Run a request through the middleware pipeline and dispatch on method.
+
+    Handlers are called as handler(ctx, body_or_query_params, request_id, event):
+    writes get the parsed JSON body, GET gets the query parameters.
+    """
+    handlers = {
+        'GET': get_handler,
+        'POST': post_handler,
+        'PUT': put_handler,
+        'PATCH': patch_handler
+    }
+
+    def dispatch(ctx: RequestContext) -> dict:
+        handler = handlers.get(ctx.method)
         if not handler:
-            return error_response(405, 'METHOD_NOT_ALLOWED', 'Method not allowed', request_id)
-        
-        if method in ['POST', 'PUT']:
-            body = json.loads(event.get('body', '{}'))
-            return handler(user_context, body, request_id, event)
-        elif method == 'GET':
-            query_params = event.get('queryStringParameters')
-            return handler(user_context, query_params, request_id, event)
-        
-    except Exception as e:
-        print(f"Handler error: {type(e).__name__}: {str(e)}")
-        traceback.print_exc()
-        return error_response(500, 'INTERNAL', 'Internal server error', context.aws_request_id)
+            return error_response(405, 'METHOD_NOT_ALLOWED', 'Method not allowed', ctx.request_id)
+        argument = ctx.query_params if ctx.method == 'GET' else ctx.body
+        return handler(ctx, argument, ctx.request_id, ctx.event)
 
+    ctx = RequestContext(None, context.aws_request_id, event)
+    return build_pipeline(middleware, dispatch)(ctx)
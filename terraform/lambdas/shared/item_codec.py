@@ -0,0 +1,40 @@
+import base64
+import json
+from decimal import Decimal
+from boto3.dynamodb.types import Binary
+
+from shared.response import DecimalEncoder
+
+class ItemEncoder(DecimalEncoder):
+    """
+    Lossless JSON encoding of DynamoDB items.
+
+    Integral Decimals become ints and the rest floats, which decode back to
+    the same Decimal (stored numbers come from Decimal(str(float))). Sets and
+    binary values are tagged so they round-trip as DynamoDB set and B types.
+    """
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return int(obj) if obj == obj.to_integral_value() else float(obj)
+        if isinstance(obj, (set, frozenset)):
+            return {'__set__': sorted(obj, key=str)}
+        if isinstance(obj, Binary):
+            obj = obj.value
+        if isinstance(obj, (bytes, bytearray)):
+            return {'__binary__': base64.b64encode(obj).decode('ascii')}
+        return super().default(obj)
+
+def _decode_tags(obj: dict):
+    if '__set__' in obj and len(obj) == 1:
+        return set(obj['__set__'])
+    if '__binary__' in obj and len(obj) == 1:
+        return base64.b64decode(obj['__binary__'])
+    return obj
+
+def dumps_item(item: dict) -> str:
+    """Serialize one item to a compact JSON line."""
+    return json.dumps(item, cls=ItemEncoder, separators=(',', ':'))
+
+def loads_item(line: str) -> dict:
+    """Parse one JSON line back into a DynamoDB-ready item (floats as Decimal)."""
+    return json.loads(line, parse_float=Decimal, object_hook=_decode_tags)
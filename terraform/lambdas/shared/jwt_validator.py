@@ -55,15 +55,32 @@ def validate_user_context(event: dict) -> Dict[str, str]:
     except (KeyError, TypeError) as e:
         raise ValueError(f'Invalid JWT context: {str(e)}')
 
+USER_KEY_PREFIX = 'USER#'
+
 def get_dynamodb_user_key(user_id: str) -> str:
     """
     Generate DynamoDB partition key for user data.
     
+    This is the single key scheme for every user item in both the data and
+    workout history tables. It is derived from the immutable sub claim, so
+    email changes do not orphan data.
+    
     Args:
         user_id: User ID (sub claim from JWT)
     
     Returns:
         Partition key in format USER#{userId}
     """
-    return f"USER#{user_id}"
+    return f"{USER_KEY_PREFIX}{user_id}"
+
+def get_legacy_user_key(email: str) -> str:
+    """
+    Partition key used before key unification (raw email).
+    
+    Only read during the migration window; new writes never use it.
+    """
+    return email
+
+def is_unified_user_key(key: str) -> bool:
+    return key.startswith(USER_KEY_PREFIX)
 
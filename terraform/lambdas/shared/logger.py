@@ -0,0 +1,83 @@
+import json
+import os
+import re
+import traceback
+import zlib
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40}
+
+LOG_LEVEL = LEVELS.get(os.environ.get('LOG_LEVEL', 'INFO').upper(), LEVELS['INFO'])
+# Fraction of requests logged at DEBUG regardless of LOG_LEVEL
+DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '0'))
+
+REDACTED = '[REDACTED]'
+# Keys whose values are PII or credentials wherever they appear in a record
+REDACTED_KEYS = frozenset({
+    'email', 'userEmail', 'name', 'given_name', 'family_name',
+    'claims', 'authorization', 'Authorization', 'cognito:username'
+})
+EMAIL_PATTERN = re.compile(r'[^@\s"\'<>]+@[^@\s"\'<>]+\.[A-Za-z]{2,}')
+
+# Per-invocation state; Lambda runs one request per container at a time
+_request = {'requestId': None, 'level': LOG_LEVEL}
+
+def is_sampled(request_id: str, rate: float) -> bool:
+    """Deterministic sampling decision: the same request ID always gets the same answer."""
+    return rate > 0 and zlib.crc32(request_id.encode('utf-8')) / 0xFFFFFFFF < rate
+
+def start_request(request_id: str):
+    """Bind records to a request and decide once whether it is sampled for DEBUG."""
+    level = LOG_LEVEL
+    if is_sampled(request_id, DEBUG_SAMPLE_RATE):
+        level = LEVELS['DEBUG']
+    _request['requestId'] = request_id
+    _request['level'] = level
+
+def is_enabled(level: str) -> bool:
+    return LEVELS[level] >= _request['level']
+
+def redact(value):
+    """Copy of a value with PII keys masked and email addresses scrubbed from strings."""
+    if isinstance(value, dict):
+        return {key: REDACTED if key in REDACTED_KEYS else redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, str):
+        return EMAIL_PATTERN.sub(REDACTED, value)
+    return value
+
+def log(level: str, msg: str, *args, **fields):
+    """
+    Emit one compact JSON record if the level is enabled for this request.
+
+    msg is %-formatted with args and fields are redacted and serialized only
+    when the record is actually written, so disabled calls cost one compare.
+    """
+    if LEVELS[level] < _request['level']:
+        return
+    record = {
+        'level': level,
+        'msg': redact(msg % args if args else msg),
+        'requestId': _request['requestId']
+    }
+    record.update(redact(fields))
+    print(json.dumps(record, separators=(',', ':'), default=str))
+
+def debug(msg: str, *args, **fields):
+    log('DEBUG', msg, *args, **fields)
+
+def info(msg: str, *args, **fields):
+    log('INFO', msg, *args, **fields)
+
+def warning(msg: str, *args, **fields):
+    log('WARNING', msg, *args, **fields)
+
+def error(msg: str, *args, **fields):
+    log('ERROR', msg, *args, **fields)
+
+def exception(msg: str, *args, **fields):
+    """ERROR record with the active exception's summary and traceback."""
+    if not is_enabled('ERROR'):
+        return
+    formatted = traceback.format_exc()
+    log('ERROR', msg, *args, error=formatted.strip().splitlines()[-1], traceback=formatted, **fields)
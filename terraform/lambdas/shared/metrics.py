@@ -0,0 +1,37 @@
+import json
+import os
+import time
+
+# CloudWatch namespace for metrics emitted by the Lambdas
+NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'Styrkr')
+
+def emit(name: str, dimensions: dict, values: dict, units: dict | None = None):
+    """
+    Write one CloudWatch Embedded Metric Format record to stdout.
+
+    CloudWatch extracts every key of values as a metric under the given
+    dimensions, so no PutMetricData call is made on the request path. The
+    record bypasses shared/logger so LOG_LEVEL and PII redaction can never
+    drop or rewrite it.
+
+    Args:
+        name: Record message (e.g. 'Render store')
+        dimensions: Dimension name -> value
+        values: Metric name -> number
+        units: Metric name -> CloudWatch unit (default Count)
+    """
+    units = units or {}
+    record = {
+        'message': name,
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': NAMESPACE,
+                'Dimensions': [list(dimensions)],
+                'Metrics': [{'Name': metric, 'Unit': units.get(metric, 'Count')} for metric in values]
+            }]
+        },
+        **dimensions,
+        **values
+    }
+    print(json.dumps(record, separators=(',', ':'), default=float))
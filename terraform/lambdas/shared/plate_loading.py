@@ -0,0 +1,119 @@
+from math import gcd
+
+from shared.weights import from_units, round_to_increment, scale_units, to_units
+
+DEFAULT_BAR_WEIGHT = {'lb': 45, 'kg': 20}
+DEFAULT_PLATES = {
+    'lb': (45, 35, 25, 10, 5, 2.5),
+    'kg': (25, 20, 15, 10, 5, 2.5, 1.25)
+}
+# Tables cover bar weight up to this much per unit
+MAX_TABLE_WEIGHT = {'lb': 1000, 'kg': 450}
+
+# 5/3/1 warmup ramp: (fraction of training max, reps)
+WARMUP_RAMP = ((0.40, 5), (0.50, 5), (0.60, 3))
+
+_table_cache = {}
+TABLE_CACHE_MAX_ENTRIES = 64
+
+def get_loading_params(settings: dict) -> tuple:
+    """(unit, bar, plates, rounding) for a user's program settings, weights in units."""
+    unit = settings.get('preferredUnits', 'lb')
+    if unit not in DEFAULT_BAR_WEIGHT:
+        unit = 'lb'
+    bar_units = to_units(settings.get('barWeight') or DEFAULT_BAR_WEIGHT[unit])
+    plate_units = tuple(sorted({to_units(p) for p in settings.get('availablePlates') or DEFAULT_PLATES[unit]}, reverse=True))
+    rounding_units = max(1, to_units(settings.get('rounding', 5)))
+    return unit, bar_units, plate_units, rounding_units
+
+def build_loading_table(unit: str, bar_units: int, plate_units: tuple, rounding_units: int) -> dict:
+    """
+    Plates per side for every rounding increment from the bar up to the unit's max.
+
+    Uses a fewest-plates DP over per-side load, so any plate set works (not
+    just ones where greedy is optimal). Targets that cannot be loaded exactly
+    get the heaviest loadable weight below them.
+
+    Returns:
+        Dict of weight in units -> {'perSide': [...], 'loadedWeight': w} (API numbers)
+    """
+    plate_units = sorted({p for p in plate_units if p > 0}, reverse=True)
+    max_units = to_units(MAX_TABLE_WEIGHT[unit])
+    step = 0
+    for plate in plate_units:
+        step = gcd(step, plate)
+
+    # fewest[i] = plate count for i * step per side, last_plate[i] = plate used to reach it
+    side_steps = max(0, (max_units - bar_units) // 2 // step) if step else 0
+    fewest = [0] + [None] * side_steps
+    last_plate = [0] * (side_steps + 1)
+    for i in range(1, side_steps + 1):
+        for plate in plate_units:
+            previous = i - plate // step
+            if previous >= 0 and fewest[previous] is not None and (fewest[i] is None or fewest[previous] + 1 < fewest[i]):
+                fewest[i] = fewest[previous] + 1
+                last_plate[i] = plate
+
+    table = {}
+    target = bar_units - bar_units % rounding_units
+    while target <= max_units:
+        i = max(0, (target - bar_units) // 2 // step) if step else 0
+        while i and fewest[i] is None:
+            i -= 1
+        per_side = []
+        while i:
+            per_side.append(last_plate[i])
+            i -= last_plate[i] // step
+        per_side.sort(reverse=True)
+        table[target] = {
+            'perSide': [from_units(plate) for plate in per_side],
+            'loadedWeight': from_units(bar_units + 2 * sum(per_side))
+        }
+        target += rounding_units
+    return table
+
+def get_loading_table(unit: str, bar_units: int, plate_units: tuple, rounding_units: int) -> dict:
+    """build_loading_table, memoized per (unit, bar, plates, rounding)."""
+    cache_key = (unit, bar_units, plate_units, rounding_units)
+    table = _table_cache.get(cache_key)
+    if table is None:
+        if len(_table_cache) >= TABLE_CACHE_MAX_ENTRIES:
+            _table_cache.clear()
+        table = build_loading_table(unit, bar_units, plate_units, rounding_units)
+        _table_cache[cache_key] = table
+    return table
+
+def lookup_loading(table: dict, params: tuple, units: int) -> dict:
+    unit, bar_units, _, rounding_units = params
+    key = round_to_increment(units, rounding_units)
+    if key in table:
+        return table[key]
+    if units <= bar_units:
+        return {'perSide': [], 'loadedWeight': from_units(bar_units)}
+    return table[max(table)]
+
+def load_weights(weights, settings: dict) -> dict:
+    """
+    Batch plate breakdowns: one table fetch, one lookup per distinct weight.
+
+    Args:
+        weights: Iterable of weights in units (e.g. every set of a week or macrocycle)
+        settings: Program settings (units, rounding, optional barWeight/availablePlates)
+
+    Returns:
+        Dict of weight in units -> {'perSide': [...], 'loadedWeight': w}
+    """
+    params = get_loading_params(settings)
+    table = get_loading_table(*params)
+    return {units: lookup_loading(table, params, units) for units in set(weights)}
+
+def warmup_weights(training_max: int, rounding: int, bar_weight: int) -> list:
+    """Warmup ramp for a training max, never below the empty bar (all in units)."""
+    return [
+        {
+            'weight': max(bar_weight, round_to_increment(scale_units(training_max, pct), rounding)),
+            'targetReps': reps,
+            'pctTM': pct
+        }
+        for pct, reps in WARMUP_RAMP
+    ]
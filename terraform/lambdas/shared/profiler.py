@@ -0,0 +1,89 @@
+import cProfile
+import os
+import pstats
+import time
+import tracemalloc
+
+from shared import logger
+
+# Fraction of requests to profile: 0 disables profiling, 1 profiles every request
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+# Hot functions and allocation sites reported per profiled request
+PROFILE_TOP_N = int(os.environ.get('PROFILE_TOP_N', '20'))
+# Stack depth recorded per allocation; deeper is more useful and slower
+PROFILE_TRACEMALLOC_FRAMES = int(os.environ.get('PROFILE_TRACEMALLOC_FRAMES', '1'))
+
+ENABLED = PROFILE_SAMPLE_RATE > 0
+
+def should_profile(request_id: str) -> bool:
+    """Sampled, and only when the INFO record with the results would actually be written."""
+    return ENABLED and logger.is_enabled('INFO') and logger.is_sampled(request_id, PROFILE_SAMPLE_RATE)
+
+def short_path(filename: str) -> str:
+    """Trim install prefixes so records show 'shared/plate_loading.py' rather than /var/task/..."""
+    for marker in ('/site-packages/', '/var/task/', '/var/runtime/', '/lib/python'):
+        index = filename.rfind(marker)
+        if index != -1:
+            return filename[index + len(marker):]
+    return filename
+
+def top_functions(profile: cProfile.Profile, limit: int) -> list:
+    """Hottest functions by own time (excluding callees), skipping the profiler's frames."""
+    stats = pstats.Stats(profile).stats
+    rows = []
+    for (filename, line, name), (_, calls, own, cumulative, _) in stats.items():
+        if filename == __file__:
+            continue
+        rows.append({
+            'function': f'{short_path(filename)}:{line}({name})',
+            'calls': calls,
+            'ownMs': round(own * 1000, 2),
+            'cumulativeMs': round(cumulative * 1000, 2)
+        })
+    rows.sort(key=lambda row: row['ownMs'], reverse=True)
+    return rows[:limit]
+
+def top_allocations(snapshot: tracemalloc.Snapshot, limit: int) -> list:
+    """Allocation sites still holding the most memory when the request finished."""
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__)
+    ])
+    return [
+        {
+            'site': f'{short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}',
+            'sizeKb': round(stat.size / 1024, 1),
+            'count': stat.count
+        }
+        for stat in snapshot.statistics('lineno')[:limit]
+    ]
+
+def profile_call(label: str, call, *args, **kwargs):
+    """
+    Run call(*args, **kwargs) under cProfile and tracemalloc and log the results.
+
+    Emits one INFO record with wall time, peak traced memory, the top
+    PROFILE_TOP_N functions by own time and the top allocation sites.
+    The record is written even if the call raises.
+    """
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+    tracemalloc.reset_peak()
+    profile = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+        return profile.runcall(call, *args, **kwargs)
+    finally:
+        wall_ms = (time.perf_counter() - started) * 1000
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+        logger.info(
+            'Profile %s', label,
+            wallMs=round(wall_ms, 2),
+            peakKb=round(peak / 1024, 1),
+            functions=top_functions(profile, PROFILE_TOP_N),
+            allocations=top_allocations(snapshot, PROFILE_TOP_N)
+        )
@@ -0,0 +1,64 @@
+import sys
+
+def get_phase_for_week(week_index: int, template: dict):
+    """Determine which phase a week belongs to."""
+    for phase in template['macrocycle']['phases']:
+        if week_index in phase['weeks']:
+            return phase
+    return None
+
+def get_set_scheme_name(phase: dict, week_index: int) -> str | None:
+    """Determine the main lift set scheme for a week within its phase."""
+    schemes_by_week = phase.get('mainLiftSchemeByWeekInCycle')
+    if schemes_by_week:
+        # Weeks cycle through the scheme map (e.g. Leader weeks 1-6 run 5s PRO weeks 1-3 twice)
+        week_in_cycle = str(phase['weeks'].index(week_index) % len(schemes_by_week) + 1)
+        return schemes_by_week.get(week_in_cycle) or phase.get('mainLiftScheme')
+    return phase.get('mainLiftScheme')
+
+def get_session_templates(template: dict) -> list:
+    """Resolve the weekly session templates in slot order."""
+    weekly_sessions = sorted(template['macrocycle']['weeklySessions'], key=lambda ref: ref['slotIndex'])
+    return [template['sessionTemplates'][ref['sessionTemplateRef']] for ref in weekly_sessions]
+
+def deep_sizeof(obj, seen: set | None = None) -> int:
+    """Approximate bytes held by a parsed JSON document (containers plus contents)."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+def compile_program(template: dict) -> dict:
+    """
+    Precompute the per-week lookups rendering needs from a program template.
+
+    Returns:
+        Dict with programId, version, template, phasesByWeek (week -> phase),
+        setSchemeByWeek (week -> setSchemes key, None if the phase has no
+        main lift scheme), sessionTemplates (slot order), weekSessionIds,
+        cycleLengthWeeks and sizeBytes (approximate memory footprint)
+    """
+    phases_by_week = {
+        week: phase
+        for phase in template['macrocycle']['phases']
+        for week in phase['weeks']
+    }
+    session_templates = get_session_templates(template)
+    program = {
+        'programId': template['programId'],
+        'version': template.get('version'),
+        'template': template,
+        'phasesByWeek': phases_by_week,
+        'setSchemeByWeek': {week: get_set_scheme_name(phase, week) for week, phase in phases_by_week.items()},
+        'sessionTemplates': session_templates,
+        'weekSessionIds': frozenset(session['sessionId'] for session in session_templates),
+        'cycleLengthWeeks': int(template['macrocycle']['cycleLengthWeeks'])
+    }
+    program['sizeBytes'] = deep_sizeof(program)
+    return program
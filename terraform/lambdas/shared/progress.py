@@ -0,0 +1,108 @@
+from botocore.exceptions import ClientError
+
+from shared.dynamodb import data_table
+
+DATA_TYPE = 'PROGRESS'
+
+def clean_progress(item: dict | None) -> dict:
+    """API shape of a PROGRESS item (a user with no item is at week 1 of cycle 1)."""
+    item = item or {}
+    return {
+        'programWeek': int(item.get('programWeek', 1)),
+        'cycle': int(item.get('cycle', 1)),
+        'programId': item.get('programId'),
+        'completedSessions': sorted(item.get('completedSessions') or []),
+        'updatedAt': item.get('updatedAt')
+    }
+
+def next_week(program_week: int, cycle: int, program: dict) -> tuple:
+    """(programWeek, cycle) after completing program_week, wrapping at the cycle length."""
+    if program_week >= program['cycleLengthWeeks']:
+        return 1, cycle + 1
+    return program_week + 1, cycle
+
+def advance_week(user_key: str, progress: dict, required: set, program: dict, now: str) -> dict:
+    """
+    Move a completed week on, once.
+
+    Conditioned on the week still being current, so concurrent writers that
+    both saw the last session land cannot advance twice. Only the week's
+    own sessionIds are deleted from the set.
+    """
+    program_week = int(progress['programWeek'])
+    new_week, new_cycle = next_week(program_week, int(progress.get('cycle', 1)), program)
+    try:
+        response = data_table.update_item(
+            Key={'userEmail': user_key, 'dataType': DATA_TYPE},
+            UpdateExpression='SET programWeek = :next, #cycle = :cycle, updatedAt = :now DELETE completedSessions :done',
+            ConditionExpression='programWeek = :week',
+            ExpressionAttributeNames={'#cycle': 'cycle'},
+            ExpressionAttributeValues={
+                ':next': new_week,
+                ':cycle': new_cycle,
+                ':now': now,
+                ':done': required,
+                ':week': program_week
+            },
+            ReturnValues='ALL_NEW'
+        )
+        return response['Attributes']
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        # Another request advanced it first
+        return data_table.get_item(Key={'userEmail': user_key, 'dataType': DATA_TYPE}, ConsistentRead=True)['Item']
+
+def record_session(user_key: str, user_id: str, session_id: str, program_week: int | None,
+                   program: dict, now: str) -> dict | None:
+    """
+    Count a logged lift session toward the user's current floating week.
+
+    One UpdateItem ADDs the sessionId to the week's string set (idempotent
+    for repeats). When that completes the week's sessions, the week
+    advances with a second, conditional update.
+
+    Args:
+        program_week: Week the client logged the session for; sessions for
+            any other week than the current one are not counted
+        program: Compiled program (shared/programs.compile_program)
+
+    Returns:
+        PROGRESS item after the write, or None if the session did not count
+        (non-lift session or a different week)
+    """
+    required = set(program['weekSessionIds'])
+    if session_id not in required:
+        return None
+
+    update = {
+        'Key': {'userEmail': user_key, 'dataType': DATA_TYPE},
+        'UpdateExpression': (
+            'ADD completedSessions :session '
+            'SET programWeek = if_not_exists(programWeek, :week), #cycle = if_not_exists(#cycle, :one), '
+            'userId = :userId, programId = :programId, updatedAt = :now'
+        ),
+        'ExpressionAttributeNames': {'#cycle': 'cycle'},
+        'ExpressionAttributeValues': {
+            ':session': {session_id},
+            ':week': program_week or 1,
+            ':one': 1,
+            ':userId': user_id,
+            ':programId': program['programId'],
+            ':now': now
+        },
+        'ReturnValues': 'ALL_NEW'
+    }
+    if program_week is not None:
+        update['ConditionExpression'] = 'attribute_not_exists(programWeek) OR programWeek = :week'
+
+    try:
+        progress = data_table.update_item(**update)['Attributes']
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return None
+        raise
+
+    if required <= set(progress.get('completedSessions') or ()):
+        progress = advance_week(user_key, progress, required, program, now)
+    return progress
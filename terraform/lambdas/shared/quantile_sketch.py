@@ -0,0 +1,74 @@
+import math
+import random
+
+# KLL sketch (Karnin, Lang, Liberty) as plain dicts so it serializes as JSON.
+# Level h holds items of weight 2**h. A full level is sorted and every other
+# item (random offset) is promoted, so memory stays O(k) for any stream and
+# rank error is about 1.7/k. Sketches with the same k merge by concatenating
+# levels, which makes them safe to shard and combine on read.
+DEFAULT_K = 200
+_DECAY = 2 / 3
+
+def new_sketch(k: int = DEFAULT_K) -> dict:
+    return {'k': k, 'n': 0, 'levels': [[]]}
+
+def _capacity(k: int, height: int, level: int) -> int:
+    return max(2, math.ceil(k * _DECAY ** (height - level - 1)))
+
+def _compress(sketch: dict, rng=random):
+    levels = sketch['levels']
+    while True:
+        height = len(levels)
+        if sum(len(level) for level in levels) < sum(_capacity(sketch['k'], height, h) for h in range(height)):
+            return
+        for h, level in enumerate(levels):
+            if len(level) < _capacity(sketch['k'], height, h):
+                continue
+            if h + 1 == len(levels):
+                levels.append([])
+            level.sort()
+            # An odd item out stays behind so total weight is preserved
+            carry = [level.pop()] if len(level) % 2 else []
+            levels[h + 1].extend(level[rng.randrange(2)::2])
+            levels[h] = carry
+            break
+
+def add(sketch: dict, value: float, rng=random):
+    sketch['levels'][0].append(float(value))
+    sketch['n'] += 1
+    _compress(sketch, rng)
+
+def merge(target: dict, other: dict, rng=random):
+    """Fold other into target (both must share k)."""
+    if other['k'] != target['k']:
+        raise ValueError(f"Cannot merge sketches with k={target['k']} and k={other['k']}")
+    levels = target['levels']
+    for h, level in enumerate(other['levels']):
+        if h == len(levels):
+            levels.append([])
+        levels[h].extend(level)
+    target['n'] += other['n']
+    _compress(target, rng)
+
+def rank(sketch: dict, value: float) -> float:
+    """Approximate fraction of the stream at or below value (0.0 for an empty sketch)."""
+    if not sketch['n']:
+        return 0.0
+    below = sum(
+        sum(1 for item in level if item <= value) << h
+        for h, level in enumerate(sketch['levels'])
+    )
+    return min(1.0, below / sketch['n'])
+
+def quantile(sketch: dict, q: float) -> float | None:
+    """Approximate value at fraction q of the stream (None for an empty sketch)."""
+    weighted = sorted((item, 1 << h) for h, level in enumerate(sketch['levels']) for item in level)
+    if not weighted:
+        return None
+    target = q * sketch['n']
+    seen = 0
+    for item, weight in weighted:
+        seen += weight
+        if seen >= target:
+            return item
+    return weighted[-1][0]
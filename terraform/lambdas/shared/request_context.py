@@ -0,0 +1,87 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from shared.dynamodb import load_user_state_for
+from shared.jwt_validator import get_dynamodb_user_key
+
+class RequestContext:
+    """
+    Per-invocation request state: caller identity plus memoized user items.
+
+    Created once at the top of a handler and passed down, so nested helpers
+    share a single read of each dataType instead of issuing their own
+    get_item calls. The middleware pipeline in shared/handler_utils also
+    fills in the parsed request (body, query_params) and stage timings.
+    """
+
+    def __init__(self, user_context: dict | None, request_id: str, event: dict | None = None):
+        self.user_context = user_context
+        self.request_id = request_id
+        self.event = event or {}
+        self.body = None
+        self.query_params = {}
+        self.timings = {}
+        self._items = {}
+        self._lock = threading.Lock()
+
+    @property
+    def method(self) -> str | None:
+        return self.event.get('requestContext', {}).get('http', {}).get('method')
+
+    @property
+    def path(self) -> str:
+        return self.event.get('rawPath', '')
+
+    def header(self, name: str) -> str | None:
+        """Request header by lowercase name (HTTP API v2 lowercases them)."""
+        return (self.event.get('headers') or {}).get(name)
+
+    @contextmanager
+    def timed(self, name: str):
+        """Add the duration of the block to timings[name] in milliseconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+    @property
+    def user_id(self) -> str:
+        return self.user_context['userId']
+
+    @property
+    def email(self) -> str | None:
+        return self.user_context.get('email')
+
+    @property
+    def user_key(self) -> str:
+        return get_dynamodb_user_key(self.user_context['userId'])
+
+    def load(self, data_types: list) -> dict:
+        """
+        Return {dataType: item} for the requested types that exist.
+
+        Types not yet seen in this request are fetched together with one
+        Query; items are read at most once per request.
+        """
+        with self._lock:
+            missing = [data_type for data_type in data_types if data_type not in self._items]
+            if missing:
+                with self.timed('ddb'):
+                    loaded = load_user_state_for(self.user_context, missing)
+                for data_type in missing:
+                    self._items[data_type] = loaded.get(data_type)
+            return {
+                data_type: self._items[data_type]
+                for data_type in data_types
+                if self._items[data_type] is not None
+            }
+
+    def get(self, data_type: str) -> dict | None:
+        return self.load([data_type]).get(data_type)
+
+    def remember(self, item: dict):
+        """Record an item this request just wrote so later reads see it."""
+        with self._lock:
+            self._items[item['dataType']] = item
@@ -22,10 +22,17 @@ def error_response(status_code: int, code: str, message: str, request_id: str) -
         })
     }
 
-def success_response(status_code: int, data: Any) -> dict:
+def success_response(status_code: int, data: Any, headers: dict | None = None) -> dict:
     return {
         'statusCode': status_code,
-        'headers': {'Content-Type': 'application/json'},
+        'headers': {'Content-Type': 'application/json', **(headers or {})},
         'body': json.dumps(data, cls=DecimalEncoder)
     }
 
+def not_modified_response(etag: str) -> dict:
+    return {
+        'statusCode': 304,
+        'headers': {'ETag': etag},
+        'body': ''
+    }
+
@@ -1,73 +1,337 @@
 import json
 import os
+import threading
 import time
-import boto3
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Optional, Dict, Any, Tuple
 
-s3_client = boto3.client('s3')
+from shared import logger
+from shared.aws_clients import get_client
+from shared.programs import compile_program
+
+s3_client = get_client('s3')
+
+TEMPLATE_KEY = 'config/plan.template.json'
+EXERCISES_KEY = 'config/exercises.latest.json'
+# programId -> template key for every published program
+MANIFEST_KEY = 'config/programs.manifest.json'
+# Documents every config-reading Lambda prefetches during init
+CONFIG_KEYS = (TEMPLATE_KEY, EXERCISES_KEY)
 
 # In-memory cache with TTL
 _cache: Dict[str, Dict[str, Any]] = {}
 CACHE_TTL = 600  # 10 minutes
 
+# Last fetched copy of each document (data + ETag). /tmp outlives the
+# process when Lambda restarts the runtime in the same environment.
+SNAPSHOT_DIR = os.environ.get('CONFIG_SNAPSHOT_DIR', '/tmp/app_config')
+
+# Keys with a background revalidation in flight
+_revalidating: set = set()
+_revalidating_lock = threading.Lock()
+
+def _get_bucket() -> str:
+    bucket = os.environ.get('CONFIG_BUCKET')
+    if not bucket:
+        raise ValueError('CONFIG_BUCKET environment variable not set')
+    return bucket
+
+def _snapshot_path(key: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, key.replace('/', '__'))
+
+def _read_snapshot(key: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_snapshot_path(key)) as f:
+            snapshot = json.load(f)
+        return {'data': snapshot['data'], 'etag': snapshot['etag']}
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _write_snapshot(key: str, data: Dict[str, Any], etag: Optional[str]):
+    """Best effort: write to a temp file and rename so readers never see a partial snapshot."""
+    path = _snapshot_path(key)
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'data': data, 'etag': etag}, f, separators=(',', ':'))
+        os.replace(temp_path, path)
+    except OSError:
+        logger.warning('Could not write config snapshot %s', key)
+
+def _fetch(bucket: str, key: str, etag: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    GET a document, conditionally if an ETag is given.
+    
+    Returns:
+        New cache entry, or None if the ETag still matches (304)
+    """
+    try:
+        if etag:
+            response = s3_client.get_object(Bucket=bucket, Key=key, IfNoneMatch=etag)
+        else:
+            response = s3_client.get_object(Bucket=bucket, Key=key)
+    except s3_client.exceptions.ClientError as e:
+        if etag and e.response['Error']['Code'] == '304':
+            return None
+        raise
+    data = json.loads(response['Body'].read().decode('utf-8'))
+    _write_snapshot(key, data, response.get('ETag'))
+    return {
+        'data': data,
+        'etag': response.get('ETag'),
+        'timestamp': time.time()
+    }
+
+def _revalidate(bucket: str, key: str, cached: Dict[str, Any]):
+    """Conditional GET for a snapshot-warmed entry; replaces it if S3 has moved on."""
+    try:
+        entry = _fetch(bucket, key, cached.get('etag'))
+        if entry is None:
+            cached['timestamp'] = time.time()
+        else:
+            _cache[key] = entry
+    except Exception:
+        logger.exception('Config revalidation failed for %s', key)
+    finally:
+        with _revalidating_lock:
+            _revalidating.discard(key)
+
+def _revalidate_in_background(bucket: str, key: str, cached: Dict[str, Any]):
+    with _revalidating_lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+    threading.Thread(target=_revalidate, args=(bucket, key, cached), daemon=True).start()
+
 def get_app_config(key: str) -> Dict[str, Any]:
     """
     Fetch configuration from S3 with in-memory caching and ETag support.
     
+    A process with nothing cached serves the /tmp snapshot, if there is
+    one, and revalidates it against S3 in the background.
+    
     Args:
         key: The S3 key (e.g., 'exercises.latest.json', 'plan.template.json')
     
     Returns:
         Parsed JSON configuration
     """
-    bucket = os.environ.get('CONFIG_BUCKET')
-    if not bucket:
-        raise ValueError('CONFIG_BUCKET environment variable not set')
-    
+    bucket = _get_bucket()
     now = time.time()
     
-    # Check cache
-    if key in _cache:
-        cached = _cache[key]
-        if now - cached['timestamp'] < CACHE_TTL:
-            # Cache still valid
+    cached = _cache.get(key)
+    if cached is None:
+        snapshot = _read_snapshot(key)
+        if snapshot:
+            # Stale until S3 confirms the ETag
+            cached = dict(snapshot, timestamp=0)
+            _cache[key] = cached
+            _revalidate_in_background(bucket, key, cached)
+            return cached['data']
+    
+    if cached is not None:
+        if now - cached['timestamp'] < CACHE_TTL or key in _revalidating:
+            # Cache still valid, or a refresh is already on its way
             return cached['data']
         
         # Cache expired, try conditional fetch with ETag
-        etag = cached.get('etag')
-        if etag:
-            try:
-                response = s3_client.get_object(
-                    Bucket=bucket,
-                    Key=key,
-                    IfNoneMatch=etag
-                )
-                # New version available
-                data = json.loads(response['Body'].read().decode('utf-8'))
-                _cache[key] = {
-                    'data': data,
-                    'etag': response.get('ETag'),
-                    'timestamp': now
-                }
+        if cached.get('etag'):
+            entry = _fetch(bucket, key, cached['etag'])
+            if entry is None:
+                # Not modified, refresh timestamp
+                cached['timestamp'] = now
+                return cached['data']
+            _cache[key] = entry
+            return entry['data']
+    
+    # No cache or no ETag, do full fetch
+    entry = _fetch(bucket, key)
+    _cache[key] = entry
+    return entry['data']
+
+def prefetch_app_configs(keys: Tuple[str, ...] = CONFIG_KEYS, default_program: bool = False):
+    """
+    Load config documents in parallel, for use during Lambda init.
+    
+    With default_program, the manifest's default program is also compiled.
+    Failures are logged and left for the first request to retry, so a slow
+    or unreachable bucket never breaks init.
+    """
+    if not os.environ.get('CONFIG_BUCKET'):
+        return
+    
+    tasks = [(get_app_config, key) for key in keys]
+    if default_program:
+        tasks.append((get_program, None))
+    
+    def load(task: tuple):
+        loader, argument = task
+        try:
+            loader(argument)
+        except Exception:
+            logger.exception('Config prefetch failed for %s', argument or 'default program')
+    
+    with ThreadPoolExecutor(max_workers=len(tasks)) as pool:
+        list(pool.map(load, tasks))
+
+def get_app_config_with_etag(key: str) -> Tuple[Dict[str, Any], Optional[str]]:
+    """
+    Fetch configuration along with the S3 ETag of the cached version.
+    
+    Args:
+        key: The S3 key (e.g., 'exercises.latest.json', 'plan.template.json')
+    
+    Returns:
+        Tuple of (parsed JSON configuration, ETag or None)
+    """
+    data = get_app_config(key)
+    return data, _cache.get(key, {}).get('etag')
+
+# Published documents by S3 VersionId (object versions are immutable)
+_object_versions: Dict[Tuple[str, str], Dict[str, Any]] = {}
+# (key, document version) -> S3 VersionId, once located
+_document_versions: Dict[Tuple[str, Any], str] = {}
+_scanned_versions: set = set()
+# (key, document version) -> time until which a failed lookup is not retried
+_missing_versions: Dict[Tuple[str, Any], float] = {}
+MISSING_VERSION_TTL = CACHE_TTL
+# ListObjectVersions pages (up to 1000 versions each) scanned per lookup
+MAX_VERSION_PAGES = int(os.environ.get('CONFIG_MAX_VERSION_PAGES', '3'))
+
+def _read_object_version(bucket: str, key: str, version_id: str) -> Dict[str, Any]:
+    response = s3_client.get_object(Bucket=bucket, Key=key, VersionId=version_id)
+    return json.loads(response['Body'].read().decode('utf-8'))
+
+def get_app_config_version(key: str, document_version: Any) -> Optional[Dict[str, Any]]:
+    """
+    Fetch a previously published configuration by its document 'version'.
+    
+    The config bucket is versioned, so every upload is kept as an S3 object
+    version. Versions are scanned newest first and the newest upload
+    carrying the requested document version wins. The version -> VersionId
+    map is remembered so later lookups are a single GetObject. The scan
+    stops after MAX_VERSION_PAGES pages, and a version that was not found
+    is not looked up again for MISSING_VERSION_TTL seconds.
+    
+    Args:
+        key: The S3 key (e.g., 'config/exercises.latest.json')
+        document_version: Value of the document's 'version' field
+    
+    Returns:
+        Parsed JSON configuration, or None if no upload has that version
+    """
+    bucket = _get_bucket()
+    
+    version_id = _document_versions.get((key, document_version))
+    if version_id:
+        if (key, version_id) not in _object_versions:
+            _object_versions[(key, version_id)] = _read_object_version(bucket, key, version_id)
+        return _object_versions[(key, version_id)]
+    
+    if _missing_versions.get((key, document_version), 0) > time.time():
+        return None
+    
+    paginator = s3_client.get_paginator('list_object_versions')
+    for page in islice(paginator.paginate(Bucket=bucket, Prefix=key), MAX_VERSION_PAGES):
+        for object_version in page.get('Versions', []):
+            if object_version['Key'] != key or (key, object_version['VersionId']) in _scanned_versions:
+                continue
+            data = _read_object_version(bucket, key, object_version['VersionId'])
+            _scanned_versions.add((key, object_version['VersionId']))
+            _document_versions.setdefault((key, data.get('version')), object_version['VersionId'])
+            if data.get('version') == document_version:
+                _object_versions[(key, object_version['VersionId'])] = data
                 return data
-            except s3_client.exceptions.ClientError as e:
-                if e.response['Error']['Code'] == '304':
-                    # Not modified, refresh timestamp
-                    cached['timestamp'] = now
-                    return cached['data']
-                raise
-    
-    # No cache or conditional fetch failed, do full fetch
-    response = s3_client.get_object(Bucket=bucket, Key=key)
-    data = json.loads(response['Body'].read().decode('utf-8'))
+    _missing_versions[(key, document_version)] = time.time() + MISSING_VERSION_TTL
+    return None
+
+# Compiled programs, least recently used first. Bounded by the estimated
+# memory of the compiled documents rather than a count, since templates
+# vary in size.
+PROGRAM_CACHE_MAX_BYTES = int(os.environ.get('PROGRAM_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+_programs: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+_programs_bytes = 0
+_programs_lock = threading.Lock()
+
+def get_program_manifest() -> Dict[str, Any]:
+    return get_app_config(MANIFEST_KEY)
+
+def get_program_entry(program_id: str) -> Optional[Dict[str, Any]]:
+    """Manifest entry for a program, or None if it is not published."""
+    for program in get_program_manifest().get('programs', []):
+        if program['programId'] == program_id:
+            return program
+    return None
+
+def get_program_template_key(program_id: Optional[str] = None) -> Optional[str]:
+    """S3 key of a program's template (default: the manifest's default program), or None if it is not published."""
+    entry = get_program_entry(program_id or get_program_manifest()['defaultProgramId'])
+    return entry['templateKey'] if entry else None
+
+def _store_program(program_id: str, entry: Dict[str, Any]):
+    """Insert as most recently used and evict from the cold end until under budget."""
+    global _programs_bytes
+    with _programs_lock:
+        previous = _programs.pop(program_id, None)
+        if previous:
+            _programs_bytes -= previous['program']['sizeBytes']
+        _programs[program_id] = entry
+        _programs_bytes += entry['program']['sizeBytes']
+        # Always keep the program just loaded, even if it alone is over budget
+        while _programs_bytes > PROGRAM_CACHE_MAX_BYTES and len(_programs) > 1:
+            _, evicted = _programs.popitem(last=False)
+            _programs_bytes -= evicted['program']['sizeBytes']
+
+def get_program(program_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Compiled program (shared/programs.compile_program) for a programId.
     
-    _cache[key] = {
-        'data': data,
-        'etag': response.get('ETag'),
-        'timestamp': now
-    }
+    Templates are fetched and compiled only when first requested, then
+    revalidated by ETag like other config documents. Only compiled
+    programs are kept, in an LRU bounded by PROGRAM_CACHE_MAX_BYTES.
     
-    return data
+    Args:
+        program_id: programId from PROGRAM_SETTINGS (default: the
+            manifest's defaultProgramId)
+    
+    Raises:
+        ValueError: if the programId is not in the manifest
+    """
+    program_id = program_id or get_program_manifest()['defaultProgramId']
+    now = time.time()
+    
+    with _programs_lock:
+        cached = _programs.get(program_id)
+        if cached is not None:
+            _programs.move_to_end(program_id)
+    if cached is not None and now - cached['timestamp'] < CACHE_TTL:
+        return cached['program']
+    
+    manifest_entry = get_program_entry(program_id)
+    if manifest_entry is None:
+        raise ValueError(f'Unknown programId: {program_id}')
+    
+    bucket = _get_bucket()
+    key = manifest_entry['templateKey']
+    if cached is not None and cached['key'] == key:
+        fetched = _fetch(bucket, key, cached['etag'])
+        if fetched is None:
+            cached['timestamp'] = now
+            return cached['program']
+    else:
+        fetched = _fetch(bucket, key)
+    
+    program = compile_program(fetched['data'])
+    _store_program(program_id, {
+        'program': program,
+        'key': key,
+        'etag': fetched['etag'],
+        'timestamp': now
+    })
+    return program
 
 def clear_cache(key: Optional[str] = None):
     """Clear cache for a specific key or all keys."""
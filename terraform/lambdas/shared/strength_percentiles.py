@@ -0,0 +1,196 @@
+import json
+import os
+import random
+import time
+import zlib
+from datetime import datetime
+from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.types import Binary
+from botocore.exceptions import ClientError
+
+from shared import quantile_sketch
+from shared.dynamodb import backoff_delay, data_table
+
+# Population sketches live in the data table under their own partitions:
+#   userEmail = PERCENTILE#<unit>#<class>, dataType = <YYYY-Qn>#<shard>
+# Each item holds one KLL sketch per metric. Writes go to a random shard so
+# concurrent PUT /strength calls rarely contend on one item; reads Query one
+# partition and merge its shards.
+PARTITION_PREFIX = 'PERCENTILE#'
+METRICS = ['squat', 'bench', 'deadlift', 'ohp', 'total']
+ALL_CLASS = 'all'
+SHARDS = int(os.environ.get('PERCENTILE_SHARDS', '4'))
+MAX_WRITE_ATTEMPTS = 5
+# Sketches only grow, so updated maxes are counted again. Reads cover the
+# current and previous quarter so stale entries age out.
+EPOCHS_READ = 2
+# Populations smaller than this report no percentiles
+MIN_SAMPLE_SIZE = int(os.environ.get('PERCENTILE_MIN_SAMPLE', '20'))
+
+# IPF-style upper bounds in kg; heavier lifters fall in the open class
+BODYWEIGHT_CLASSES_KG = [52, 56, 60, 67.5, 75, 82.5, 90, 100, 110, 125, 140]
+KG_PER_LB = 0.45359237
+
+# Merged sketches per partition, reused for a short while across requests
+MERGED_TTL_SECONDS = 60
+MERGED_CACHE_MAX = 64
+_merged = {}
+
+def unit_for(tm_policy: dict) -> str:
+    """Unit a STRENGTH item's maxes are entered in."""
+    return 'kg' if tm_policy.get('rounding') == '2.5kg' else 'lb'
+
+def bodyweight_class(bodyweight: float | None, unit: str) -> str | None:
+    """Class label ('82.5', '140+') for a bodyweight, or None if unknown."""
+    if not bodyweight:
+        return None
+    kg = float(bodyweight) * (KG_PER_LB if unit == 'lb' else 1)
+    for upper in BODYWEIGHT_CLASSES_KG:
+        if kg <= upper:
+            return f'{upper:g}'
+    return f'{BODYWEIGHT_CLASSES_KG[-1]:g}+'
+
+def metric_values(one_rep_maxes: dict) -> dict:
+    values = {lift: float(one_rep_maxes[lift]) for lift in METRICS if lift != 'total'}
+    values['total'] = sum(values.values())
+    return values
+
+def populations(strength: dict) -> tuple:
+    """(unit, [class, ...]) a STRENGTH item counts toward."""
+    unit = unit_for(strength['tmPolicy'])
+    weight_class = bodyweight_class(strength.get('bodyweight'), unit)
+    return unit, [ALL_CLASS] + ([weight_class] if weight_class else [])
+
+def partition_key(unit: str, weight_class: str) -> str:
+    return f'{PARTITION_PREFIX}{unit}#{weight_class}'
+
+def epoch(when: datetime) -> str:
+    return f'{when.year}-Q{(when.month - 1) // 3 + 1}'
+
+def previous_epoch(current: str) -> str:
+    year, quarter = int(current[:4]), int(current[-1])
+    return f'{year - 1}-Q4' if quarter == 1 else f'{year}-Q{quarter - 1}'
+
+def encode_sketches(sketches: dict) -> Binary:
+    return Binary(zlib.compress(json.dumps(sketches, separators=(',', ':')).encode('utf-8')))
+
+def decode_sketches(item: dict) -> dict:
+    chunk = item['sketches']
+    chunk = chunk.value if isinstance(chunk, Binary) else bytes(chunk)
+    return json.loads(zlib.decompress(chunk))
+
+def add_to_shard(key: dict, values: dict, now: str):
+    """
+    Add one sample per metric to a shard item.
+
+    Read-modify-write guarded by a version number: the put only succeeds if
+    nobody else wrote the shard since it was read, otherwise it re-reads
+    and retries with backoff.
+    """
+    for attempt in range(MAX_WRITE_ATTEMPTS):
+        item = data_table.get_item(Key=key, ConsistentRead=True).get('Item')
+        version = int(item['version']) if item else 0
+        sketches = decode_sketches(item) if item else {}
+        for metric, value in values.items():
+            quantile_sketch.add(sketches.setdefault(metric, quantile_sketch.new_sketch()), value)
+
+        condition = {'ConditionExpression': 'attribute_not_exists(version)'}
+        if item:
+            condition = {
+                'ConditionExpression': 'version = :version',
+                'ExpressionAttributeValues': {':version': version}
+            }
+        try:
+            data_table.put_item(
+                Item=dict(key, version=version + 1, sketches=encode_sketches(sketches), updatedAt=now),
+                **condition
+            )
+            return
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            time.sleep(backoff_delay(attempt + 1))
+    raise RuntimeError(f"Percentile shard {key['userEmail']} {key['dataType']} stayed contended")
+
+def record_strength(strength: dict, previous: dict | None = None, now: datetime | None = None):
+    """
+    Count a STRENGTH item toward its population sketches.
+
+    Skipped when the maxes and bodyweight did not change, so re-saving the
+    same numbers does not add duplicate samples.
+    """
+    previous = previous or {}
+    if (previous.get('oneRepMaxes') == strength['oneRepMaxes']
+            and previous.get('bodyweight') == strength.get('bodyweight')):
+        return
+
+    now = now or datetime.utcnow()
+    unit, classes = populations(strength)
+    values = metric_values(strength['oneRepMaxes'])
+    sort_key = f'{epoch(now)}#{random.randrange(SHARDS):02d}'
+    for weight_class in classes:
+        add_to_shard(
+            {'userEmail': partition_key(unit, weight_class), 'dataType': sort_key},
+            values, now.isoformat() + 'Z'
+        )
+
+def merged_sketches(unit: str, weight_class: str, now: datetime | None = None) -> dict:
+    """Metric -> sketch merged across the shards of the recent epochs (one Query)."""
+    cache_key = (unit, weight_class)
+    cached = _merged.get(cache_key)
+    if cached and time.time() - cached['at'] < MERGED_TTL_SECONDS:
+        return cached['sketches']
+
+    current = epoch(now or datetime.utcnow())
+    oldest = current
+    for _ in range(EPOCHS_READ - 1):
+        oldest = previous_epoch(oldest)
+    params = {
+        'KeyConditionExpression': (
+            Key('userEmail').eq(partition_key(unit, weight_class))
+            & Key('dataType').between(oldest, current + '~')
+        )
+    }
+    merged = {metric: quantile_sketch.new_sketch() for metric in METRICS}
+    while True:
+        response = data_table.query(**params)
+        for item in response.get('Items', []):
+            for metric, sketch in decode_sketches(item).items():
+                if metric in merged:
+                    quantile_sketch.merge(merged[metric], sketch)
+        if 'LastEvaluatedKey' not in response:
+            break
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    if len(_merged) >= MERGED_CACHE_MAX:
+        _merged.clear()
+    _merged[cache_key] = {'sketches': merged, 'at': time.time()}
+    return merged
+
+def strength_percentiles(strength: dict) -> dict:
+    """
+    Where a user's maxes rank in each population they belong to.
+
+    Returns:
+        Dict with unit, bodyweightClass and populations: class ->
+        {sampleSize, percentiles: metric -> 0-100 (None below MIN_SAMPLE_SIZE)}
+    """
+    unit, classes = populations(strength)
+    values = metric_values(strength['oneRepMaxes'])
+    result = {}
+    for weight_class in classes:
+        sketches = merged_sketches(unit, weight_class)
+        sample_size = sketches['total']['n']
+        result[weight_class] = {
+            'sampleSize': sample_size,
+            'percentiles': {
+                metric: round(quantile_sketch.rank(sketches[metric], value) * 100, 1)
+                if sample_size >= MIN_SAMPLE_SIZE else None
+                for metric, value in values.items()
+            }
+        }
+    return {
+        'unit': unit,
+        'bodyweightClass': classes[1] if len(classes) > 1 else None,
+        'populations': result
+    }
@@ -0,0 +1,141 @@
+from decimal import Decimal
+from boto3.dynamodb.types import Binary
+
+from shared.strength_percentiles import unit_for
+from shared.weights import round_to_increment, to_stored, to_units
+from shared.workout_archive import decode_rows, encode_rows, is_archive_key
+
+# 1 lb = 0.45359237 kg exactly; conversions stay in integer hundredths
+_KG_PER_LB_NUM = 45359237
+_KG_PER_LB_DEN = 100_000_000
+
+UNITS = ('lb', 'kg')
+
+# Stamped on data items rewritten by tools/convert_units.py so the stream
+# consumer can tell a conversion from a user's own update
+CONVERSION_JOB_ATTR = 'conversionJob'
+
+def other_unit(unit: str) -> str:
+    return 'kg' if unit == 'lb' else 'lb'
+
+def convert_batch(values: list, to_unit: str) -> list:
+    """Convert integer hundredths from the other unit to to_unit, rounding half up."""
+    if to_unit == 'kg':
+        num, den = _KG_PER_LB_NUM, _KG_PER_LB_DEN
+    else:
+        num, den = _KG_PER_LB_DEN, _KG_PER_LB_NUM
+    return [(2 * units * num + den) // (2 * den) for units in values]
+
+def is_conversion_write(new: dict, old: dict | None) -> bool:
+    """Whether a data item write was made by a unit conversion job rather than the user."""
+    job = new.get(CONVERSION_JOB_ATTR)
+    return bool(job) and job != (old or {}).get(CONVERSION_JOB_ATTR)
+
+def increment_units(rounding_rules: dict, unit: str) -> int:
+    """Rounding increment for a unit from the template's roundingRules."""
+    return to_units(rounding_rules[unit]['increment'])
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+
+def weight_slots(obj) -> list:
+    """(container, key) for every numeric 'weight' field in a nested workout value."""
+    slots = []
+    pending = [obj]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == 'weight' and _is_number(value):
+                    slots.append((node, key))
+                elif isinstance(value, (dict, list)):
+                    pending.append(value)
+        elif isinstance(node, list):
+            pending.extend(value for value in node if isinstance(value, (dict, list)))
+    return slots
+
+def convert_slots(slots: list, to_unit: str, increment: int | None = None):
+    """Convert every (container, key) slot in place with one batch conversion."""
+    converted = convert_batch([to_units(container[key]) for container, key in slots], to_unit)
+    if increment:
+        converted = [round_to_increment(units, increment) for units in converted]
+    for (container, key), units in zip(slots, converted):
+        container[key] = to_stored(units)
+
+def is_converted(workout: dict, to_unit: str, logged_after: str | None) -> bool:
+    """Whether a workout (item or archive row) is already in to_unit."""
+    if workout.get('units') == to_unit:
+        return True
+    return bool(logged_after) and workout.get('createdAt', '') > logged_after
+
+def convert_workouts(items: list, to_unit: str, rounding_rules: dict, logged_after: str | None = None) -> list:
+    """
+    Convert a page of workout_history items that are not yet in to_unit.
+
+    Set weights across the whole page (hot items and decoded archive rows)
+    are converted in one batch and rounded to the target unit's increment.
+    Converted items are stamped with units so re-runs skip them. Workouts
+    created after logged_after (the job's start) were logged in the new
+    unit and are skipped too.
+
+    Returns:
+        The items that changed (archive items re-encoded)
+    """
+    changed, archives, slots = [], [], []
+    for item in items:
+        if is_converted(item, to_unit, logged_after):
+            continue
+        if is_archive_key(item['workoutDate']):
+            chunk = item['chunk']
+            rows = decode_rows(chunk.value if isinstance(chunk, Binary) else bytes(chunk))
+            archives.append((item, rows))
+            # Rows compacted from hot items written after the switch are already converted
+            slots.extend(weight_slots([row for row in rows if not is_converted(row, to_unit, logged_after)]))
+        else:
+            slots.extend(weight_slots(item))
+        changed.append(item)
+
+    convert_slots(slots, to_unit, increment_units(rounding_rules, to_unit))
+    for item, rows in archives:
+        for row in rows:
+            row['units'] = to_unit
+        item['chunk'] = Binary(encode_rows(rows))
+    for item in changed:
+        item['units'] = to_unit
+    return changed
+
+def convert_strength(item: dict, to_unit: str, rounding_rules: dict) -> dict | None:
+    """
+    STRENGTH item in to_unit, or None if it already is.
+
+    1RMs and bodyweight are converted to the nearest hundredth; training
+    maxes (current and history) are rounded to the target increment like
+    PUT /strength does. tmPolicy.rounding follows the unit.
+    """
+    if unit_for(item.get('tmPolicy') or {}) == to_unit:
+        return None
+    increment = increment_units(rounding_rules, to_unit)
+    entries = [item] + list(item.get('history') or [])
+    exact = [
+        (entry['oneRepMaxes'], lift) for entry in entries for lift in entry.get('oneRepMaxes') or {}
+    ] + ([(item, 'bodyweight')] if item.get('bodyweight') else [])
+    rounded = [(entry['trainingMaxes'], lift) for entry in entries for lift in entry.get('trainingMaxes') or {}]
+    convert_slots(exact, to_unit)
+    convert_slots(rounded, to_unit, increment)
+
+    item['tmPolicy'] = dict(item.get('tmPolicy') or {}, rounding=f"{rounding_rules[to_unit]['increment']:g}{to_unit}")
+    return item
+
+def convert_settings(item: dict, to_unit: str, rounding_rules: dict) -> dict:
+    """
+    PROGRAM_SETTINGS/PROFILE in to_unit.
+
+    Bar and plate overrides describe physical equipment in the old unit, so
+    they are dropped and the new unit's defaults apply.
+    """
+    item['preferredUnits'] = to_unit
+    if item['dataType'] == 'PROGRAM_SETTINGS':
+        item['rounding'] = to_stored(increment_units(rounding_rules, to_unit))
+        item.pop('barWeight', None)
+        item.pop('availablePlates', None)
+    return item
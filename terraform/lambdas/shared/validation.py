@@ -1,5 +1,7 @@
 from typing import Dict, Tuple
 
+from shared.weights import WEIGHT_SCALE, is_weight, round_to_increment, scale_units, to_units
+
 def validate_profile(profile: dict) -> Tuple[bool, str | None]:
     if not isinstance(profile.get('trainingDaysPerWeek'), int) or not (4 <= profile['trainingDaysPerWeek'] <= 7):
         return False, "trainingDaysPerWeek must be between 4 and 7"
@@ -32,8 +34,7 @@ def validate_strength(strength: dict) -> Tuple[bool, str | None]:
     
     required_lifts = ['squat', 'bench', 'deadlift', 'ohp']
     for lift in required_lifts:
-        value = strength['oneRepMaxes'].get(lift)
-        if not isinstance(value, (int, float)) or value <= 0:
+        if not is_weight(strength['oneRepMaxes'].get(lift)):
             return False, f"oneRepMaxes.{lift} must be a positive number"
     
     if 'tmPolicy' not in strength:
@@ -46,17 +47,20 @@ def validate_strength(strength: dict) -> Tuple[bool, str | None]:
     if strength['tmPolicy'].get('rounding') not in ['5lb', '2.5kg']:
         return False, "tmPolicy.rounding must be '5lb' or '2.5kg'"
     
+    bodyweight = strength.get('bodyweight')
+    if bodyweight is not None and not is_weight(bodyweight):
+        return False, "bodyweight must be a positive number"
+    
     return True, None
 
-def round_to_nearest(value: float, increment: float) -> float:
-    return round(value / increment) * increment
-
-def calculate_training_max(one_rm: float, tm_percent: float, rounding: str) -> float:
-    tm = one_rm * tm_percent
-    increment = 2.5 if rounding == '2.5kg' else 5
-    return round_to_nearest(int(tm), increment)
+def calculate_training_max(one_rm: int, tm_percent: float, rounding: str) -> int:
+    """Training max in units: 1RM * percent, truncated to a whole lb/kg, then rounded."""
+    tm = scale_units(one_rm, tm_percent)
+    increment = to_units(2.5 if rounding == '2.5kg' else 5)
+    return round_to_increment(tm - tm % WEIGHT_SCALE, increment)
 
-def calculate_training_maxes(one_rep_maxes: Dict[str, float], tm_policy: dict) -> Dict[str, float]:
+def calculate_training_maxes(one_rep_maxes: Dict[str, int], tm_policy: dict) -> Dict[str, int]:
+    """Training maxes in units for 1RMs in units."""
     return {
         lift: calculate_training_max(
             one_rep_maxes[lift],
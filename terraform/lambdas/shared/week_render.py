@@ -0,0 +1,289 @@
+import os
+import time
+import zlib
+from datetime import datetime, timedelta
+from boto3.dynamodb.types import Binary
+
+from shared.dynamodb import data_table
+from shared.exercise_selection import select_week_assistance
+from shared.item_codec import dumps_item, loads_item
+from shared.plate_loading import get_loading_params, load_weights, warmup_weights
+from shared.progress import clean_progress, DATA_TYPE as PROGRESS_DATA_TYPE
+from shared.s3_config import get_program
+from shared.weights import from_units, round_to_increment, scale_units, to_units
+
+# User items a week render reads
+RENDER_DATA_TYPES = ['STRENGTH', 'PROGRAM_SETTINGS', PROGRESS_DATA_TYPE]
+
+# Pre-rendered weeks live outside the user's partition (RENDER#USER#<sub>),
+# so the per-request state Query never reads them. Each is tagged with the
+# inputs it was built from and is only served while they are unchanged.
+RENDER_PREFIX = 'RENDER#'
+RENDER_TTL_SECONDS = int(os.environ.get('RENDER_TTL_SECONDS', str(14 * 24 * 3600)))
+
+DAY_ABBREVIATIONS = ['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat']
+
+# Profile nonLiftingDayMode -> nonlift generator type
+NONLIFT_TYPE_BY_MODE = {
+    'gpp': 'gpp_krypteia',
+    'conditioning': 'gpp_krypteia',
+    'mobility': 'mobility',
+    'rest': 'active_recovery',
+    'pilates': 'pilates'
+}
+
+def calculate_training_max(one_rm: int, tm_percent: float) -> int:
+    """Calculate training max from 1RM (weights in units)."""
+    return scale_units(one_rm, tm_percent / 100)
+
+def compute_work_sets(set_scheme: dict, training_max: int, rounding: int):
+    """Compute work sets from set scheme and training max (weights in units)."""
+    sets = []
+    for work_set in set_scheme['workSets']:
+        weight = scale_units(training_max, work_set['pctTM'])
+        sets.append({
+            'weight': round_to_increment(weight, rounding),
+            'targetReps': work_set['reps'],
+            'pctTM': work_set['pctTM']
+        })
+    return sets
+
+def attach_plate_loading(sessions: list, settings: dict):
+    """
+    Add plate breakdowns to every barbell set with one batch lookup.
+    
+    Set weights are in units until here and become API numbers.
+    """
+    loaded = [
+        *(work_set for session in sessions for work_set in session['warmupSets'] + session['mainSets']),
+        *(session['supplemental'] for session in sessions if session['supplemental'])
+    ]
+    loading = load_weights((entry['weight'] for entry in loaded), settings)
+    for entry in loaded:
+        entry['loading'] = loading[entry['weight']]
+        entry['weight'] = from_units(entry['weight'])
+
+def build_week(strength_data: dict, settings: dict, program: dict, exercise_library: dict, week_index: int, phase: dict) -> dict:
+    """Build the rendered week from already-loaded user state and config."""
+    # Calculate training maxes (integer units until the response is built)
+    tm_percent = float(settings.get('tmPercent', 85))
+    
+    # STRENGTH items written by PUT /strength nest 1RMs under oneRepMaxes
+    one_rep_maxes = strength_data.get('oneRepMaxes', strength_data)
+    training_maxes = {
+        lift: calculate_training_max(to_units(one_rep_maxes.get(lift, 0)), tm_percent)
+        for lift in ('squat', 'bench', 'deadlift', 'ohp')
+    }
+    
+    # Test and reset weeks have no main lift scheme: sessions keep their
+    # warmups and assistance but get no prescribed work sets
+    scheme_name = program['setSchemeByWeek'].get(week_index)
+    set_scheme = program['template']['setSchemes'][scheme_name] if scheme_name else None
+    
+    # Select assistance for the whole week within the phase's fatigue budget
+    session_templates = program['sessionTemplates']
+    selection = select_week_assistance(
+        session_templates,
+        exercise_library,
+        settings.get('constraints', []),
+        settings.get('equipment', ['barbell', 'dumbbell', 'kb', 'band']),
+        phase['phaseId']
+    )
+    
+    _, bar_weight, _, rounding = get_loading_params(settings)
+    sessions = []
+    
+    for session_template, assistance in zip(session_templates, selection['sessions']):
+        session_id = session_template['sessionId']
+        lift_id = session_template['mainLiftId']
+        
+        # Compute main lift sets
+        main_sets = compute_work_sets(set_scheme, training_maxes[lift_id], rounding) if set_scheme else []
+        
+        # Compute supplemental (FSL)
+        supplemental = None
+        if main_sets and phase['rules'].get('supplementalEnabled', True):
+            fsl_weight = main_sets[0]['weight']  # First set is FSL weight
+            supplemental = {
+                'type': 'fsl_main_lift',
+                'label': 'FSL (Main Lift)',
+                'sets': 5,
+                'repsRange': [3, 10],
+                'weight': fsl_weight
+            }
+        
+        # Circuit configuration
+        circuit_rounds = phase['rules'].get('circuitRounds', 5)
+        
+        session = {
+            'sessionId': session_id,
+            'label': session_template['label'],
+            'mainLiftId': lift_id,
+            'setScheme': set_scheme['label'] if set_scheme else None,
+            'warmupSets': warmup_weights(training_maxes[lift_id], rounding, bar_weight),
+            'mainSets': main_sets,
+            'supplemental': supplemental,
+            'assistanceSlots': [
+                {
+                    'slotId': slot_id,
+                    **assistance[slot_id]
+                }
+                for slot_id in assistance
+            ],
+            'circuit': {
+                'enabled': True,
+                'rounds': circuit_rounds,
+                'style': 'EMOMish'
+            }
+        }
+        
+        sessions.append(session)
+    
+    attach_plate_loading(sessions, settings)
+    
+    return {
+        'programId': program['programId'],
+        'weekIndex': week_index,
+        'phase': phase['phaseId'],
+        'phaseLabel': phase['label'],
+        'sessions': sessions,
+        'trainingMaxes': {lift: from_units(units) for lift, units in training_maxes.items()},
+        'fatigue': selection['fatigue']
+    }
+
+def default_day_assignments(training_days_per_week: int, nonlift_mode: str) -> dict:
+    """Default weekday layout (0=Sunday), mirroring the web client's defaults."""
+    assignments = {
+        '1': {'type': 'main', 'index': 0},
+        '2': {'type': 'main', 'index': 1},
+        '4': {'type': 'main', 'index': 2},
+        '5': {'type': 'main', 'index': 3}
+    }
+    
+    for min_days, day_of_week in [(5, '3'), (6, '6'), (7, '0')]:
+        if training_days_per_week >= min_days:
+            assignments[day_of_week] = {'type': nonlift_mode}
+    
+    return assignments
+
+def get_week_days(settings: dict, schedule: dict, template: dict, week_start_date: str | None) -> list:
+    """
+    Lay out the seven days of the week from dayAssignments.
+    
+    Non-lifting days are numbered X1-X3 in order, capped by the template's
+    extraNonLiftingDays.max. Dated days pick up any daySwaps override.
+    """
+    nonlift_mode = settings.get('nonLiftingDayMode', 'gpp')
+    assignments = schedule.get('dayAssignments') or default_day_assignments(
+        int(settings.get('trainingDaysPerWeek', 4)), nonlift_mode
+    )
+    day_swaps = schedule.get('daySwaps', {})
+    placeholders = template.get('extraNonLiftingDays', {}).get('placeholders', [])
+    
+    start_offset = DAY_ABBREVIATIONS.index(settings.get('preferredStartDay', 'mon'))
+    start_date = datetime.strptime(week_start_date, '%Y-%m-%d') if week_start_date else None
+    
+    days = []
+    nonlift_count = 0
+    for offset in range(7):
+        day_of_week = (start_offset + offset) % 7
+        assignment = assignments.get(str(day_of_week))
+        day = {'dayOfWeek': day_of_week, 'type': 'rest'}
+        
+        if assignment and assignment.get('type') == 'main':
+            day['type'] = 'main'
+            day['sessionIndex'] = int(assignment.get('index', 0))
+        elif assignment and nonlift_count < len(placeholders):
+            nonlift_type = NONLIFT_TYPE_BY_MODE.get(assignment.get('type'), assignment.get('type'))
+            day['type'] = 'nonlift'
+            day['dayId'] = placeholders[nonlift_count]['dayId']
+            day['nonLiftType'] = nonlift_type
+            nonlift_count += 1
+        
+        if start_date:
+            date_str = (start_date + timedelta(days=offset)).strftime('%Y-%m-%d')
+            day['date'] = date_str
+            if date_str in day_swaps:
+                day['swappedSession'] = day_swaps[date_str]
+        
+        days.append(day)
+    
+    return days
+
+def resolve_week_index(query_params: dict, state: dict) -> int:
+    """?weekIndex=N if given, else the user's current floating week."""
+    if query_params.get('weekIndex'):
+        return int(query_params['weekIndex'])
+    return clean_progress(state.get(PROGRESS_DATA_TYPE))['programWeek']
+
+def load_program(settings: dict) -> dict | None:
+    """The user's compiled program (manifest default if unset), or None if it is no longer published."""
+    try:
+        return get_program(settings.get('programId'))
+    except ValueError:
+        return None
+
+def render_state(state: dict, exercise_library: dict, week_index: int) -> tuple:
+    """
+    Render one user's week from their loaded items.
+    
+    Returns:
+        (result, None) or (None, (status, code, message)) for error_response
+    """
+    strength_data = state.get('STRENGTH')
+    if not strength_data:
+        return None, (404, 'NOT_FOUND', 'Strength data not found. Please enter your 1RMs.')
+    
+    settings = state.get('PROGRAM_SETTINGS')
+    if not settings:
+        return None, (404, 'NOT_FOUND', 'Program settings not found')
+    
+    program = load_program(settings)
+    if not program:
+        return None, (404, 'NOT_FOUND', f"Program {settings['programId']} not found")
+    
+    # Get phase for this week
+    phase = program['phasesByWeek'].get(week_index)
+    if not phase:
+        return None, (400, 'INVALID_WEEK', f'Week {week_index} not found in program')
+    
+    return build_week(strength_data, settings, program, exercise_library, week_index, phase), None
+
+def render_key(user_key: str, week_index: int) -> dict:
+    return {'userEmail': f'{RENDER_PREFIX}{user_key}', 'dataType': f'WEEK#{week_index:02d}'}
+
+def render_fingerprint(state: dict, exercise_library: dict) -> str:
+    """Identity of everything a rendered week depends on besides the week index."""
+    settings = state.get('PROGRAM_SETTINGS') or {}
+    program = load_program(settings) or {}
+    return '|'.join(str(part) for part in (
+        (state.get('STRENGTH') or {}).get('updatedAt'),
+        settings.get('updatedAt'),
+        program.get('programId'),
+        program.get('version'),
+        exercise_library.get('version')
+    ))
+
+def store_render(user_key: str, week_index: int, fingerprint: str, result: dict):
+    data_table.put_item(Item={
+        **render_key(user_key, week_index),
+        'fingerprint': fingerprint,
+        'week': Binary(zlib.compress(dumps_item(result).encode('utf-8'))),
+        'expiresAt': int(time.time()) + RENDER_TTL_SECONDS
+    })
+
+def load_render(user_key: str, week_index: int, fingerprint: str) -> tuple:
+    """
+    A stored render of the week if its inputs are unchanged.
+
+    Returns:
+        (result or None, 'hit' | 'miss' | 'stale')
+    """
+    item = data_table.get_item(Key=render_key(user_key, week_index)).get('Item')
+    if not item:
+        return None, 'miss'
+    if item.get('fingerprint') != fingerprint:
+        return None, 'stale'
+    week = item['week']
+    week = week.value if isinstance(week, Binary) else bytes(week)
+    return loads_item(zlib.decompress(week).decode('utf-8')), 'hit'
@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+# Weights are handled internally as integer hundredths of the user's unit
+# (lb or kg), which represents every plate (1.25 kg, 2.5 lb) and rounding
+# increment exactly. Numbers are converted once on the way in (request
+# bodies, DynamoDB items) and once on the way out (API responses, stored
+# items); everything in between is integer arithmetic.
+WEIGHT_SCALE = 100
+
+def to_units(weight) -> int:
+    """Integer hundredths for a JSON or DynamoDB number (int, float, Decimal)."""
+    return round(weight * WEIGHT_SCALE)
+
+def from_units(units: int) -> float:
+    """API number for integer hundredths (the nearest float to the exact value)."""
+    return units / WEIGHT_SCALE
+
+def to_stored(units: int):
+    """DynamoDB number for integer hundredths: int when whole, else an exact Decimal."""
+    if units % WEIGHT_SCALE == 0:
+        return units // WEIGHT_SCALE
+    return Decimal(units).scaleb(-2)
+
+def round_to_increment(units: int, increment: int) -> int:
+    """Round to the nearest multiple of increment, halves up (exact)."""
+    return (units + increment // 2) // increment * increment
+
+def scale_units(units: int, fraction) -> int:
+    """units * fraction (e.g. a %TM), rounded to whole hundredths."""
+    return round(units * fraction)
+
+def is_weight(value) -> bool:
+    """
+    Positive JSON number that is still positive in hundredths.
+
+    Any precision is accepted (converted or estimated values like 102.0583);
+    callers round with to_units when the value comes in.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    return to_units(value) > 0
@@ -0,0 +1,156 @@
+import heapq
+import json
+import zlib
+from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.types import Binary
+
+from shared.item_codec import ItemEncoder, loads_item
+
+# Archive items share the workout_history partition with hot items. Their
+# sort keys (ARCHIVE#YYYY-MM#<part>) sort after every workoutDate, so hot
+# reads bound their key condition below ARCHIVE_PREFIX.
+ARCHIVE_PREFIX = 'ARCHIVE#'
+ARCHIVE_FORMAT = 1
+# Stay well under the 400 KB item limit; larger months are split into parts
+MAX_ARCHIVE_BYTES = 350_000
+
+def is_archive_key(sort_key: str) -> bool:
+    return sort_key.startswith(ARCHIVE_PREFIX)
+
+def archive_key(month: str, part: int) -> str:
+    return f'{ARCHIVE_PREFIX}{month}#{part:02d}'
+
+def encode_rows(rows: list) -> bytes:
+    """
+    Columnar, compressed encoding of workout items.
+
+    Each attribute becomes one list of values in row order (null where a
+    row lacks it), which repeats keys once per month instead of once per
+    workout and compresses far better than row-wise JSON.
+    """
+    names = sorted({name for row in rows for name in row})
+    columns = {name: [row.get(name) for row in rows] for name in names}
+    payload = json.dumps({'rows': len(rows), 'columns': columns}, cls=ItemEncoder, separators=(',', ':'))
+    return zlib.compress(payload.encode('utf-8'), 9)
+
+def decode_rows(chunk: bytes) -> list:
+    payload = loads_item(zlib.decompress(chunk).decode('utf-8'))
+    columns = payload['columns']
+    return [
+        {name: values[i] for name, values in columns.items() if values[i] is not None}
+        for i in range(payload['rows'])
+    ]
+
+def build_archive_items(partition_key: str, month: str, workouts: list, now: str) -> list:
+    """
+    Archive items holding one month of a user's workouts.
+
+    Args:
+        partition_key: workout_history partition (USER#<sub> or legacy email)
+        month: YYYY-MM
+        workouts: Hot workout items for that month (any order)
+
+    Returns:
+        Items for ARCHIVE#<month>#00, #01, ... (usually just one)
+    """
+    rows = sorted(
+        ({k: v for k, v in workout.items() if k != 'userEmail'} for workout in workouts),
+        key=lambda row: row['workoutDate']
+    )
+    chunks = []
+    pending = [rows]
+    while pending:
+        part_rows = pending.pop(0)
+        chunk = encode_rows(part_rows)
+        if len(chunk) > MAX_ARCHIVE_BYTES and len(part_rows) > 1:
+            middle = len(part_rows) // 2
+            pending[:0] = [part_rows[:middle], part_rows[middle:]]
+            continue
+        chunks.append((part_rows, chunk))
+
+    return [
+        {
+            'userEmail': partition_key,
+            'workoutDate': archive_key(month, part),
+            'format': ARCHIVE_FORMAT,
+            'count': len(part_rows),
+            'firstDate': part_rows[0]['workoutDate'],
+            'lastDate': part_rows[-1]['workoutDate'],
+            'chunk': Binary(chunk),
+            'compactedAt': now
+        }
+        for part, (part_rows, chunk) in enumerate(chunks)
+    ]
+
+def decode_archive_item(item: dict, partition_key: str) -> list:
+    """Workout items stored in one archive item."""
+    chunk = item['chunk']
+    chunk = chunk.value if isinstance(chunk, Binary) else bytes(chunk)
+    return [dict(row, userEmail=partition_key) for row in decode_rows(chunk)]
+
+def iter_query(table, **params):
+    """Items of a Query one page at a time, following pagination."""
+    while True:
+        response = table.query(**params)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def query_all(table, **params) -> list:
+    """Every item of a Query, following pagination."""
+    return list(iter_query(table, **params))
+
+def query_archived_workouts(table, partition_key: str, start_date: str | None = None,
+                            end_date: str | None = None) -> list:
+    """
+    Decoded archived workouts for a partition, optionally within a date range.
+
+    Only the archive months overlapping the range are read.
+    """
+    low = ARCHIVE_PREFIX + (start_date[:7] if start_date else '')
+    # '~' sorts after any part suffix
+    high = ARCHIVE_PREFIX + (end_date[:7] if end_date else '') + '~'
+    items = query_all(
+        table,
+        KeyConditionExpression=Key('userEmail').eq(partition_key) & Key('workoutDate').between(low, high)
+    )
+
+    workouts = []
+    for item in items:
+        workouts.extend(
+            workout for workout in decode_archive_item(item, partition_key)
+            if (not start_date or workout['workoutDate'] >= start_date)
+            and (not end_date or workout['workoutDate'] <= end_date)
+        )
+    return workouts
+
+def iter_partition_workouts(table, partition_key: str) -> list:
+    """Hot and archived workouts of one partition, as two oldest-first iterators."""
+    hot = iter_query(
+        table,
+        KeyConditionExpression=Key('userEmail').eq(partition_key) & Key('workoutDate').lt(ARCHIVE_PREFIX)
+    )
+    archive_items = iter_query(
+        table,
+        KeyConditionExpression=Key('userEmail').eq(partition_key) & Key('workoutDate').begins_with(ARCHIVE_PREFIX)
+    )
+    archived = (workout for item in archive_items for workout in decode_archive_item(item, partition_key))
+    return [hot, archived]
+
+def iter_workouts(table, partition_keys: list):
+    """
+    Every workout of the given partitions, oldest first, without loading them all.
+
+    Hot items and archive months are read page by page and merged by date.
+    For a date present more than once the hot item wins over the archive,
+    and earlier partitions win over later ones (list unified before legacy).
+    """
+    streams = [stream for partition_key in partition_keys for stream in iter_partition_workouts(table, partition_key)]
+    last_date = None
+    # heapq.merge keeps input order for equal dates, so the first stream wins
+    for workout in heapq.merge(*streams, key=lambda workout: workout['workoutDate']):
+        if workout['workoutDate'] == last_date:
+            continue
+        last_date = workout['workoutDate']
+        yield workout
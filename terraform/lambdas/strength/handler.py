@@ -1,52 +1,63 @@
-import json
 import sys
 import os
 from datetime import datetime
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from shared.auth import get_user_context
 from shared.dynamodb import data_table
+from shared.handler_utils import handle_request
+from shared.request_context import RequestContext
 from shared.response import error_response, success_response
+from shared.strength_percentiles import strength_percentiles
 from shared.validation import validate_strength, calculate_training_maxes
 from shared.utils import convert_floats_to_decimals
+from shared.weights import to_stored, to_units
+from shared import logger
 
-def get_strength(user_id: str, user_email: str, request_id: str) -> dict:
+def get_strength(ctx: RequestContext, query_params: dict, request_id: str, event: dict) -> dict:
     try:
-        response = data_table.get_item(
-            Key={'userEmail': user_email, 'dataType': 'STRENGTH'}
-        )
-        
-        item = response.get('Item')
+        item = ctx.get('STRENGTH')
         if not item:
-            return error_response(404, 'NOT_FOUND', 'Strength data not found', request_id)
+            return error_response(404, 'NOT_FOUND', 'Strength data not found', ctx.request_id)
         
         item.pop('userEmail', None)
         item.pop('dataType', None)
         
         return success_response(200, item)
     
-    except Exception as e:
-        print(f"Error getting strength: {e}")
-        return error_response(500, 'INTERNAL', 'Internal server error', request_id)
+    except Exception:
+        logger.exception("Error getting strength")
+        return error_response(500, 'INTERNAL', 'Internal server error', ctx.request_id)
+
+def get_percentiles(ctx: RequestContext) -> dict:
+    try:
+        item = ctx.get('STRENGTH')
+        if not item:
+            return error_response(404, 'NOT_FOUND', 'Strength data not found', ctx.request_id)
+        
+        return success_response(200, strength_percentiles(item))
+    
+    except Exception:
+        logger.exception("Error getting strength percentiles")
+        return error_response(500, 'INTERNAL', 'Internal server error', ctx.request_id)
 
-def put_strength(user_id: str, user_email: str, body: dict, request_id: str) -> dict:
+def put_strength(ctx: RequestContext, body: dict, request_id: str, event: dict) -> dict:
     try:
         is_valid, error_msg = validate_strength(body)
         if not is_valid:
-            return error_response(400, 'VALIDATION_ERROR', error_msg, request_id)
+            return error_response(400, 'VALIDATION_ERROR', error_msg, ctx.request_id)
         
         now = datetime.utcnow().isoformat() + 'Z'
         
-        existing = data_table.get_item(
-            Key={'userEmail': user_email, 'dataType': 'STRENGTH'}
-        ).get('Item', {})
+        existing = ctx.get('STRENGTH') or {}
         
-        training_maxes = calculate_training_maxes(body['oneRepMaxes'], body['tmPolicy'])
+        # Weights are integer units from here until they are stored
+        one_rep_max_units = {lift: to_units(value) for lift, value in body['oneRepMaxes'].items()}
+        training_maxes = calculate_training_maxes(one_rep_max_units, body['tmPolicy'])
         
-        one_rep_maxes_decimal = convert_floats_to_decimals(body['oneRepMaxes'])
+        one_rep_maxes_decimal = {lift: to_stored(units) for lift, units in one_rep_max_units.items()}
         tm_policy_decimal = convert_floats_to_decimals(body['tmPolicy'])
-        training_maxes_decimal = convert_floats_to_decimals(training_maxes)
+        training_maxes_decimal = {lift: to_stored(units) for lift, units in training_maxes.items()}
         
         history_entry = {
             'date': now,
@@ -58,10 +69,10 @@ def put_strength(user_id: str, user_email: str, body: dict, request_id: str) ->
         history.append(history_entry)
         
         strength = {
-            'userEmail': user_email,
+            'userEmail': ctx.user_key,
             'dataType': 'STRENGTH',
-            'userId': user_id,
-            'email': user_email,
+            'userId': ctx.user_id,
+            'email': ctx.email,
             'oneRepMaxes': one_rep_maxes_decimal,
             'tmPolicy': tm_policy_decimal,
             'trainingMaxes': training_maxes_decimal,
@@ -70,42 +81,32 @@ def put_strength(user_id: str, user_email: str, body: dict, request_id: str) ->
             'updatedAt': now
         }
         
+        bodyweight = body['bodyweight'] if 'bodyweight' in body else existing.get('bodyweight')
+        if bodyweight is not None:
+            strength['bodyweight'] = to_stored(to_units(bodyweight))
+        
+        # Percentile sketches are updated from the table stream (events/handler.py)
         data_table.put_item(Item=strength)
+        ctx.remember(strength)
         
         response_strength = {k: v for k, v in strength.items() if k not in ['userEmail', 'dataType']}
         
         return success_response(200, response_strength)
     
-    except Exception as e:
-        print(f"Error putting strength: {e}")
-        import traceback
-        traceback.print_exc()
-        return error_response(500, 'INTERNAL', 'Internal server error', request_id)
+    except Exception:
+        logger.exception("Error putting strength")
+        return error_response(500, 'INTERNAL', 'Internal server error', ctx.request_id)
 
-def handler(event, context):
-    try:
-        request_id = context.aws_request_id
-        method = event['requestContext']['http']['method']
-        
-        user_context = get_user_context(event)
-        if not user_context or not user_context.get('userId') or not user_context.get('email'):
-            return error_response(403, 'FORBIDDEN', 'Invalid or missing authentication', request_id)
-        
-        user_id = user_context['userId']
-        user_email = user_context['email']
-        
-        if method == 'GET':
-            return get_strength(user_id, user_email, request_id)
-        
-        if method == 'PUT':
-            body = json.loads(event.get('body', '{}'))
-            return put_strength(user_id, user_email, body, request_id)
-        
-        return error_response(405, 'METHOD_NOT_ALLOWED', 'Method not allowed', request_id)
-    
-    except Exception as e:
-        print(f"Handler error: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return error_response(500, 'INTERNAL', 'Internal server error', context.aws_request_id)
+def get_route(ctx: RequestContext, query_params: dict, request_id: str, event: dict) -> dict:
+    if ctx.path == '/strength/percentiles':
+        return get_percentiles(ctx)
+    return get_strength(ctx, query_params, request_id, event)
 
+def handler(event, context):
+    """
+    Routes:
+    - GET /strength
+    - PUT /strength
+    - GET /strength/percentiles
+    """
+    return handle_request(event, context, get_handler=get_route, put_handler=put_strength)
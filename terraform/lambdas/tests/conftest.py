@@ -0,0 +1,101 @@
+import importlib.util
+import json
+import os
+import sys
+import time
+
+import pytest
+
+LAMBDAS_DIR = os.path.join(os.path.dirname(__file__), '..')
+APP_CONFIG_DIR = os.path.join(LAMBDAS_DIR, '..', '..', 'app_config')
+
+# Handlers read these at import; nothing here talks to AWS
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+os.environ.setdefault('DATA_TABLE', 'test_data')
+os.environ.setdefault('WORKOUT_TABLE', 'test_workout_history')
+os.environ.setdefault('CONFIG_BUCKET', 'test-config')
+
+sys.path.insert(0, LAMBDAS_DIR)
+
+def read_app_config(name: str) -> dict:
+    with open(os.path.join(APP_CONFIG_DIR, name)) as f:
+        return json.load(f)
+
+@pytest.fixture
+def app_config(monkeypatch):
+    """Serve config documents from app_config/ instead of the config bucket."""
+    from shared import s3_config
+
+    def fetch(bucket, key, etag=None):
+        data = read_app_config(key.removeprefix('config/'))
+        return {'data': data, 'etag': f'"{data.get("version")}"', 'timestamp': time.time()}
+
+    monkeypatch.setattr(s3_config, '_fetch', fetch)
+    monkeypatch.setattr(s3_config, '_programs_bytes', 0)
+    s3_config.clear_cache()
+    s3_config._programs.clear()
+    yield
+    s3_config.clear_cache()
+    s3_config._programs.clear()
+
+@pytest.fixture
+def program(app_config):
+    from shared.s3_config import get_program
+    return get_program()
+
+@pytest.fixture
+def exercise_library(app_config):
+    from shared.s3_config import get_app_config, EXERCISES_KEY
+    return get_app_config(EXERCISES_KEY)
+
+@pytest.fixture
+def load_handler(app_config):
+    """Import <name>/handler.py under a unique module name (every Lambda's module is 'handler')."""
+    def load(name: str):
+        spec = importlib.util.spec_from_file_location(f'{name}_handler', os.path.join(LAMBDAS_DIR, name, 'handler.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    return load
+
+@pytest.fixture
+def call_api():
+    """Invoke a handler module with an HTTP API (payload v2) event; returns (status, JSON body)."""
+    class LambdaContext:
+        aws_request_id = 'test-request'
+
+    def call(module, path: str, query: dict | None = None, method: str = 'GET', sub: str = 'user-1',
+             body: dict | None = None):
+        event = {
+            'rawPath': path,
+            'headers': {},
+            'queryStringParameters': query,
+            'requestContext': {
+                'http': {'method': method},
+                'authorizer': {'jwt': {'claims': {'sub': sub, 'email': f'{sub}@example.com'}}}
+            }
+        }
+        if body is not None:
+            event['body'] = json.dumps(body)
+        response = module.handler(event, LambdaContext())
+        return response['statusCode'], json.loads(response['body'])
+    return call
+
+@pytest.fixture
+def user_items(monkeypatch):
+    """
+    In-memory user partitions for request handlers: {sub: {dataType: item}}.
+
+    Stands in for the per-request state Query (RequestContext.load).
+    """
+    from shared import request_context
+    users = {}
+
+    def load_user_state_for(user_context, types=None):
+        items = users.get(user_context['userId'], {})
+        return {data_type: item for data_type, item in items.items() if types is None or data_type in types}
+
+    monkeypatch.setattr(request_context, 'load_user_state_for', load_user_state_for)
+    return users
@@ -0,0 +1,95 @@
+from decimal import Decimal
+
+import pytest
+from botocore.exceptions import ClientError
+
+from shared.workout_archive import decode_archive_item, is_archive_key
+from tools import compact_workouts
+
+USER = 'USER#user-1'
+
+class FakeTable:
+    """workout_history for one partition, with conditional deletes on createdAt."""
+
+    def __init__(self, items: list):
+        self.items = {item['workoutDate']: dict(item) for item in items}
+
+    def delete_item(self, Key, ConditionExpression):
+        expression = ConditionExpression.get_expression()
+        current = self.items.get(Key['workoutDate'], {})
+        if expression['operator'] == '=':
+            holds = current.get('createdAt') == expression['values'][1]
+        else:
+            holds = 'createdAt' not in current
+        if not holds:
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': ''}}, 'DeleteItem')
+        del self.items[Key['workoutDate']]
+
+class FakeResource:
+    def __init__(self, table: FakeTable):
+        self.table = table
+
+    def Table(self, name):
+        return self.table
+
+@pytest.fixture
+def workouts(monkeypatch):
+    table = FakeTable([
+        {'userEmail': USER, 'workoutDate': '2024-01-02', 'sessionId': 'a', 'createdAt': '2024-01-02T10:00:00Z'},
+        {'userEmail': USER, 'workoutDate': '2024-01-04', 'sessionId': 'b', 'createdAt': '2024-01-04T10:00:00Z'},
+        {'userEmail': USER, 'workoutDate': '2024-01-06', 'sessionId': 'c', 'weight': Decimal('100')},
+    ])
+    edits = {}
+
+    def query_all(fake, KeyConditionExpression):
+        prefix = KeyConditionExpression.get_expression()['values'][1].get_expression()['values'][1]
+        found = [dict(item) for key, item in sorted(fake.items.items()) if key.startswith(prefix)]
+        # Edits land after the month was read
+        for key, changes in edits.items():
+            fake.items[key].update(changes)
+        return found
+
+    def batch_write_requests(table_name, requests, resource=None):
+        for request in requests:
+            if 'PutRequest' in request:
+                item = request['PutRequest']['Item']
+                table.items[item['workoutDate']] = item
+            else:
+                del table.items[request['DeleteRequest']['Key']['workoutDate']]
+        return 0
+
+    monkeypatch.setattr(compact_workouts, 'query_all', query_all)
+    monkeypatch.setattr(compact_workouts, 'batch_write_requests', batch_write_requests)
+    return table, edits
+
+def test_compact_month_archives_and_removes_hot_items(workouts):
+    table, _ = workouts
+    stats = compact_workouts.CompactionStats()
+    compact_workouts.compact_month(FakeResource(table), 'history', USER, '2024-01', False, stats)
+
+    assert all(is_archive_key(key) for key in table.items)
+    archived = decode_archive_item(table.items['ARCHIVE#2024-01#00'], USER)
+    assert [w['sessionId'] for w in archived] == ['a', 'b', 'c']
+    assert stats.counts['itemsRemoved'] == 3
+    assert stats.counts['skipped'] == 0
+
+def test_compact_month_keeps_items_changed_after_read(workouts):
+    table, edits = workouts
+    edits['2024-01-04'] = {'sessionId': 'b2', 'createdAt': '2024-06-01T09:00:00Z'}
+    edits['2024-01-06'] = {'createdAt': '2024-06-01T09:00:00Z'}
+    stats = compact_workouts.CompactionStats()
+    compact_workouts.compact_month(FakeResource(table), 'history', USER, '2024-01', False, stats)
+
+    assert table.items['2024-01-04']['sessionId'] == 'b2'
+    assert '2024-01-06' in table.items
+    assert '2024-01-02' not in table.items
+    assert stats.skipped == [(USER, '2024-01-04'), (USER, '2024-01-06')]
+    assert stats.counts == dict(stats.counts, itemsRemoved=1, skipped=2)
+
+def test_dry_run_writes_nothing(workouts):
+    table, _ = workouts
+    before = dict(table.items)
+    stats = compact_workouts.CompactionStats()
+    compact_workouts.compact_month(FakeResource(table), 'history', USER, '2024-01', True, stats)
+    assert table.items == before
+    assert stats.counts['itemsRemoved'] == 3
@@ -0,0 +1,80 @@
+import io
+import json
+
+import pytest
+
+from shared import s3_config
+from shared.config_delta import parse_document_version
+
+KEY = s3_config.EXERCISES_KEY
+
+class FakeS3:
+    """Versioned bucket holding uploads of one key, newest first, 1000 versions per page."""
+
+    def __init__(self, document_versions: list):
+        self.versions = [{'Key': KEY, 'VersionId': f'v{i}', 'version': version} for i, version in enumerate(document_versions)]
+        self.pages_listed = 0
+        self.gets = 0
+
+    def get_paginator(self, operation):
+        fake = self
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix):
+                for start in range(0, len(fake.versions), 1000):
+                    fake.pages_listed += 1
+                    yield {'Versions': fake.versions[start:start + 1000]}
+        return Paginator()
+
+    def get_object(self, Bucket, Key, VersionId):
+        self.gets += 1
+        version = next(v for v in self.versions if v['VersionId'] == VersionId)
+        return {'Body': io.BytesIO(json.dumps({'version': version['version']}).encode('utf-8'))}
+
+@pytest.fixture
+def fake_s3(monkeypatch):
+    for cache in ('_document_versions', '_object_versions', '_missing_versions'):
+        monkeypatch.setattr(s3_config, cache, {})
+    monkeypatch.setattr(s3_config, '_scanned_versions', set())
+
+    def install(document_versions: list) -> FakeS3:
+        fake = FakeS3(document_versions)
+        monkeypatch.setattr(s3_config, 's3_client', fake)
+        return fake
+    return install
+
+@pytest.mark.parametrize('value', ['abc', '-1', '0', '1.5', '1e3', '9999999999'])
+def test_malformed_versions_are_rejected(value):
+    assert parse_document_version(value) is None
+
+def test_valid_version_parses():
+    assert parse_document_version(' 12 ') == 12
+
+def test_found_version_is_remembered(fake_s3):
+    fake = fake_s3([3, 2, 1])
+    assert s3_config.get_app_config_version(KEY, 2) == {'version': 2}
+    pages = fake.pages_listed
+    assert s3_config.get_app_config_version(KEY, 2) == {'version': 2}
+    assert fake.pages_listed == pages
+
+def test_missing_version_is_cached_negatively(fake_s3):
+    fake = fake_s3([3, 2, 1])
+    assert s3_config.get_app_config_version(KEY, 7) is None
+    pages, gets = fake.pages_listed, fake.gets
+    for _ in range(5):
+        assert s3_config.get_app_config_version(KEY, 7) is None
+    assert (fake.pages_listed, fake.gets) == (pages, gets)
+
+def test_scan_is_capped(fake_s3, monkeypatch):
+    monkeypatch.setattr(s3_config, 'MAX_VERSION_PAGES', 2)
+    fake = fake_s3(list(range(5000, 0, -1)))
+    assert s3_config.get_app_config_version(KEY, 1) is None
+    assert fake.pages_listed == 2
+    assert fake.gets == 2000
+
+@pytest.mark.parametrize('since_version, status', [('abc', 400), ('0', 400), ('999', 404)])
+def test_exercises_delta_rejects_without_scanning(load_handler, call_api, fake_s3, since_version, status):
+    fake = fake_s3([3, 2, 1])
+    code, body = call_api(load_handler('config'), '/exercises', {'sinceVersion': since_version})
+    assert code == status
+    assert fake.pages_listed == 0
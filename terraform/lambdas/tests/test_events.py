@@ -0,0 +1,135 @@
+import pytest
+
+STRENGTH = {'dataType': 'STRENGTH', 'oneRepMaxes': {'squat': 140, 'bench': 100, 'deadlift': 180, 'ohp': 60}}
+SETTINGS = {'dataType': 'PROGRAM_SETTINGS', 'preferredUnits': 'kg'}
+
+@pytest.fixture
+def events_handler(load_handler):
+    return load_handler('events')
+
+def progress_event(week: int) -> dict:
+    return {
+        'eventId': f'week-{week}',
+        'userKey': 'USER#user-1',
+        'new': {'userEmail': 'USER#user-1', 'dataType': 'PROGRESS', 'programWeek': week},
+        'old': {'userEmail': 'USER#user-1', 'dataType': 'PROGRESS', 'programWeek': week - 1}
+    }
+
+@pytest.fixture
+def stored_renders(events_handler, monkeypatch):
+    stored = {}
+    monkeypatch.setattr(events_handler, 'load_user_state_for',
+                        lambda user_context, types: {'STRENGTH': STRENGTH, 'PROGRAM_SETTINGS': SETTINGS})
+    monkeypatch.setattr(events_handler, 'store_render',
+                        lambda user_key, week, fingerprint, result: stored.setdefault(week, result))
+    return stored
+
+@pytest.mark.parametrize('week', [2, 12, 13])
+def test_week_advanced_pre_renders_the_new_week(events_handler, stored_renders, week):
+    events_handler.on_week_advanced(progress_event(week))
+    assert stored_renders[week]['weekIndex'] == week
+
+def test_week_advanced_failure_does_not_fail_the_record(events_handler, stored_renders, monkeypatch):
+    def broken(*args):
+        raise RuntimeError('render store unavailable')
+    monkeypatch.setattr(events_handler, 'store_render', broken)
+    events_handler.on_week_advanced(progress_event(5))
+
+def test_conversion_writes_are_not_strength_updates(events_handler):
+    old = dict(STRENGTH, userEmail='USER#user-1')
+    converted = dict(old, oneRepMaxes={'squat': 308.65}, conversionJob='lb#2024-05-01T00:00:00Z')
+    assert events_handler.classify('test_data', 'MODIFY', converted, old) is None
+    # A later PUT /strength drops the tag and counts again
+    updated = dict(old, oneRepMaxes={'squat': 315})
+    assert events_handler.classify('test_data', 'MODIFY', updated, converted) == events_handler.STRENGTH_UPDATED
+    assert events_handler.classify('test_data', 'MODIFY', updated, old) == events_handler.STRENGTH_UPDATED
+
+def test_migrated_copies_are_ignored(events_handler):
+    workout = {'userEmail': 'USER#user-1', 'workoutDate': '2023-03-01', 'sessionId': 'w1-squat',
+               'migratedFrom': 'lifter@example.com'}
+    assert events_handler.classify('test_workout_history', 'INSERT', workout, None) is None
+    strength = dict(STRENGTH, userEmail='USER#user-1', migratedFrom='lifter@example.com')
+    assert events_handler.classify('test_data', 'INSERT', strength, None) is None
+    # Workouts logged after the migration are written without the marker
+    logged = {'userEmail': 'USER#user-1', 'workoutDate': '2024-03-01', 'sessionId': 'w1-bench'}
+    assert events_handler.classify('test_workout_history', 'INSERT', logged, None) == events_handler.WORKOUT_LOGGED
+
+@pytest.fixture
+def markers(monkeypatch):
+    """In-memory EVENT# marker items behind shared.events."""
+    from shared import events
+    stored = set()
+
+    def batch_get_items(keys, max_workers=None):
+        return [dict(key) for key in keys if key['userEmail'] in stored]
+
+    def batch_write_requests(table_name, requests, resource=None):
+        stored.update(request['PutRequest']['Item']['userEmail'] for request in requests)
+        return 0
+
+    monkeypatch.setattr(events, 'batch_get_items', batch_get_items)
+    monkeypatch.setattr(events, 'batch_write_requests', batch_write_requests)
+    return stored
+
+@pytest.fixture
+def logged_sessions(events_handler, monkeypatch):
+    """Sessions handed to the WorkoutLogged consumer; those in failing raise once."""
+    calls, failing = [], set()
+
+    def on_workout_logged(event):
+        session_id = event['new']['sessionId']
+        calls.append(session_id)
+        if session_id in failing:
+            failing.discard(session_id)
+            raise RuntimeError('progress table throttled')
+
+    monkeypatch.setitem(events_handler.CONSUMERS, events_handler.WORKOUT_LOGGED, on_workout_logged)
+    return calls, failing
+
+def workout_stream(*session_ids):
+    from shared.events import LocalStream
+    stream = LocalStream('test_workout_history')
+    for day, session_id in enumerate(session_ids, start=1):
+        stream.put({'userEmail': 'USER#user-1', 'workoutDate': f'2024-02-{day:02d}', 'sessionId': session_id})
+    return stream
+
+def test_failed_record_is_retried_from_where_it_failed(events_handler, markers, logged_sessions):
+    calls, failing = logged_sessions
+    failing.add('w3')
+    stream = workout_stream('w1', 'w2', 'w3', 'w4')
+    responses = stream.drain(events_handler.handler)
+
+    assert responses[0] == {'batchItemFailures': [{'itemIdentifier': '3'}]}
+    assert responses[1] == {'batchItemFailures': []}
+    assert calls == ['w1', 'w2', 'w3', 'w3', 'w4']
+    assert markers == {f'EVENT#test_workout_history-{n}' for n in range(1, 5)}
+
+def test_redelivered_batch_skips_handled_events(events_handler, markers, logged_sessions):
+    calls, failing = logged_sessions
+    failing.add('w2')
+    records = list(workout_stream('w1', 'w2', 'w3').records)
+
+    # The whole batch comes back, as it does when partial failures are not honoured
+    first = events_handler.handler({'Records': records}, None)
+    second = events_handler.handler({'Records': records}, None)
+    third = events_handler.handler({'Records': records}, None)
+
+    assert first == {'batchItemFailures': [{'itemIdentifier': '2'}]}
+    assert second == third == {'batchItemFailures': []}
+    assert calls == ['w1', 'w2', 'w2', 'w3']
+
+def test_persistent_failure_stops_at_the_failing_record(events_handler, markers, logged_sessions, monkeypatch):
+    calls, _ = logged_sessions
+
+    def broken(event):
+        calls.append(event['new']['sessionId'])
+        raise RuntimeError('always fails')
+
+    monkeypatch.setitem(events_handler.CONSUMERS, events_handler.WORKOUT_LOGGED, broken)
+    stream = workout_stream('w1', 'w2')
+    responses = stream.drain(events_handler.handler)
+
+    assert responses == [{'batchItemFailures': [{'itemIdentifier': '1'}]}]
+    assert calls == ['w1']
+    assert not markers
+    assert len(stream.records) == 2
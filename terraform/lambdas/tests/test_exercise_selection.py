@@ -0,0 +1,87 @@
+import itertools
+import random
+
+import pytest
+
+from shared.exercise_selection import PLACEHOLDER_SCORE, select_week_assistance, solve_assistance
+
+class RecordingRandom(random.Random):
+    """Seeded random source that remembers every preference score it hands out."""
+
+    def __init__(self, seed):
+        super().__init__(seed)
+        self.draws = []
+
+    def random(self):
+        value = super().random()
+        self.draws.append(value)
+        return value
+
+def preference_scores(pools: list, slot_ids: tuple, draws: list) -> dict:
+    """(slotId, exercise index) -> score, drawn in solve_assistance's order (most constrained group first)."""
+    groups = {}
+    for slot, slot_id in enumerate(slot_ids):
+        groups.setdefault(slot_id, []).append(slot)
+    ordered = sorted(groups.values(), key=lambda members: len(pools[members[0]]) - len(members))
+    draws = iter(draws)
+    return {
+        (slot_ids[members[0]], index): next(draws)
+        for members in ordered for index, _ in pools[members[0]]
+    }
+
+def brute_force(pools: list, slot_ids: tuple, budget_units: int, distinct: bool, scores: dict) -> float:
+    best = float('-inf')
+    for choice in itertools.product(*[pool + [None] for pool in pools]):
+        picks = [option for option in choice if option is not None]
+        if sum(cost for _, cost in picks) > budget_units:
+            continue
+        if distinct and len({index for index, _ in picks}) < len(picks):
+            continue
+        best = max(best, sum(
+            PLACEHOLDER_SCORE if option is None else scores[(slot_id, option[0])]
+            for slot_id, option in zip(slot_ids, choice)
+        ))
+    return best
+
+def random_case(rng: random.Random):
+    """A few slots over two or three slot IDs drawing on a small shared library."""
+    costs = {index: rng.choice([0, 40, 90, 150, 220]) for index in range(6)}
+    ids = ['upper_push', 'upper_pull', 'carry'][:rng.randint(1, 3)]
+    slot_ids = tuple(rng.choice(ids) for _ in range(rng.randint(1, 5)))
+    library_pools = {
+        slot_id: [(index, costs[index]) for index in sorted(rng.sample(range(6), rng.randint(0, 4)))]
+        for slot_id in ids
+    }
+    pools = [library_pools[slot_id] for slot_id in slot_ids]
+    return pools, slot_ids, rng.choice([0, 50, 160, 300, 600])
+
+@pytest.mark.parametrize('distinct', [True, False])
+def test_solver_matches_brute_force(distinct):
+    rng = random.Random(31)
+    for case in range(300):
+        pools, slot_ids, budget_units = random_case(rng)
+        scores_rng = RecordingRandom(case)
+        result = solve_assistance(pools, slot_ids, budget_units, distinct, scores_rng)
+        scores = preference_scores(pools, slot_ids, scores_rng.draws)
+
+        picks = [index for index in result if index is not None]
+        costs = [dict(pool) for pool in pools]
+        assert sum(costs[slot][index] for slot, index in enumerate(result) if index is not None) <= budget_units
+        if distinct:
+            assert len(set(picks)) == len(picks)
+        score = sum(
+            PLACEHOLDER_SCORE if index is None else scores[(slot_id, index)]
+            for slot_id, index in zip(slot_ids, result)
+        )
+        assert score == pytest.approx(brute_force(pools, slot_ids, budget_units, distinct, scores)), (
+            pools, slot_ids, budget_units
+        )
+
+def test_week_assistance_stays_within_budget(program, exercise_library):
+    sessions = program['sessionTemplates']
+    for phase in program['phasesByWeek'].values():
+        selection = select_week_assistance(
+            sessions, exercise_library, [], ['barbell', 'dumbbell', 'kb', 'band'], phase['phaseId'], random.Random(7)
+        )
+        assert selection['fatigue']['total'] <= selection['fatigue']['budget']
+        assert len(selection['sessions']) == len(sessions)
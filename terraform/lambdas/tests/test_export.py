@@ -0,0 +1,185 @@
+import csv
+import gzip
+import io
+import random
+import string
+from datetime import date, timedelta
+
+import pytest
+
+from shared import export
+
+STRENGTH = {'dataType': 'STRENGTH', 'oneRepMaxes': {'squat': 140, 'bench': 100, 'deadlift': 180, 'ohp': 60}}
+SETTINGS = {'dataType': 'PROGRAM_SETTINGS', 'preferredUnits': 'kg', 'tmPercent': 85}
+
+def test_ics_line_folds_at_75_octets_without_splitting_characters():
+    value = 'Øvelse: kettlebell-sving — 24 kg × 15 ' * 6
+    folded = export.ics_line('DESCRIPTION', value)
+    lines = folded.removesuffix('\r\n').split('\r\n')
+
+    assert len(lines) > 3
+    assert all(len(line.encode('utf-8')) <= 75 for line in lines)
+    assert all(line.startswith(' ') for line in lines[1:])
+    assert folded.endswith('\r\n')
+    # Unfolding (RFC 5545 3.1) restores the content line
+    assert folded.removesuffix('\r\n').replace('\r\n ', '') == f'DESCRIPTION:{value}'
+
+def test_short_ics_line_is_not_folded():
+    assert export.ics_line('SUMMARY', 'Squat') == 'SUMMARY:Squat\r\n'
+
+def test_ics_escape():
+    assert export.ics_escape('Squat, 5;3\\1\nAMRAP') == 'Squat\\, 5\\;3\\\\1\\nAMRAP'
+
+def test_csv_lines_header_and_rows():
+    entries = [
+        {'kind': 'plan', 'date': '2024-05-06', 'weekIndex': 3, 'phase': 'Leader 1', 'title': 'Squat',
+         'units': 'kg', 'notes': '', 'sets': [
+             {'exercise': 'Back Squat', 'set': 1, 'weight': 102.5, 'reps': 5, 'pctTM': 0.75},
+             {'exercise': 'Dips'}
+         ]},
+        {'kind': 'workout', 'date': '2024-05-07', 'weekIndex': None, 'phase': '', 'title': 'Logged: Run',
+         'units': 'kg', 'notes': 'easy, flat', 'sets': []}
+    ]
+    rows = list(csv.reader(io.StringIO(''.join(export.csv_lines(entries)))))
+    assert rows[0] == export.CSV_COLUMNS
+    assert rows[1:] == [
+        ['plan', '2024-05-06', '3', 'Leader 1', 'Squat', 'Back Squat', '1', '102.5', '5', '75', 'kg', ''],
+        ['plan', '2024-05-06', '3', 'Leader 1', 'Squat', 'Dips', '', '', '', '', 'kg', ''],
+        ['workout', '2024-05-07', '', '', 'Logged: Run', '', '', '', '', '', 'kg', 'easy, flat']
+    ]
+
+def test_gzip_parts_round_trip_with_small_parts():
+    rng = random.Random(50)
+    lines = [''.join(rng.choices(string.ascii_letters, k=40)) + '\n' for _ in range(5000)]
+    parts = list(export.gzip_parts(iter(lines), part_bytes=16 * 1024))
+
+    assert len(parts) > 2
+    assert all(len(part) >= 16 * 1024 for part in parts[:-1])
+    assert gzip.decompress(b''.join(parts)).decode('utf-8') == ''.join(lines)
+
+def test_gzip_parts_of_nothing_is_one_valid_part():
+    parts = list(export.gzip_parts(iter([])))
+    assert len(parts) == 1
+    assert gzip.decompress(parts[0]) == b''
+
+class FakeS3:
+    def __init__(self, fail_on_part: int | None = None):
+        self.fail_on_part = fail_on_part
+        self.calls = []
+
+    def create_multipart_upload(self, **kwargs):
+        self.calls.append(('create', kwargs))
+        return {'UploadId': 'upload-1'}
+
+    def upload_part(self, PartNumber, Body, **kwargs):
+        self.calls.append(('part', PartNumber))
+        if PartNumber == self.fail_on_part:
+            raise ConnectionError('connection reset')
+        return {'ETag': f'"etag-{PartNumber}"'}
+
+    def complete_multipart_upload(self, MultipartUpload, **kwargs):
+        self.calls.append(('complete', MultipartUpload['Parts']))
+
+    def abort_multipart_upload(self, **kwargs):
+        self.calls.append(('abort', kwargs['UploadId']))
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://{Params['Bucket']}.example/{Params['Key']}?expires={ExpiresIn}"
+
+def test_upload_parts_completes_with_every_part(monkeypatch):
+    s3 = FakeS3()
+    monkeypatch.setattr(export, 's3_client', s3)
+    size = export.upload_parts(iter([b'a' * 10, b'b' * 5]), 'bucket', 'key', ContentType='text/csv')
+
+    assert size == 15
+    assert s3.calls[-1] == ('complete', [{'ETag': '"etag-1"', 'PartNumber': 1}, {'ETag': '"etag-2"', 'PartNumber': 2}])
+
+def test_upload_parts_aborts_when_a_part_fails(monkeypatch):
+    s3 = FakeS3(fail_on_part=2)
+    monkeypatch.setattr(export, 's3_client', s3)
+    with pytest.raises(ConnectionError):
+        export.upload_parts(iter([b'a', b'b', b'c']), 'bucket', 'key')
+
+    assert [call[0] for call in s3.calls] == ['create', 'part', 'part', 'abort']
+    assert s3.calls[-1] == ('abort', 'upload-1')
+
+def test_upload_parts_aborts_when_the_document_fails(monkeypatch):
+    s3 = FakeS3()
+    monkeypatch.setattr(export, 's3_client', s3)
+
+    def parts():
+        yield b'a'
+        raise ValueError('render failed')
+
+    with pytest.raises(ValueError):
+        export.upload_parts(parts(), 'bucket', 'key')
+    assert s3.calls[-1] == ('abort', 'upload-1')
+
+@pytest.mark.parametrize('start_day, expected', [
+    ('wed', date(2024, 5, 8)),
+    ('sat', date(2024, 5, 4)),
+    ('thu', date(2024, 5, 2)),
+    ('sun', date(2024, 5, 5)),
+    ('mon', date(2024, 5, 6))
+])
+def test_current_week_start(start_day, expected):
+    # 2024-05-08 is a Wednesday
+    assert export.current_week_start(date(2024, 5, 8), start_day) == expected
+
+def test_plan_weeks_are_placed_around_the_progress_week(program, exercise_library):
+    state = {
+        'STRENGTH': STRENGTH,
+        'PROGRAM_SETTINGS': dict(SETTINGS, preferredStartDay='sat'),
+        'PROGRESS': {'dataType': 'PROGRESS', 'programWeek': 3}
+    }
+    weeks = list(export.plan_weeks(state, program, exercise_library, date(2024, 5, 8)))
+
+    assert [week['weekIndex'] for week in weeks] == sorted(program['phasesByWeek'])
+    current_start = date(2024, 5, 4)
+    for week in weeks:
+        week_start = current_start + timedelta(weeks=week['weekIndex'] - 3)
+        assert [day['date'] for day in week['days']] == [
+            (week_start + timedelta(days=offset)).isoformat() for offset in range(7)
+        ]
+        assert week['days'][0]['dayOfWeek'] == 6
+        if program['setSchemeByWeek'].get(week['weekIndex']):
+            assert week['sessions']
+        else:
+            assert week['sessions'] is None
+    assert weeks[0]['days'][0]['date'] == '2024-04-20'
+
+@pytest.fixture
+def export_api(load_handler, user_items, monkeypatch):
+    monkeypatch.setenv('EXPORT_BUCKET', 'test-exports')
+    module = load_handler('export')
+    s3 = FakeS3()
+    monkeypatch.setattr(export, 's3_client', s3)
+    monkeypatch.setattr(module, 'iter_workouts', lambda table, partition_keys: iter([
+        {'workoutDate': '2024-05-01', 'sessionId': 'w1-squat', 'units': 'kg',
+         'mainLift': {'liftId': 'squat', 'sets': [{'weight': 100, 'reps': 5}]}}
+    ]))
+    return module, s3
+
+def test_export_uploads_a_gzipped_document(export_api, user_items, call_api):
+    module, s3 = export_api
+    user_items['user-1'] = {'STRENGTH': STRENGTH, 'PROGRAM_SETTINGS': SETTINGS}
+    status, body = call_api(module, '/export', {'format': 'csv'})
+
+    assert status == 200
+    assert body['format'] == 'csv'
+    assert body['url'].startswith('https://test-exports.example/exports/user-1/')
+    assert [call[0] for call in s3.calls] == ['create', 'part', 'complete']
+    assert s3.calls[0][1]['ContentEncoding'] == 'gzip'
+
+@pytest.mark.parametrize('query, items, code', [
+    ({'format': 'pdf'}, {'STRENGTH': STRENGTH, 'PROGRAM_SETTINGS': SETTINGS}, 'VALIDATION_ERROR'),
+    ({'format': 'ics'}, {'PROGRAM_SETTINGS': SETTINGS}, 'NOT_FOUND'),
+    ({'format': 'ics'}, {'STRENGTH': STRENGTH}, 'NOT_FOUND')
+])
+def test_export_rejects_incomplete_requests(export_api, user_items, call_api, query, items, code):
+    module, s3 = export_api
+    user_items['user-1'] = items
+    status, body = call_api(module, '/export', query)
+    assert status in (400, 404)
+    assert body['error']['code'] == code
+    assert not s3.calls
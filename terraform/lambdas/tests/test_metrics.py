@@ -0,0 +1,13 @@
+import json
+
+from shared import logger, metrics
+
+def test_emit_writes_emf_regardless_of_log_level(monkeypatch, capsys):
+    monkeypatch.setitem(logger._request, 'level', logger.LEVELS['WARNING'])
+    metrics.emit('Render store', {'Endpoint': 'program_week'}, {'RenderHit': 1, 'LagMs': 12.5}, {'LagMs': 'Milliseconds'})
+    record = json.loads(capsys.readouterr().out)
+    assert record['Endpoint'] == 'program_week'
+    assert record['RenderHit'] == 1
+    definition = record['_aws']['CloudWatchMetrics'][0]
+    assert definition['Dimensions'] == [['Endpoint']]
+    assert {'Name': 'LagMs', 'Unit': 'Milliseconds'} in definition['Metrics']
@@ -0,0 +1,24 @@
+import pytest
+
+from shared import logger, profiler
+
+@pytest.fixture
+def sample_everything(monkeypatch):
+    monkeypatch.setattr(profiler, 'ENABLED', True)
+    monkeypatch.setattr(profiler, 'PROFILE_SAMPLE_RATE', 1.0)
+
+def test_profiles_sampled_requests_when_info_is_logged(sample_everything, monkeypatch):
+    monkeypatch.setitem(logger._request, 'level', logger.LEVELS['INFO'])
+    assert profiler.should_profile('request-1')
+
+@pytest.mark.parametrize('level', ['WARNING', 'ERROR'])
+def test_never_profiles_when_the_record_would_be_dropped(sample_everything, monkeypatch, level):
+    monkeypatch.setitem(logger._request, 'level', logger.LEVELS[level])
+    assert not profiler.should_profile('request-1')
+
+def test_profile_record(sample_everything, monkeypatch, capsys):
+    monkeypatch.setitem(logger._request, 'level', logger.LEVELS['INFO'])
+    assert profiler.profile_call('GET /test', sorted, [3, 1, 2]) == [1, 2, 3]
+    record = capsys.readouterr().out
+    assert '"msg":"Profile GET /test"' in record
+    assert '"wallMs"' in record and '"functions"' in record
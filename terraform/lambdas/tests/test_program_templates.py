@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from conftest import read_app_config
+
+ALT_TEMPLATE_KEY = 'config/alt.template.json'
+
+@pytest.fixture
+def two_programs(app_config, monkeypatch):
+    """A manifest with a second program whose template is a distinct object (version 99)."""
+    from shared import s3_config
+    serve = s3_config._fetch
+
+    def fetch(bucket, key, etag=None):
+        if key == ALT_TEMPLATE_KEY:
+            data = dict(read_app_config('plan.template.json'), programId='alt_v1', version=99)
+            return {'data': data, 'etag': '"99"', 'timestamp': time.time()}
+        fetched = serve(bucket, key, etag)
+        if key == s3_config.MANIFEST_KEY:
+            fetched['data']['programs'].append({'programId': 'alt_v1', 'templateKey': ALT_TEMPLATE_KEY})
+        return fetched
+
+    monkeypatch.setattr(s3_config, '_fetch', fetch)
+
+@pytest.fixture
+def bootstrap(two_programs, load_handler):
+    return load_handler('bootstrap')
+
+@pytest.fixture
+def config(two_programs, load_handler):
+    return load_handler('config')
+
+def settings(program_id: str | None) -> dict:
+    item = {'dataType': 'PROGRAM_SETTINGS', 'preferredUnits': 'kg'}
+    return dict(item, programId=program_id) if program_id else item
+
+@pytest.mark.parametrize('program_id, version', [('alt_v1', 99), ('531_krypteia_v1', 2), (None, 2), ('retired_v0', 2)])
+def test_bootstrap_template_follows_the_users_program(bootstrap, user_items, call_api, program_id, version):
+    user_items['user-1'] = {'PROGRAM_SETTINGS': settings(program_id)}
+    status, body = call_api(bootstrap, '/bootstrap', {'fields': 'template'})
+    assert status == 200
+    assert list(body) == ['template']
+    assert body['template']['data']['version'] == version
+    assert body['template']['etag'] == f'"{version}"'
+
+def test_bootstrap_template_etag_is_per_program(bootstrap, user_items, call_api):
+    user_items['user-1'] = {'PROGRAM_SETTINGS': settings('alt_v1')}
+    status, body = call_api(bootstrap, '/bootstrap', {'fields': 'template,programSettings', 'templateEtag': '"2"'})
+    assert status == 200
+    assert body['template']['notModified'] is False
+    assert body['programSettings']['programId'] == 'alt_v1'
+
+    status, body = call_api(bootstrap, '/bootstrap', {'fields': 'template', 'templateEtag': '"99"'})
+    assert body['template'] == {'etag': '"99"', 'notModified': True}
+
+def test_template_endpoint_selects_a_program(config, call_api):
+    status, body = call_api(config, '/program/template')
+    assert status == 200
+    assert body['programId'] == '531_krypteia_v1'
+
+    status, body = call_api(config, '/program/template', {'programId': 'alt_v1'})
+    assert status == 200
+    assert (body['programId'], body['version']) == ('alt_v1', 99)
+
+    status, body = call_api(config, '/program/template', {'programId': 'retired_v0'})
+    assert status == 404
+    assert body['error']['code'] == 'NOT_FOUND'
@@ -0,0 +1,111 @@
+import pytest
+
+STRENGTH = {'dataType': 'STRENGTH', 'oneRepMaxes': {'squat': 140, 'bench': 100, 'deadlift': 180, 'ohp': 60}}
+SETTINGS = {'dataType': 'PROGRAM_SETTINGS', 'preferredUnits': 'kg', 'tmPercent': 85}
+
+@pytest.fixture
+def program_week(load_handler, monkeypatch):
+    module = load_handler('program_week')
+    # No pre-rendered weeks: always render
+    monkeypatch.setattr(module, 'load_render', lambda user_key, week_index, fingerprint: (None, 'miss'))
+    return module
+
+def athlete(week: int) -> dict:
+    return {'STRENGTH': STRENGTH, 'PROGRAM_SETTINGS': SETTINGS, 'PROGRESS': {'dataType': 'PROGRESS', 'programWeek': week}}
+
+def test_scheme_week_has_work_sets(program_week, user_items, call_api):
+    user_items['user-1'] = athlete(1)
+    status, body = call_api(program_week, '/program/week')
+    assert status == 200
+    assert body['weekIndex'] == 1
+    for session in body['sessions']:
+        assert len(session['mainSets']) == 3
+        assert session['supplemental']['sets'] == 5
+
+@pytest.mark.parametrize('week', [12, 13])
+def test_current_week_without_scheme_renders_without_work_sets(program_week, user_items, call_api, week):
+    user_items['user-1'] = athlete(week)
+    status, body = call_api(program_week, '/program/week')
+    assert status == 200
+    assert body['weekIndex'] == week
+    assert body['phase'] in ('TEST', 'RESET')
+    assert len(body['sessions']) == 4
+    for session in body['sessions']:
+        assert session['setScheme'] is None
+        assert session['mainSets'] == []
+        assert session['supplemental'] is None
+        assert session['warmupSets']
+
+def test_week_index_query_without_scheme(program_week, user_items, call_api):
+    user_items['user-1'] = athlete(3)
+    status, body = call_api(program_week, '/program/week', {'weekIndex': '12'})
+    assert status == 200
+    assert body['phase'] == 'TEST'
+
+def test_full_week_without_scheme(program_week, user_items, call_api):
+    user_items['user-1'] = athlete(12)
+    status, body = call_api(program_week, '/program/week/full')
+    assert status == 200
+    main_days = [day for day in body['days'] if day['type'] == 'main']
+    assert [day['sessionId'] for day in main_days] == [session['sessionId'] for session in body['sessions']]
+
+def test_unknown_week_is_a_client_error(program_week, user_items, call_api):
+    user_items['user-1'] = athlete(1)
+    status, body = call_api(program_week, '/program/week', {'weekIndex': '14'})
+    assert status == 400
+    assert body['error']['code'] == 'INVALID_WEEK'
+
+@pytest.fixture
+def batch_users(program_week, monkeypatch):
+    """userId -> {dataType: item} served to render_weeks_batch, plus the key lists requested."""
+    users, requested = {}, []
+
+    def batch_get_items(keys, max_workers=None):
+        requested.append(keys)
+        found = []
+        for key in keys:
+            item = users.get(key['userEmail'][len('USER#'):], {}).get(key['dataType'])
+            if item:
+                found.append(dict(item, userEmail=key['userEmail']))
+        return found
+
+    monkeypatch.setattr(program_week, 'batch_get_items', batch_get_items)
+    users.update({
+        'lifter': athlete(3),
+        'tester': athlete(12),
+        'resetter': athlete(13),
+        'no-strength': {'PROGRAM_SETTINGS': SETTINGS},
+        'no-settings': {'STRENGTH': STRENGTH},
+        'retired': dict(athlete(2), PROGRAM_SETTINGS=dict(SETTINGS, programId='retired_program_v0'))
+    })
+    return users, requested
+
+def test_batch_renders_current_weeks_and_reports_incomplete_users(program_week, batch_users):
+    users, requested = batch_users
+    user_ids = list(users) + ['unknown', 'lifter']
+    results = program_week.render_weeks_batch(user_ids)
+
+    assert len(requested) == 1
+    assert list(results) == list(users) + ['unknown']
+    assert results['lifter']['weekIndex'] == 3
+    assert all(len(session['mainSets']) == 3 for session in results['lifter']['sessions'])
+    for user_id, week in (('tester', 12), ('resetter', 13)):
+        assert results[user_id]['weekIndex'] == week
+        assert all(session['mainSets'] == [] for session in results[user_id]['sessions'])
+    for user_id in ('no-strength', 'no-settings', 'retired', 'unknown'):
+        assert results[user_id]['error']['code'] == 'NOT_FOUND'
+    assert 'retired_program_v0' in results['retired']['error']['message']
+
+def test_batch_renders_a_fixed_week_for_everyone(program_week, batch_users):
+    results = program_week.render_weeks_batch(['lifter', 'tester', 'no-settings'], week_index=12)
+    assert results['lifter']['weekIndex'] == results['tester']['weekIndex'] == 12
+    # Same maxes and settings: same main-lift work (assistance picks vary by design)
+    for lifter, tester in zip(results['lifter']['sessions'], results['tester']['sessions']):
+        assert lifter['warmupSets'] == tester['warmupSets']
+        assert lifter['mainSets'] == tester['mainSets'] == []
+    assert results['no-settings'] == {'error': {'code': 'NOT_FOUND', 'message': 'Program settings not found'}}
+
+def test_batch_invalid_week(program_week, batch_users):
+    results = program_week.render_weeks_batch(['lifter', 'no-strength'], week_index=14)
+    assert results['lifter']['error']['code'] == 'INVALID_WEEK'
+    assert results['no-strength']['error']['code'] == 'NOT_FOUND'
@@ -0,0 +1,41 @@
+import pytest
+
+OPS = [{'op': 'set', 'map': 'daySwaps', 'key': '2024-05-06', 'value': '2024-05-07'}]
+
+@pytest.fixture
+def schedule(load_handler, monkeypatch):
+    module = load_handler('schedule')
+    updates = []
+
+    class Table:
+        def update_item(self, **kwargs):
+            updates.append(kwargs)
+            return {'Attributes': dict(kwargs['Key'], daySwaps={'2024-05-06': '2024-05-07'}, dayAssignments={}, version=1)}
+
+    monkeypatch.setattr(module, 'data_table', Table())
+    return module, updates
+
+@pytest.mark.parametrize('version', ['abc', '3', {}, [], True, False, -1, 1.5])
+def test_patch_rejects_invalid_versions(schedule, call_api, version):
+    module, updates = schedule
+    status, body = call_api(module, '/schedule', method='PATCH', body={'ops': OPS, 'version': version})
+    assert status == 400
+    assert body['error']['code'] == 'VALIDATION_ERROR'
+    assert not updates
+
+@pytest.mark.parametrize('version, condition', [
+    (0, 'attribute_not_exists(#version) OR #version = :expected'),
+    (4, '#version = :expected')
+])
+def test_patch_with_version_is_conditional(schedule, call_api, version, condition):
+    module, updates = schedule
+    status, _ = call_api(module, '/schedule', method='PATCH', body={'ops': OPS, 'version': version})
+    assert status == 200
+    assert updates[0]['ConditionExpression'] == condition
+    assert updates[0]['ExpressionAttributeValues'][':expected'] == version
+
+def test_patch_without_version_is_unconditional(schedule, call_api):
+    module, updates = schedule
+    status, _ = call_api(module, '/schedule', method='PATCH', body={'ops': OPS})
+    assert status == 200
+    assert 'ConditionExpression' not in updates[0]
@@ -0,0 +1,48 @@
+from decimal import Decimal
+
+import pytest
+from boto3.dynamodb.types import Binary
+
+pytest.importorskip('pyarrow')
+
+from shared.item_codec import dumps_item, loads_item
+from tools import table_export
+
+ITEMS = [
+    {'userEmail': 'USER#a', 'workoutDate': '2024-01-01', 'duration': Decimal('45'), 'notes': 'easy',
+     'mainLift': {'liftId': 'squat', 'sets': [{'weight': Decimal('102.5'), 'reps': Decimal('5')}]}},
+    # duration is a string here and a number above; notes is a map
+    {'userEmail': 'USER#a', 'workoutDate': '2024-01-02', 'duration': '45 min', 'notes': {'text': 'hard'},
+     'completedSessions': {'SQUAT', 'BENCH'}},
+    # Binary chunk and a bool where another item has nothing
+    {'userEmail': 'USER#a', 'workoutDate': 'ARCHIVE#2023-12#00', 'chunk': Binary(b'\x00\x01zlib'),
+     'format': Decimal('1'), 'compacted': True},
+    # duration as a fraction; a bool sharing a column with a number
+    {'userEmail': 'USER#b', 'workoutDate': '2024-01-03', 'duration': Decimal('30.5'), 'compacted': Decimal('1'),
+     'big': Decimal('123456789012345678901234567890')},
+]
+
+def roundtrip(item: dict) -> dict:
+    """An item as the NDJSON path restores it."""
+    return loads_item(dumps_item(item))
+
+def test_heterogeneous_items_round_trip(tmp_path):
+    path = str(tmp_path / 'chunk.parquet')
+    table_export.write_parquet_chunk(path, ITEMS)
+    restored = list(table_export.read_parquet_chunk(path))
+    assert restored == [roundtrip(item) for item in ITEMS]
+    assert restored[2]['chunk'] == b'\x00\x01zlib'
+    assert restored[1]['completedSessions'] == {'SQUAT', 'BENCH'}
+
+def test_column_kinds():
+    assert table_export.json_columns_for(ITEMS) == ['big', 'chunk', 'compacted', 'completedSessions', 'duration', 'mainLift', 'notes']
+
+def test_uniform_scalars_stay_typed_columns(tmp_path):
+    import pyarrow.parquet as pq
+    items = [{'id': 'a', 'n': Decimal('1')}, {'id': 'b', 'n': Decimal('2.5')}, {'id': 'c'}]
+    path = str(tmp_path / 'chunk.parquet')
+    table_export.write_parquet_chunk(path, items)
+    schema = pq.read_schema(path)
+    assert str(schema.field('id').type) == 'string'
+    assert str(schema.field('n').type) == 'double'
+    assert list(table_export.read_parquet_chunk(path)) == [roundtrip(item) for item in items]
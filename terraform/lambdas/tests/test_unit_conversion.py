@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+import pytest
+
+from shared.unit_conversion import convert_workouts
+from shared.workout_archive import build_archive_items, decode_archive_item
+
+ROUNDING = {'lb': {'increment': 5}, 'kg': {'increment': 2.5}}
+STARTED_AT = '2024-05-01T12:00:00Z'
+
+def workout(date: str, weight: str, **extra) -> dict:
+    return dict({
+        'userEmail': 'USER#user-1', 'workoutDate': date, 'sessionId': f's-{date}',
+        'createdAt': f'{date}T10:00:00Z', 'mainLift': {'sets': [{'weight': Decimal(weight), 'reps': 5}]}
+    }, **extra)
+
+def test_converts_workouts_logged_before_the_job():
+    changed = convert_workouts([workout('2024-04-20', '225')], 'kg', ROUNDING, STARTED_AT)
+    assert changed[0]['units'] == 'kg'
+    assert changed[0]['mainLift']['sets'][0]['weight'] == Decimal('102.5')
+
+def test_skips_workouts_logged_after_the_job_started_or_stamped():
+    later = workout('2024-05-02', '100')
+    stamped = workout('2024-04-21', '100', units='kg')
+    assert convert_workouts([later, stamped], 'kg', ROUNDING, STARTED_AT) == []
+    assert later['mainLift']['sets'][0]['weight'] == Decimal('100')
+
+def test_archive_rows_logged_after_the_job_are_left_alone():
+    rows = [workout('2024-04-20', '225'), workout('2024-05-02', '100')]
+    archive = build_archive_items('USER#user-1', '2024-04', rows, STARTED_AT)[0]
+    convert_workouts([archive], 'kg', ROUNDING, STARTED_AT)
+    weights = [row['mainLift']['sets'][0]['weight'] for row in decode_archive_item(archive, 'USER#user-1')]
+    assert weights == [Decimal('102.5'), Decimal('100')]
+
+@pytest.fixture
+def workout_api(load_handler, monkeypatch):
+    module = load_handler('workout')
+    stored = []
+
+    class Table:
+        def put_item(self, Item):
+            stored.append(Item)
+
+    def no_state_reads(*args, **kwargs):
+        raise AssertionError('POST /workout must not read user state')
+
+    from shared import request_context
+    monkeypatch.setattr(request_context, 'load_user_state_for', no_state_reads)
+    monkeypatch.setattr(module, 'workout_table', Table())
+    return module, stored
+
+def test_post_workout_takes_units_from_the_body(workout_api, call_api):
+    module, stored = workout_api
+    status, body = call_api(module, '/workout', method='POST',
+                            body={'workoutDate': '2024-05-02', 'sessionId': 'w1-squat', 'units': 'kg'})
+    assert status == 200
+    assert body['units'] == 'kg'
+    assert stored[0]['units'] == 'kg'
+
+def test_post_workout_rejects_unknown_units(workout_api, call_api):
+    module, stored = workout_api
+    status, body = call_api(module, '/workout', method='POST',
+                            body={'workoutDate': '2024-05-02', 'sessionId': 'w1-squat', 'units': 'stone'})
+    assert status == 400
+    assert body['error']['code'] == 'VALIDATION_ERROR'
+    assert not stored
@@ -0,0 +1,69 @@
+from decimal import Decimal
+
+import pytest
+
+TM_POLICY = {'percent': 0.85, 'rounding': '2.5kg'}
+
+class Table:
+    def __init__(self):
+        self.items = []
+
+    def put_item(self, Item):
+        self.items.append(Item)
+
+@pytest.fixture
+def api(load_handler, user_items, monkeypatch):
+    """Load a handler with an in-memory data table; returns (module, stored items)."""
+    def load(name: str):
+        module = load_handler(name)
+        table = Table()
+        monkeypatch.setattr(module, 'data_table', table)
+        return module, table.items
+    return load
+
+def test_strength_rounds_precise_weights_to_hundredths(api, call_api):
+    module, stored = api('strength')
+    body = {
+        'oneRepMaxes': {'squat': 102.0583, 'bench': 80, 'deadlift': 140.004, 'ohp': 47.6273},
+        'tmPolicy': TM_POLICY,
+        'bodyweight': 81.6466
+    }
+    status, response = call_api(module, '/strength', method='PUT', body=body)
+
+    assert status == 200
+    assert stored[0]['oneRepMaxes'] == {
+        'squat': Decimal('102.06'), 'bench': 80, 'deadlift': 140, 'ohp': Decimal('47.63')
+    }
+    assert stored[0]['bodyweight'] == Decimal('81.65')
+    assert response['oneRepMaxes']['squat'] == 102.06
+
+@pytest.mark.parametrize('squat', [0, -100, 0.004, '100', True, None])
+def test_strength_rejects_non_positive_or_non_numeric_weights(api, call_api, squat):
+    module, stored = api('strength')
+    body = {'oneRepMaxes': {'squat': squat, 'bench': 80, 'deadlift': 140, 'ohp': 50}, 'tmPolicy': TM_POLICY}
+    status, response = call_api(module, '/strength', method='PUT', body=body)
+    assert status == 400
+    assert response['error']['code'] == 'VALIDATION_ERROR'
+    assert not stored
+
+def test_settings_round_precise_weights_to_hundredths(api, call_api):
+    module, stored = api('program_settings')
+    body = {
+        'trainingDaysPerWeek': 4, 'preferredUnits': 'kg',
+        'rounding': 2.4999, 'barWeight': 20.004, 'availablePlates': [25, 1.2501, 0.5]
+    }
+    status, _ = call_api(module, '/program/settings', method='POST', body=body)
+
+    assert status == 200
+    assert stored[0]['rounding'] == Decimal('2.5')
+    assert stored[0]['barWeight'] == 20
+    assert stored[0]['availablePlates'] == [25, Decimal('1.25'), Decimal('0.5')]
+
+@pytest.mark.parametrize('field, value', [('rounding', 0.001), ('barWeight', -20), ('availablePlates', [25, 'x'])])
+def test_settings_reject_invalid_weights(api, call_api, field, value):
+    module, stored = api('program_settings')
+    body = {'trainingDaysPerWeek': 4, 'preferredUnits': 'kg', field: value}
+    status, response = call_api(module, '/program/settings', method='POST', body=body)
+    assert status == 400
+    assert response['error']['code'] == 'VALIDATION_ERROR'
+    assert not stored
@@ -0,0 +1,109 @@
+"""
+Benchmark default boto3 clients against the tuned shared/aws_clients factory.
+
+Runs the same fan-out pattern handlers use (a burst of concurrent GetItem
+calls from a thread pool, like a batch render or S3 prefetch) with a
+default-configured client and with shared/aws_clients, then reports
+per-call and per-burst latency percentiles. The default pool holds 10
+connections, so wider bursts open and discard connections; the tuned
+client reuses one keep-alive pool.
+
+Point it at a local stand-in such as DynamoDB Local; the table is created
+if missing.
+
+Usage:
+    python tools/bench_clients.py --endpoint-url http://localhost:8000 \\
+        [--table bench_clients] [--concurrency 32] [--bursts 200]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.aws_clients import get_client
+
+def percentile(sorted_values: list, pct: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+def ensure_table(client, table_name: str, items: int):
+    try:
+        client.describe_table(TableName=table_name)
+    except client.exceptions.ResourceNotFoundException:
+        client.create_table(
+            TableName=table_name,
+            KeySchema=[
+                {'AttributeName': 'userEmail', 'KeyType': 'HASH'},
+                {'AttributeName': 'dataType', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'userEmail', 'AttributeType': 'S'},
+                {'AttributeName': 'dataType', 'AttributeType': 'S'}
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        client.get_waiter('table_exists').wait(TableName=table_name)
+    for i in range(items):
+        client.put_item(TableName=table_name, Item={
+            'userEmail': {'S': f'USER#bench-{i}'},
+            'dataType': {'S': 'PROGRAM_SETTINGS'},
+            'payload': {'S': 'x' * 512}
+        })
+
+def run_bursts(client, table_name: str, concurrency: int, bursts: int, items: int) -> tuple:
+    """Return (per-call latencies, per-burst latencies) in seconds."""
+    calls, burst_times = [], []
+
+    def get(i):
+        started = time.perf_counter()
+        client.get_item(TableName=table_name, Key={
+            'userEmail': {'S': f'USER#bench-{i % items}'},
+            'dataType': {'S': 'PROGRAM_SETTINGS'}
+        })
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for burst in range(bursts):
+            started = time.perf_counter()
+            calls.extend(pool.map(get, range(burst * concurrency, (burst + 1) * concurrency)))
+            burst_times.append(time.perf_counter() - started)
+    return calls, burst_times
+
+def report(label: str, samples: list):
+    samples = sorted(samples)
+    print(
+        f"{label}: n={len(samples)}  "
+        f"p50={percentile(samples, 0.50) * 1000:.1f}ms  "
+        f"p99={percentile(samples, 0.99) * 1000:.1f}ms  "
+        f"max={samples[-1] * 1000:.1f}ms"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark boto3 client tuning')
+    parser.add_argument('--endpoint-url', required=True, help='DynamoDB endpoint (e.g. DynamoDB Local)')
+    parser.add_argument('--region', default=os.environ.get('AWS_REGION', 'us-east-1'))
+    parser.add_argument('--table', default='bench_clients')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--bursts', type=int, default=200)
+    parser.add_argument('--items', type=int, default=100)
+    args = parser.parse_args()
+
+    clients = {
+        'default': boto3.session.Session().client('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url),
+        'tuned': get_client('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url)
+    }
+    ensure_table(clients['tuned'], args.table, args.items)
+
+    for label, client in clients.items():
+        # Warm up: resolve the endpoint and open the first connections
+        run_bursts(client, args.table, args.concurrency, 2, args.items)
+        calls, burst_times = run_bursts(client, args.table, args.concurrency, args.bursts, args.items)
+        report(f"{label} call ", calls)
+        report(f"{label} burst", burst_times)
+
+if __name__ == '__main__':
+    main()
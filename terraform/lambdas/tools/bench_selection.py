@@ -0,0 +1,100 @@
+"""
+Benchmark the fatigue-budgeted assistance solver.
+
+Solves one full week (all four sessions) for every combination of
+constraint set (none, each single constraint, each pair), equipment preset
+and phase family, then reports per-week latency percentiles. Cold runs
+include building the candidate pools; warm runs hit the pool cache.
+
+Usage:
+    python tools/bench_selection.py [--library ../../app_config/exercises.latest.json]
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared import exercise_selection
+from shared.exercise_selection import select_week_assistance
+
+APP_CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'app_config')
+
+EQUIPMENT_PRESETS = {
+    'full_gym': ['barbell', 'db', 'kb', 'bench', 'rings', 'squat_rack', 'pullup_bar', 'landmine', 'ab_wheel', 'parallettes', 'sandbag'],
+    'barbell_home': ['barbell', 'squat_rack', 'bench', 'pullup_bar'],
+    'dumbbells': ['db', 'bench'],
+    'kettlebells': ['kb'],
+    'bodyweight': ['bodyweight']
+}
+
+PHASES = ['LEADER', 'ANCHOR', 'DELOAD_1', 'TEST']
+
+def percentile(sorted_values: list, pct: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark assistance selection')
+    parser.add_argument('--library', default=os.path.join(APP_CONFIG_DIR, 'exercises.latest.json'))
+    parser.add_argument('--template', default=os.path.join(APP_CONFIG_DIR, 'plan.template.json'))
+    parser.add_argument('--warm-runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.library) as f:
+        library = json.load(f)
+    with open(args.template) as f:
+        template = json.load(f)
+
+    weekly_sessions = sorted(template['macrocycle']['weeklySessions'], key=lambda ref: ref['slotIndex'])
+    session_templates = [template['sessionTemplates'][ref['sessionTemplateRef']] for ref in weekly_sessions]
+
+    constraints = sorted({c for ex in library['exercises'] for c in ex.get('constraintsBlocked', [])})
+    constraint_sets = [[]] + [[c] for c in constraints] + [list(pair) for pair in itertools.combinations(constraints, 2)]
+
+    combos = [
+        (constraint_set, equipment, phase)
+        for constraint_set in constraint_sets
+        for equipment in EQUIPMENT_PRESETS.values()
+        for phase in PHASES
+    ]
+
+    rng = random.Random(531)
+    exercise_selection._pool_cache.clear()
+    cold, warm = [], []
+    placeholders = 0
+    over_budget = 0
+
+    for constraint_set, equipment, phase in combos:
+        started = time.perf_counter()
+        result = select_week_assistance(session_templates, library, constraint_set, equipment, phase, rng)
+        cold.append(time.perf_counter() - started)
+
+        for _ in range(args.warm_runs):
+            started = time.perf_counter()
+            select_week_assistance(session_templates, library, constraint_set, equipment, phase, rng)
+            warm.append(time.perf_counter() - started)
+
+        placeholders += sum(
+            1 for session in result['sessions'] for selection in session.values()
+            if selection['exerciseId'].startswith('placeholder_')
+        )
+        if result['fatigue']['total'] > result['fatigue']['budget']:
+            over_budget += 1
+
+    for label, samples in (('cold', cold), ('warm', warm)):
+        samples.sort()
+        print(
+            f"{label}: {len(samples)} weeks  "
+            f"mean={sum(samples) / len(samples) * 1e6:.0f}us  "
+            f"p50={percentile(samples, 0.50) * 1e6:.0f}us  "
+            f"p99={percentile(samples, 0.99) * 1e6:.0f}us  "
+            f"max={samples[-1] * 1e6:.0f}us"
+        )
+    print(f"combinations={len(combos)} placeholder_slots={placeholders} over_budget_weeks={over_budget}")
+
+if __name__ == '__main__':
+    main()
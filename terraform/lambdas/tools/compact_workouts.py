@@ -0,0 +1,191 @@
+"""
+Roll old workout_history items into per-user monthly archive items.
+
+Runs in two phases:
+  1. A keys-only parallel Scan finds every (partition, month) that still
+     has individual workout items older than the cutoff month.
+  2. Each such month is read with two Queries (hot items, then any
+     existing archive parts), re-encoded with shared/workout_archive and written
+     back as ARCHIVE#YYYY-MM#<part> items. Hot items are deleted only after
+     the archive write succeeded, and readers prefer hot items over
+     archived copies, so a crash in between never loses or duplicates a
+     workout. Each hot item is deleted on condition that its createdAt is
+     still the one that was read; a workout re-logged in the meantime is
+     kept, reported as skipped and folded in on the next run. Re-running is
+     safe; late workouts landing in an archived month are folded in too.
+
+Usage:
+    python tools/compact_workouts.py --table styrkr_workout_history \\
+        --age-days 180 --segments 8 [--dry-run]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.aws_clients import get_resource
+from shared.dynamodb import batch_write_requests
+from shared.workout_archive import (
+    ARCHIVE_PREFIX, build_archive_items, decode_archive_item, is_archive_key, query_all
+)
+
+class CompactionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {
+            'months': 0, 'workouts': 0, 'archiveItems': 0, 'itemsRemoved': 0, 'skipped': 0, 'retries': 0
+        }
+        # (partition, workoutDate) of hot items changed after they were read
+        self.skipped = []
+
+    def add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                self.counts[name] += delta
+
+    def skip(self, partition_key: str, sort_key: str):
+        with self._lock:
+            self.counts['skipped'] += 1
+            self.skipped.append((partition_key, sort_key))
+
+def scan_segment(table, segment: int, total_segments: int, **scan_kwargs):
+    """Yield every item in one parallel-scan segment, following pagination."""
+    kwargs = dict(scan_kwargs, Segment=segment, TotalSegments=total_segments)
+    while True:
+        response = table.scan(**kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def find_compactable_months(table, cutoff_month: str, total_segments: int) -> set:
+    """(partition, YYYY-MM) pairs with hot items in months before cutoff_month."""
+    projection = {'ProjectionExpression': 'userEmail, workoutDate'}
+
+    def scan(segment):
+        return {
+            (item['userEmail'], item['workoutDate'][:7])
+            for item in scan_segment(table, segment, total_segments, **projection)
+            if not is_archive_key(item['workoutDate']) and item['workoutDate'][:7] < cutoff_month
+        }
+
+    months = set()
+    with ThreadPoolExecutor(max_workers=total_segments) as pool:
+        for segment_months in pool.map(scan, range(total_segments)):
+            months |= segment_months
+    return months
+
+def compact_month(resource, table_name: str, partition_key: str, month: str, dry_run: bool,
+                  stats: CompactionStats):
+    table = resource.Table(table_name)
+    partition = Key('userEmail').eq(partition_key)
+    hot = query_all(table, KeyConditionExpression=partition & Key('workoutDate').begins_with(month))
+    if not hot:
+        return
+    old_parts = query_all(
+        table, KeyConditionExpression=partition & Key('workoutDate').begins_with(f'{ARCHIVE_PREFIX}{month}#')
+    )
+
+    # Hot items win over archived copies of the same date
+    workouts = {}
+    for part in old_parts:
+        workouts.update({w['workoutDate']: w for w in decode_archive_item(part, partition_key)})
+    workouts.update({w['workoutDate']: w for w in hot})
+
+    now = datetime.utcnow().isoformat() + 'Z'
+    archive_items = build_archive_items(partition_key, month, list(workouts.values()), now)
+    new_keys = {item['workoutDate'] for item in archive_items}
+    stale_parts = [part['workoutDate'] for part in old_parts if part['workoutDate'] not in new_keys]
+
+    stats.add(months=1, workouts=len(workouts), archiveItems=len(archive_items))
+    if dry_run:
+        stats.add(itemsRemoved=len(hot) + len(stale_parts))
+        return
+
+    retries = batch_write_requests(
+        table_name, [{'PutRequest': {'Item': item}} for item in archive_items], resource=resource
+    )
+    retries += batch_write_requests(
+        table_name,
+        [{'DeleteRequest': {'Key': {'userEmail': partition_key, 'workoutDate': sort_key}}} for sort_key in stale_parts],
+        resource=resource
+    )
+    removed = len(stale_parts)
+    for item in hot:
+        if delete_if_unchanged(table, item):
+            removed += 1
+        else:
+            stats.skip(partition_key, item['workoutDate'])
+    stats.add(itemsRemoved=removed, retries=retries)
+
+def delete_if_unchanged(table, item: dict) -> bool:
+    """
+    Delete a hot workout only if it still has the createdAt that was read.
+
+    Logging a workout again overwrites the item with a new createdAt, so an
+    edit made after the month was read fails the condition and survives.
+    Returns False when the item changed.
+    """
+    if 'createdAt' in item:
+        condition = Attr('createdAt').eq(item['createdAt'])
+    else:
+        condition = Attr('createdAt').not_exists()
+    try:
+        table.delete_item(
+            Key={'userEmail': item['userEmail'], 'workoutDate': item['workoutDate']},
+            ConditionExpression=condition
+        )
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description='Compact old workouts into monthly archive items')
+    parser.add_argument('--table', required=True, help='Workout history table')
+    parser.add_argument('--age-days', type=int, default=180, help='Archive months entirely older than this')
+    parser.add_argument('--segments', type=int, default=8, help='Parallel scan workers')
+    parser.add_argument('--workers', type=int, default=8, help='Months compacted concurrently')
+    parser.add_argument('--endpoint-url', help='DynamoDB endpoint (e.g. DynamoDB Local)')
+    parser.add_argument('--region', default=os.environ.get('AWS_REGION', 'us-east-1'))
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    resource = get_resource(
+        'dynamodb', region_name=args.region, endpoint_url=args.endpoint_url,
+        max_pool_connections=max(args.segments, args.workers, 10)
+    )
+    # Only whole months are archived, so the current partial month never is
+    cutoff_month = (datetime.utcnow() - timedelta(days=args.age_days)).strftime('%Y-%m')
+
+    started = time.time()
+    months = find_compactable_months(resource.Table(args.table), cutoff_month, args.segments)
+    users = {partition_key for partition_key, _ in months}
+    print(f"Found {len(months)} months to compact across {len(users)} users before {cutoff_month} "
+          f"in {time.time() - started:.1f}s")
+
+    stats = CompactionStats()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(compact_month, resource, args.table, partition_key, month, args.dry_run, stats)
+            for partition_key, month in sorted(months)
+        ]
+        for future in futures:
+            future.result()
+
+    prefix = '[dry run] ' if args.dry_run else ''
+    print(f"{prefix}{stats.counts} in {time.time() - started:.1f}s")
+    for partition_key, sort_key in stats.skipped:
+        print(f"Skipped {partition_key} {sort_key}: changed since read, left for the next run")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Convert one user's stored weights between lb and kg.
+
+Run after a user switches preferredUnits so reads never have to convert.
+Works in two stages:
+  1. The user's data items: PROFILE and PROGRAM_SETTINGS take the new unit
+     (with its rounding increment), and STRENGTH 1RMs, training maxes and
+     history are converted.
+  2. Every workout_history item (hot items and archive months), read one
+     Query page at a time. Each page is converted in one batch
+     (shared/unit_conversion) and written back with batch_writer.
+
+Progress is checkpointed after each page in a UNIT_CONVERSION item in the
+data table, so an interrupted run resumes from the last page. Converted
+items carry units=<unit>, and workouts created after the job started (or
+logged with units by the client) are skipped, so a re-run never converts
+an item twice. Run it right after the user switches units. Converted data
+items also carry conversionJob, which the events consumer uses to skip
+them (a converted STRENGTH item is not a new set of maxes).
+
+Usage:
+    python tools/convert_units.py --data-table styrkr_data \\
+        --workout-table styrkr_workout_history --user-id <sub> --to kg [--dry-run]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from boto3.dynamodb.conditions import Key
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.aws_clients import get_resource
+from shared.jwt_validator import get_dynamodb_user_key
+from shared.unit_conversion import (
+    CONVERSION_JOB_ATTR, UNITS, convert_settings, convert_strength, convert_workouts, other_unit
+)
+
+CHECKPOINT_TYPE = 'UNIT_CONVERSION'
+DEFAULT_TEMPLATE = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'app_config', 'plan.template.json')
+
+def utc_now() -> str:
+    return datetime.utcnow().isoformat() + 'Z'
+
+def load_checkpoint(data_table, user_key: str, to_unit: str) -> dict:
+    """The saved checkpoint for this conversion, or a fresh one."""
+    item = data_table.get_item(
+        Key={'userEmail': user_key, 'dataType': CHECKPOINT_TYPE}, ConsistentRead=True
+    ).get('Item')
+    if item and item.get('toUnit') == to_unit and item.get('stage') != 'done':
+        return item
+    return {
+        'userEmail': user_key,
+        'dataType': CHECKPOINT_TYPE,
+        'fromUnit': other_unit(to_unit),
+        'toUnit': to_unit,
+        'stage': 'data',
+        'converted': 0,
+        'pages': 0,
+        'startedAt': utc_now()
+    }
+
+def save_checkpoint(data_table, checkpoint: dict, dry_run: bool):
+    checkpoint['updatedAt'] = utc_now()
+    if not dry_run:
+        data_table.put_item(Item={k: v for k, v in checkpoint.items() if v is not None})
+
+def job_id(checkpoint: dict) -> str:
+    """Identifies one conversion run, stable across resumes."""
+    return f"{checkpoint['toUnit']}#{checkpoint['startedAt']}"
+
+def convert_data_items(data_table, user_key: str, to_unit: str, rounding_rules: dict, job: str,
+                       dry_run: bool) -> int:
+    response = data_table.query(
+        KeyConditionExpression=Key('userEmail').eq(user_key),
+        ConsistentRead=True
+    )
+    changed = []
+    for item in response.get('Items', []):
+        if item['dataType'] in ('PROFILE', 'PROGRAM_SETTINGS') and item.get('preferredUnits') != to_unit:
+            changed.append(convert_settings(item, to_unit, rounding_rules))
+        elif item['dataType'] == 'STRENGTH':
+            converted = convert_strength(item, to_unit, rounding_rules)
+            if converted:
+                changed.append(converted)
+
+    if not dry_run:
+        now = utc_now()
+        for item in changed:
+            data_table.put_item(Item=dict(item, updatedAt=now, **{CONVERSION_JOB_ATTR: job}))
+    return len(changed)
+
+def convert_workout_pages(workout_table, data_table, checkpoint: dict, rounding_rules: dict,
+                          page_size: int, dry_run: bool):
+    params = {
+        'KeyConditionExpression': Key('userEmail').eq(checkpoint['userEmail']),
+        'Limit': page_size
+    }
+    while True:
+        if checkpoint.get('lastKey'):
+            params['ExclusiveStartKey'] = checkpoint['lastKey']
+        response = workout_table.query(**params)
+        changed = convert_workouts(
+            response.get('Items', []), checkpoint['toUnit'], rounding_rules, checkpoint['startedAt']
+        )
+        if changed and not dry_run:
+            with workout_table.batch_writer() as writer:
+                for item in changed:
+                    writer.put_item(Item=item)
+
+        checkpoint['converted'] += len(changed)
+        checkpoint['pages'] += 1
+        checkpoint['lastKey'] = response.get('LastEvaluatedKey')
+        if not checkpoint['lastKey']:
+            return
+        save_checkpoint(data_table, checkpoint, dry_run)
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a user's stored weights between lb and kg")
+    parser.add_argument('--data-table', required=True, help='Data table (<project>_data)')
+    parser.add_argument('--workout-table', required=True, help='Workout history table')
+    parser.add_argument('--user-id', required=True, help='Cognito sub of the user')
+    parser.add_argument('--to', required=True, choices=UNITS, help='Target unit')
+    parser.add_argument('--template', default=DEFAULT_TEMPLATE, help='Program template with roundingRules')
+    parser.add_argument('--page-size', type=int, default=100, help='Workout items per Query page')
+    parser.add_argument('--endpoint-url', help='DynamoDB endpoint (e.g. DynamoDB Local)')
+    parser.add_argument('--region', default=os.environ.get('AWS_REGION', 'us-east-1'))
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    with open(args.template) as f:
+        rounding_rules = json.load(f)['roundingRules']
+
+    resource = get_resource('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url)
+    data_table = resource.Table(args.data_table)
+    workout_table = resource.Table(args.workout_table)
+    user_key = get_dynamodb_user_key(args.user_id)
+
+    started = time.time()
+    checkpoint = load_checkpoint(data_table, user_key, args.to)
+    if checkpoint['pages'] or checkpoint['stage'] != 'data':
+        print(f"Resuming {checkpoint['stage']} stage after {checkpoint['pages']} pages")
+
+    if checkpoint['stage'] == 'data':
+        converted = convert_data_items(
+            data_table, user_key, args.to, rounding_rules, job_id(checkpoint), args.dry_run
+        )
+        print(f"Converted {converted} data items")
+        checkpoint['stage'] = 'workouts'
+        save_checkpoint(data_table, checkpoint, args.dry_run)
+
+    convert_workout_pages(workout_table, data_table, checkpoint, rounding_rules, args.page_size, args.dry_run)
+    checkpoint['stage'] = 'done'
+    checkpoint['completedAt'] = utc_now()
+    save_checkpoint(data_table, checkpoint, args.dry_run)
+
+    prefix = '[dry run] ' if args.dry_run else ''
+    print(f"{prefix}Converted {checkpoint['converted']} workout items in {checkpoint['pages']} pages "
+          f"to {args.to} in {time.time() - started:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+Rewrite email-keyed user items to the unified USER#<sub> partition key.
+
+Runs in two phases:
+  1. A keys-only parallel Scan of both tables builds the email -> sub map
+     (from items that carry userId) and the set of unified keys that
+     already exist, so newer data is never overwritten.
+  2. A parallel Scan (Segment/TotalSegments) per table copies every legacy
+     item to its unified key with batched writes and throttling-aware
+     backoff, optionally deleting the legacy copy. Copies carry
+     migratedFrom=<legacy key> so the events consumer does not treat them
+     as newly logged workouts or strength updates.
+
+Legacy reads stay enabled (LEGACY_KEY_READS) until this has completed.
+
+Usage:
+    python tools/migrate_user_keys.py --data-table styrkr_data \\
+        --workout-table styrkr_workout_history --segments 8 [--delete-legacy]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.aws_clients import get_resource
+from shared.dynamodb import batch_write_requests, BATCH_WRITE_LIMIT, MIGRATED_FROM_ATTR
+from shared.jwt_validator import get_dynamodb_user_key, is_unified_user_key
+
+# Table -> sort key attribute
+SORT_KEYS = {
+    'data': 'dataType',
+    'workout': 'workoutDate'
+}
+
+class MigrationStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {'scanned': 0, 'migrated': 0, 'skipped_existing': 0, 'orphaned': 0, 'deleted': 0, 'retries': 0}
+
+    def add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                self.counts[name] += delta
+
+def scan_segment(table, segment: int, total_segments: int, **scan_kwargs):
+    """Yield every item in one parallel-scan segment, following pagination."""
+    kwargs = dict(scan_kwargs, Segment=segment, TotalSegments=total_segments)
+    while True:
+        response = table.scan(**kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def collect_key_index(table, sort_key: str, total_segments: int):
+    """
+    Keys-only scan of one table.
+
+    Returns:
+        (email -> userId map, set of existing unified (pk, sk) keys)
+    """
+    projection = {
+        'ProjectionExpression': '#pk, #sk, userId, email',
+        'ExpressionAttributeNames': {'#pk': 'userEmail', '#sk': sort_key}
+    }
+
+    def scan(segment):
+        emails, unified = {}, set()
+        for item in scan_segment(table, segment, total_segments, **projection):
+            if is_unified_user_key(item['userEmail']):
+                unified.add((item['userEmail'], item[sort_key]))
+                if item.get('email') and item.get('userId'):
+                    emails.setdefault(item['email'], item['userId'])
+            elif item.get('userId'):
+                emails.setdefault(item['userEmail'], item['userId'])
+        return emails, unified
+
+    email_to_user_id, unified_keys = {}, set()
+    with ThreadPoolExecutor(max_workers=total_segments) as pool:
+        for emails, unified in pool.map(scan, range(total_segments)):
+            for email, user_id in emails.items():
+                email_to_user_id.setdefault(email, user_id)
+            unified_keys |= unified
+    return email_to_user_id, unified_keys
+
+def migrate_segment(resource, table_name: str, sort_key: str, segment: int, total_segments: int,
+                    email_to_user_id: dict, unified_keys: set, delete_legacy: bool, dry_run: bool,
+                    stats: MigrationStats):
+    table = resource.Table(table_name)
+    pending = []
+
+    def flush():
+        if pending and not dry_run:
+            stats.add(retries=batch_write_requests(table_name, pending, resource=resource))
+        pending.clear()
+
+    for item in scan_segment(table, segment, total_segments):
+        stats.add(scanned=1)
+        legacy_key = item['userEmail']
+        if is_unified_user_key(legacy_key):
+            continue
+
+        user_id = item.get('userId') or email_to_user_id.get(legacy_key)
+        if not user_id:
+            stats.add(orphaned=1)
+            continue
+
+        unified_key = get_dynamodb_user_key(user_id)
+        if (unified_key, item[sort_key]) in unified_keys:
+            stats.add(skipped_existing=1)
+        else:
+            copy = dict(item, userEmail=unified_key, userId=user_id, email=item.get('email', legacy_key))
+            copy[MIGRATED_FROM_ATTR] = legacy_key
+            pending.append({'PutRequest': {'Item': copy}})
+            stats.add(migrated=1)
+
+        if delete_legacy:
+            pending.append({'DeleteRequest': {'Key': {'userEmail': legacy_key, sort_key: item[sort_key]}}})
+            stats.add(deleted=1)
+
+        if len(pending) >= BATCH_WRITE_LIMIT * 4:
+            flush()
+
+    flush()
+
+def migrate_table(resource, table_name: str, sort_key: str, total_segments: int, email_to_user_id: dict,
+                  unified_keys: set, delete_legacy: bool, dry_run: bool) -> MigrationStats:
+    stats = MigrationStats()
+    with ThreadPoolExecutor(max_workers=total_segments) as pool:
+        futures = [
+            pool.submit(
+                migrate_segment, resource, table_name, sort_key, segment, total_segments,
+                email_to_user_id, unified_keys, delete_legacy, dry_run, stats
+            )
+            for segment in range(total_segments)
+        ]
+        for future in futures:
+            future.result()
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate email-keyed user items to USER#<sub> keys')
+    parser.add_argument('--data-table', required=True)
+    parser.add_argument('--workout-table', required=True)
+    parser.add_argument('--segments', type=int, default=8, help='Parallel scan workers per table')
+    parser.add_argument('--endpoint-url', help='DynamoDB endpoint (e.g. DynamoDB Local)')
+    parser.add_argument('--region', default=os.environ.get('AWS_REGION', 'us-east-1'))
+    parser.add_argument('--delete-legacy', action='store_true', help='Delete email-keyed items after copying')
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    # Every scan worker shares one connection pool
+    resource = get_resource(
+        'dynamodb', region_name=args.region, endpoint_url=args.endpoint_url,
+        max_pool_connections=max(args.segments, 10)
+    )
+    tables = [(args.data_table, SORT_KEYS['data']), (args.workout_table, SORT_KEYS['workout'])]
+
+    started = time.time()
+    email_to_user_id, unified_keys = {}, set()
+    for table_name, sort_key in tables:
+        emails, unified = collect_key_index(resource.Table(table_name), sort_key, args.segments)
+        for email, user_id in emails.items():
+            email_to_user_id.setdefault(email, user_id)
+        unified_keys |= unified
+    print(f"Indexed {len(email_to_user_id)} users and {len(unified_keys)} unified items in {time.time() - started:.1f}s")
+
+    for table_name, sort_key in tables:
+        table_started = time.time()
+        stats = migrate_table(
+            resource, table_name, sort_key, args.segments, email_to_user_id, unified_keys,
+            args.delete_legacy, args.dry_run
+        )
+        elapsed = time.time() - table_started
+        rate = stats.counts['scanned'] / elapsed if elapsed else 0
+        print(f"{table_name}: {stats.counts} ({rate:.0f} items/sec)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+Bulk export/import of DynamoDB tables to NDJSON or Parquet.
+
+Export runs a parallel segmented Scan on a process pool (one process per
+segment). Each process streams items through the item codec into chunk
+files of at most --chunk-size items, so memory stays bounded by one chunk
+per worker regardless of table size. Import reads chunk files back on a
+process pool and writes them with batch_writer.
+
+NDJSON chunks are gzip-compressed, one item per line. Parquet chunks
+(requires pyarrow) store scalar top-level attributes as columns; nested,
+binary and mixed-type attributes become JSON text columns listed in the
+file metadata.
+
+Usage:
+    python tools/table_export.py export --table styrkr_workout_history --out ./backup --segments 8
+    python tools/table_export.py import --table styrkr_workout_history --src ./backup
+    # against DynamoDB Local:
+    python tools/table_export.py export ... --endpoint-url http://localhost:8000
+"""
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.aws_clients import get_resource
+from shared.item_codec import dumps_item, loads_item
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+FORMATS = ('ndjson', 'parquet')
+JSON_COLUMNS_METADATA_KEY = b'styrkr.json_columns'
+
+def get_table(table_name: str, region: str, endpoint_url: str | None):
+    """Table handle from the shared client factory; built in each worker process, never inherited."""
+    return get_resource('dynamodb', region_name=region, endpoint_url=endpoint_url).Table(table_name)
+
+def chunk_path(out_dir: str, segment: int, part: int, fmt: str) -> str:
+    extension = 'ndjson.gz' if fmt == 'ndjson' else 'parquet'
+    return os.path.join(out_dir, f"segment-{segment:04d}-part-{part:05d}.{extension}")
+
+# Scalar value kinds that can share a Parquet column (ints widen to double)
+COLUMN_KIND_SETS = ({'bool'}, {'string'}, {'int'}, {'float'}, {'int', 'float'})
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+def value_kind(value) -> str:
+    """Parquet column kind of one attribute value; 'json' for anything stored as JSON text."""
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, (int, float, Decimal)):
+        if value != int(value):
+            return 'float'
+        return 'int' if INT64_MIN <= value <= INT64_MAX else 'json'
+    # Binary, bytes, sets, maps and lists (tagged by the item codec)
+    return 'json'
+
+def json_columns_for(items: list) -> list:
+    """
+    Attributes that cannot be a typed column in this chunk.
+
+    Nested and binary values always go to JSON text, as does any attribute
+    whose scalar type differs between items (e.g. a number in one item and
+    a string in another), since Parquet columns have one type.
+    """
+    kinds = {}
+    for item in items:
+        for name, value in item.items():
+            kinds.setdefault(name, set()).add(value_kind(value))
+    return sorted(name for name, column_kinds in kinds.items() if column_kinds not in COLUMN_KIND_SETS)
+
+def write_parquet_chunk(path: str, items: list):
+    """Write one chunk with scalar attributes as columns and nested, binary or mixed values as JSON text."""
+    json_columns = json_columns_for(items)
+    rows = [json.loads(dumps_item(item)) for item in items]
+    for row in rows:
+        for name in json_columns:
+            if name in row:
+                row[name] = json.dumps(row[name], separators=(',', ':'))
+
+    # Columns are the union of attributes; from_pylist would keep only the first row's
+    names = list(dict.fromkeys(name for row in rows for name in row))
+    table = pa.table({name: [row.get(name) for row in rows] for name in names})
+    table = table.replace_schema_metadata({JSON_COLUMNS_METADATA_KEY: json.dumps(json_columns).encode()})
+    pq.write_table(table, path, compression='zstd')
+
+def read_parquet_chunk(path: str):
+    table = pq.read_table(path)
+    metadata = table.schema.metadata or {}
+    json_columns = set(json.loads(metadata.get(JSON_COLUMNS_METADATA_KEY, b'[]')))
+    for row in table.to_pylist():
+        item = {
+            name: json.loads(value) if name in json_columns else value
+            for name, value in row.items()
+            if value is not None
+        }
+        # Route through the codec so numbers become Decimals and tags decode
+        yield loads_item(json.dumps(item))
+
+def read_ndjson_chunk(path: str):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield loads_item(line)
+
+def export_segment(table_name: str, region: str, endpoint_url: str | None, out_dir: str, fmt: str,
+                   segment: int, total_segments: int, chunk_size: int) -> int:
+    """Scan one segment into chunk files. Runs in a worker process."""
+    table = get_table(table_name, region, endpoint_url)
+    kwargs = {'Segment': segment, 'TotalSegments': total_segments}
+    count = 0
+    part = 0
+    buffer = []
+    ndjson_file = None
+
+    def close_chunk():
+        nonlocal part, ndjson_file
+        if fmt == 'parquet' and buffer:
+            write_parquet_chunk(chunk_path(out_dir, segment, part, fmt), buffer)
+            buffer.clear()
+        if ndjson_file:
+            ndjson_file.close()
+            ndjson_file = None
+        part += 1
+
+    while True:
+        response = table.scan(**kwargs)
+        for item in response.get('Items', []):
+            if fmt == 'ndjson':
+                if ndjson_file is None:
+                    ndjson_file = gzip.open(chunk_path(out_dir, segment, part, fmt), 'wt', encoding='utf-8')
+                ndjson_file.write(dumps_item(item))
+                ndjson_file.write('\n')
+            else:
+                buffer.append(item)
+            count += 1
+            if count % chunk_size == 0:
+                close_chunk()
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    close_chunk()
+    return count
+
+def import_files(table_name: str, region: str, endpoint_url: str | None, paths: list) -> int:
+    """Write the items from a list of chunk files. Runs in a worker process."""
+    table = get_table(table_name, region, endpoint_url)
+    key_names = [key['AttributeName'] for key in table.key_schema]
+    count = 0
+    with table.batch_writer(overwrite_by_pkeys=key_names) as writer:
+        for path in paths:
+            reader = read_parquet_chunk if path.endswith('.parquet') else read_ndjson_chunk
+            for item in reader(path):
+                writer.put_item(Item=item)
+                count += 1
+    return count
+
+def run_export(args) -> int:
+    os.makedirs(args.out, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=args.segments) as pool:
+        futures = [
+            pool.submit(
+                export_segment, args.table, args.region, args.endpoint_url, args.out, args.format,
+                segment, args.segments, args.chunk_size
+            )
+            for segment in range(args.segments)
+        ]
+        return sum(future.result() for future in futures)
+
+def run_import(args) -> int:
+    paths = sorted(glob.glob(os.path.join(args.src, 'segment-*')))
+    if pq is None and any(path.endswith('.parquet') for path in paths):
+        raise SystemExit('Importing parquet chunks requires pyarrow (pip install pyarrow)')
+    workers = max(1, min(args.workers, len(paths)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(import_files, args.table, args.region, args.endpoint_url, paths[worker::workers])
+            for worker in range(workers)
+        ]
+        return sum(future.result() for future in futures)
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel DynamoDB export/import')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export')
+    export_parser.add_argument('--out', required=True, help='Output directory for chunk files')
+    export_parser.add_argument('--format', choices=FORMATS, default='ndjson')
+    export_parser.add_argument('--segments', type=int, default=os.cpu_count() or 4)
+    export_parser.add_argument('--chunk-size', type=int, default=10000, help='Items per chunk file')
+
+    import_parser = subparsers.add_parser('import')
+    import_parser.add_argument('--src', required=True, help='Directory of chunk files from export')
+    import_parser.add_argument('--workers', type=int, default=os.cpu_count() or 4)
+
+    for sub in (export_parser, import_parser):
+        sub.add_argument('--table', required=True)
+        sub.add_argument('--endpoint-url', help='DynamoDB endpoint (e.g. DynamoDB Local)')
+        sub.add_argument('--region', default=os.environ.get('AWS_REGION', 'us-east-1'))
+
+    args = parser.parse_args()
+    if getattr(args, 'format', None) == 'parquet' and pa is None:
+        parser.error('--format parquet requires pyarrow (pip install pyarrow)')
+
+    started = time.time()
+    count = run_export(args) if args.command == 'export' else run_import(args)
+    elapsed = time.time() - started
+    rate = count / elapsed if elapsed else 0
+    print(f"{args.command}: {count} items from {args.table} in {elapsed:.1f}s ({rate:.0f} items/sec)")
+
+if __name__ == '__main__':
+    main()
@@ -1,59 +1,98 @@
-import json
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import boto3
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from shared.auth import get_user_context
+from shared.aws_clients import get_resource
+from shared.dynamodb import LEGACY_KEY_READS
+from shared.handler_utils import handle_request
+from shared.jwt_validator import get_dynamodb_user_key, get_legacy_user_key
+from shared.request_context import RequestContext
 from shared.response import error_response, success_response
 from shared.utils import convert_floats_to_decimals
+from shared.workout_archive import ARCHIVE_PREFIX, query_all, query_archived_workouts
+from shared import logger
 
 workout_table_name = os.environ['WORKOUT_TABLE']
-dynamodb = boto3.resource('dynamodb')
+dynamodb = get_resource('dynamodb')
 workout_table = dynamodb.Table(workout_table_name)
 
-def get_workouts(user_email: str, query_params: dict, request_id: str) -> dict:
-    try:
-        params = {
-            'KeyConditionExpression': 'userEmail = :userEmail',
-            'ExpressionAttributeValues': {':userEmail': user_email},
-            'ScanIndexForward': False
+def query_hot_workouts(partition_key: str, start_date: str | None, end_date: str | None) -> list:
+    """Individual workout items, newest first; the key condition stops short of archive items."""
+    params = {
+        'KeyConditionExpression': 'userEmail = :userEmail AND workoutDate < :archivePrefix',
+        'ExpressionAttributeValues': {':userEmail': partition_key, ':archivePrefix': ARCHIVE_PREFIX},
+        'ScanIndexForward': False
+    }
+    
+    if start_date:
+        params['KeyConditionExpression'] = 'userEmail = :userEmail AND workoutDate BETWEEN :startDate AND :endDate'
+        params['ExpressionAttributeValues'] = {
+            ':userEmail': partition_key,
+            ':startDate': start_date,
+            # Nothing sorts between the last date and the archive prefix
+            ':endDate': end_date or ARCHIVE_PREFIX
         }
+    
+    return query_all(workout_table, **params)
+
+def merge_by_date(*workout_lists) -> list:
+    """Merge workout lists newest first; later lists win for the same workoutDate."""
+    by_date = {}
+    for workouts in workout_lists:
+        by_date.update({item['workoutDate']: item for item in workouts})
+    return sorted(by_date.values(), key=lambda item: item['workoutDate'], reverse=True)
+
+def query_workouts(partition_key: str, query_params: dict) -> list:
+    """Hot items merged with decoded archive months (hot items win, e.g. late edits)."""
+    start_date = (query_params or {}).get('startDate')
+    end_date = (query_params or {}).get('endDate') if start_date else None
+    
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        hot_future = pool.submit(query_hot_workouts, partition_key, start_date, end_date)
+        archived_future = pool.submit(query_archived_workouts, workout_table, partition_key, start_date, end_date)
+        hot = hot_future.result()
+        archived = archived_future.result()
+    if not archived:
+        return hot
+    return merge_by_date(archived, hot)
+
+def get_workouts(ctx: RequestContext, query_params: dict, request_id: str, event: dict) -> dict:
+    try:
+        user_context = ctx.user_context
+        workouts = query_workouts(get_dynamodb_user_key(user_context['userId']), query_params)
         
-        if query_params:
-            start_date = query_params.get('startDate')
-            end_date = query_params.get('endDate')
-            
-            if start_date and end_date:
-                params['KeyConditionExpression'] += ' AND workoutDate BETWEEN :startDate AND :endDate'
-                params['ExpressionAttributeValues'][':startDate'] = start_date
-                params['ExpressionAttributeValues'][':endDate'] = end_date
-            elif start_date:
-                params['KeyConditionExpression'] += ' AND workoutDate >= :startDate'
-                params['ExpressionAttributeValues'][':startDate'] = start_date
-        
-        response = workout_table.query(**params)
+        if LEGACY_KEY_READS:
+            # Merge history still stored under the email key; unified items win
+            legacy_workouts = query_workouts(get_legacy_user_key(user_context['email']), query_params)
+            if legacy_workouts:
+                workouts = merge_by_date(legacy_workouts, workouts)
         
         return success_response(200, {
-            'workouts': response.get('Items', []),
-            'count': response.get('Count', 0)
+            'workouts': workouts,
+            'count': len(workouts)
         })
     
-    except Exception as e:
-        print(f"Error getting workouts: {e}")
+    except Exception:
+        logger.exception("Error getting workouts")
         return error_response(500, 'INTERNAL', 'Internal server error', request_id)
 
-def post_workout(user_email: str, body: dict, request_id: str) -> dict:
+def post_workout(ctx: RequestContext, body: dict, request_id: str, event: dict) -> dict:
     try:
+        user_context = ctx.user_context
         if not body.get('workoutDate') or not body.get('sessionId'):
             return error_response(400, 'VALIDATION_ERROR', 'Missing required fields', request_id)
         
+        if 'units' in body and body['units'] not in ('lb', 'kg'):
+            return error_response(400, 'VALIDATION_ERROR', "units must be 'lb' or 'kg'", request_id)
+        
         now = datetime.utcnow().isoformat() + 'Z'
         
         workout = {
-            'userEmail': user_email,
+            'userEmail': get_dynamodb_user_key(user_context['userId']),
+            'email': user_context['email'],
             'workoutDate': body['workoutDate'],
             'sessionId': body['sessionId'],
             'createdAt': now
@@ -80,40 +119,18 @@ def post_workout(user_email: str, body: dict, request_id: str) -> dict:
         if body.get('duration'):
             workout['duration'] = body['duration']
         
+        # Unit the client logged weights in (tools/convert_units.py skips these)
+        if body.get('units'):
+            workout['units'] = body['units']
+        
+        # Floating-week progress is derived from the table stream (events/handler.py)
         workout_table.put_item(Item=workout)
         
         return success_response(200, workout)
     
-    except Exception as e:
-        print(f"Error posting workout: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error posting workout")
         return error_response(500, 'INTERNAL', 'Internal server error', request_id)
 
 def handler(event, context):
-    try:
-        request_id = context.aws_request_id
-        method = event['requestContext']['http']['method']
-        
-        user_context = get_user_context(event)
-        if not user_context or not user_context.get('email'):
-            return error_response(403, 'FORBIDDEN', 'Invalid or missing authentication', request_id)
-        
-        user_email = user_context['email']
-        
-        if method == 'GET':
-            query_params = event.get('queryStringParameters')
-            return get_workouts(user_email, query_params, request_id)
-        
-        if method == 'POST':
-            body = json.loads(event.get('body', '{}'))
-            return post_workout(user_email, body, request_id)
-        
-        return error_response(405, 'METHOD_NOT_ALLOWED', 'Method not allowed', request_id)
-    
-    except Exception as e:
-        print(f"Handler error: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return error_response(500, 'INTERNAL', 'Internal server error', context.aws_request_id)
-
+    return handle_request(event, context, get_handler=get_workouts, post_handler=post_workout)
@@ -37,3 +37,8 @@ output "oauth_secrets_arn" {
   description = "ARN of the OAuth credentials secret in Secrets Manager"
   value       = aws_secretsmanager_secret.oauth_credentials.arn
 }
+
+output "events_failed_queue_url" {
+  description = "SQS queue receiving stream batches the events Lambda could not process"
+  value       = aws_sqs_queue.events_failed.url
+}
@@ -0,0 +1,47 @@
+locals {
+  exports_bucket_name = "${var.app_name}-exports-${random_string.this.result}"
+}
+
+# Generated exports (GET /export), downloaded through presigned URLs
+module "exports_s3_bucket" {
+  source  = "terraform-aws-modules/s3-bucket/aws"
+  version = "~> 5.0"
+
+  bucket = local.exports_bucket_name
+
+  block_public_acls       = true
+  block_public_policy     = true
+  ignore_public_acls      = true
+  restrict_public_buckets = true
+
+  control_object_ownership = true
+  object_ownership         = "BucketOwnerEnforced"
+
+  expected_bucket_owner = data.aws_caller_identity.current.account_id
+
+  server_side_encryption_configuration = {
+    rule = {
+      apply_server_side_encryption_by_default = {
+        sse_algorithm = "AES256"
+      }
+    }
+  }
+
+  lifecycle_rule = [
+    {
+      id      = "expire-exports"
+      enabled = true
+      filter  = {}
+
+      expiration = {
+        days = 1
+      }
+
+      abort_incomplete_multipart_upload_days = 1
+    }
+  ]
+
+  tags = merge(var.tags, {
+    Name = local.exports_bucket_name
+  })
+}